@@ -0,0 +1,45 @@
+"""Maintain weighted search_vector columns with triggers
+
+Revision ID: 002_search_vector_triggers
+Revises: 141ed4bc8cef
+Create Date: 2025-09-14 10:00:00.000000
+
+"""
+from alembic import op
+
+from app.core.search_vectors import SEARCH_VECTOR_FIELDS, drop_trigger_ddl, search_vector_sql, trigger_ddl
+
+
+# revision identifiers, used by Alembic.
+revision = '002_search_vector_triggers'
+down_revision = '141ed4bc8cef'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for table in SEARCH_VECTOR_FIELDS:
+        for statement in trigger_ddl(table):
+            op.execute(statement)
+        # Existing rows; use `manage_db.py backfill-search` instead on large tables
+        op.execute(f"UPDATE {table} SET search_vector = {search_vector_sql(table)}")
+
+    # Superseded by the GIN indexes on search_vector
+    op.execute("DROP INDEX IF EXISTS idx_lessons_fts")
+    op.execute("DROP INDEX IF EXISTS idx_questions_fts")
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTOR_FIELDS:
+        for statement in drop_trigger_ddl(table):
+            op.execute(statement)
+
+    # The previous expression indexes, used by the pre-trigger search queries
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_lessons_fts ON lessons "
+        "USING gin(to_tsvector('english', title || ' ' || COALESCE(description, '')))"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_questions_fts ON questions "
+        "USING gin(to_tsvector('english', stem || ' ' || COALESCE(explanation, '')))"
+    )
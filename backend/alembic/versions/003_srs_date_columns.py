@@ -0,0 +1,73 @@
+"""Typed SRS review dates, covering due-queue index and queue sizes
+
+Revision ID: 003_srs_date_columns
+Revises: 002_search_vector_triggers
+Create Date: 2025-09-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '003_srs_date_columns'
+down_revision = '002_search_vector_triggers'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored values are ISO dates or timestamps; the date part is enough
+    op.alter_column(
+        'srs_cards', 'next_review_date',
+        type_=sa.Date(), existing_nullable=False,
+        postgresql_using='left(next_review_date, 10)::date'
+    )
+    op.alter_column(
+        'srs_cards', 'last_reviewed_date',
+        type_=sa.Date(), existing_nullable=True,
+        postgresql_using='left(last_reviewed_date, 10)::date'
+    )
+
+    op.drop_index('idx_srs_cards_due', table_name='srs_cards')
+    op.execute("DROP INDEX IF EXISTS idx_srs_cards_review_queue")
+    op.create_index(
+        'idx_srs_cards_review_queue', 'srs_cards',
+        ['user_id', 'next_review_date', 'id'],
+        postgresql_include=['item_type', 'item_id', 'question_id', 'is_learning'],
+        postgresql_where=sa.text('NOT is_suspended AND NOT is_buried')
+    )
+
+    op.create_table('srs_queue_sizes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('queue_date', sa.Date(), nullable=False),
+        sa.Column('due_count', sa.Integer(), nullable=False),
+        sa.Column('learning_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'queue_date', name='uq_srs_queue_sizes_user_date')
+    )
+    op.create_index(op.f('ix_srs_queue_sizes_id'), 'srs_queue_sizes', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_srs_queue_sizes_id'), table_name='srs_queue_sizes')
+    op.drop_table('srs_queue_sizes')
+
+    op.drop_index('idx_srs_cards_review_queue', table_name='srs_cards')
+    op.create_index('idx_srs_cards_due', 'srs_cards', ['user_id', 'next_review_date'], unique=False)
+
+    op.alter_column(
+        'srs_cards', 'last_reviewed_date',
+        type_=sa.String(), existing_nullable=True,
+        postgresql_using="to_char(last_reviewed_date, 'YYYY-MM-DD')"
+    )
+    op.alter_column(
+        'srs_cards', 'next_review_date',
+        type_=sa.String(), existing_nullable=False,
+        postgresql_using="to_char(next_review_date, 'YYYY-MM-DD')"
+    )
@@ -0,0 +1,38 @@
+"""Remember submitted SRS review batches for idempotent retries
+
+Revision ID: 004_srs_review_batches
+Revises: 003_srs_date_columns
+Create Date: 2025-09-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '004_srs_review_batches'
+down_revision = '003_srs_date_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('srs_review_batches',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False),
+        sa.Column('results', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_srs_review_batches_created', 'srs_review_batches', ['created_at'], unique=False)
+    op.create_index(op.f('ix_srs_review_batches_id'), 'srs_review_batches', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_srs_review_batches_id'), table_name='srs_review_batches')
+    op.drop_index('idx_srs_review_batches_created', table_name='srs_review_batches')
+    op.drop_table('srs_review_batches')
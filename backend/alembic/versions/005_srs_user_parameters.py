@@ -0,0 +1,42 @@
+"""Per-user SRS memory parameters fitted by the offline optimizer
+
+Revision ID: 005_srs_user_parameters
+Revises: 004_srs_review_batches
+Create Date: 2025-09-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '005_srs_user_parameters'
+down_revision = '004_srs_review_batches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('srs_user_parameters',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('initial_stability', sa.Float(), nullable=False),
+        sa.Column('stability_growth', sa.Float(), nullable=False),
+        sa.Column('ease_factor', sa.Numeric(precision=4, scale=2), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False),
+        sa.Column('log_loss', sa.Float(), nullable=False),
+        sa.Column('fitted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.CheckConstraint('ease_factor >= 1.3 AND ease_factor <= 5.0', name='valid_fitted_ease_factor'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_srs_user_parameters_id'), 'srs_user_parameters', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_srs_user_parameters_id'), table_name='srs_user_parameters')
+    op.drop_table('srs_user_parameters')
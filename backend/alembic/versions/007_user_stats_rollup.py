@@ -0,0 +1,59 @@
+"""Trigger-maintained per-user statistics rollup
+
+Revision ID: 007_user_stats_rollup
+Revises: 006_user_achievement_states
+Create Date: 2025-10-08 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.core.user_stats import ROLLUP_COLUMNS, ROLLUP_FIELDS, drop_trigger_ddl, source_totals_sql, trigger_ddl
+
+
+# revision identifiers, used by Alembic.
+revision = '007_user_stats_rollup'
+down_revision = '006_user_achievement_states'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_stats',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('lessons_started', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('lessons_completed', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('completion_percentage_sum', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+        sa.Column('time_spent', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('correct_attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('attempt_time_sum', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('srs_cards', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('srs_mature_cards', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('ease_factor_sum', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_stats_id'), 'user_stats', ['id'], unique=False)
+
+    for table in ROLLUP_FIELDS:
+        for statement in trigger_ddl(table):
+            op.execute(statement)
+    # Existing users in one pass; `manage_db.py stats-check --repair` redoes this in batches
+    op.execute(
+        f"INSERT INTO user_stats (id, user_id, {', '.join(ROLLUP_COLUMNS)}) "
+        f"SELECT gen_random_uuid(), totals.* FROM ({source_totals_sql('(SELECT id AS user_id FROM users) AS u')}) AS totals"
+    )
+
+
+def downgrade() -> None:
+    for table in ROLLUP_FIELDS:
+        for statement in drop_trigger_ddl(table):
+            op.execute(statement)
+    op.drop_index(op.f('ix_user_stats_id'), table_name='user_stats')
+    op.drop_table('user_stats')
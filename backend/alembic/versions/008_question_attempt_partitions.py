@@ -0,0 +1,83 @@
+"""Partition question_attempts by month
+
+Revision ID: 008_question_attempt_partitions
+Revises: 007_user_stats_rollup
+Create Date: 2025-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.core.partitions import (
+    LEGACY, PARENT, STAGING, TABLE_INDEXES_SQL, partition_months, staging_ddl, swap_ddl
+)
+from app.core.user_stats import drop_trigger_ddl, trigger_ddl
+
+
+# revision identifiers, used by Alembic.
+revision = '008_question_attempt_partitions'
+down_revision = '007_user_stats_rollup'
+branch_labels = None
+depends_on = None
+
+# Indexes of the unpartitioned table (001_initial_schema)
+UNPARTITIONED_INDEXES = (
+    ('ix_question_attempts_id', ['id']),
+    ('idx_question_attempts_user', ['user_id']),
+    ('idx_question_attempts_question', ['question_id']),
+    ('idx_question_attempts_context', ['context_type', 'context_id']),
+    ('idx_question_attempts_user_question', ['user_id', 'question_id']),
+    ('idx_question_attempts_performance', ['user_id', 'is_correct', 'created_at']),
+)
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": PARENT}).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Large tables should be converted online first with
+    # `manage_db.py attempts-partition`; this is then a no-op
+    if _is_partitioned(bind):
+        return
+
+    # Locked before the copy so no attempt written meanwhile is left behind
+    op.execute(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE")
+    first = bind.execute(sa.text(f"SELECT min(created_at) FROM {PARENT}")).scalar()
+    for statement in staging_ddl(partition_months(first, settings.QUESTION_ATTEMPT_PARTITIONS_AHEAD)):
+        op.execute(statement)
+    op.execute(f"INSERT INTO {STAGING} SELECT * FROM {PARENT}")
+
+    legacy_indexes = bind.execute(sa.text(TABLE_INDEXES_SQL), {"table": PARENT}).scalars().all()
+    for statement in swap_ddl(list(legacy_indexes)):
+        op.execute(statement)
+    # The old table is kept as question_attempts_legacy, like
+    # `manage_db.py attempts-partition` does; drop it by hand once the
+    # partitioned table is verified
+
+
+def downgrade() -> None:
+    # The rebuilt table is copied from the partitioned one, so a kept
+    # legacy copy is stale and would block the next upgrade's rename
+    op.execute(f"DROP TABLE IF EXISTS {LEGACY}")
+    unpartitioned = f"{PARENT}_unpartitioned"
+    op.execute(f"CREATE TABLE {unpartitioned} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    op.execute(f"INSERT INTO {unpartitioned} SELECT * FROM {PARENT}")
+    for statement in drop_trigger_ddl(PARENT):
+        op.execute(statement)
+    op.drop_table(PARENT)
+    op.rename_table(unpartitioned, PARENT)
+
+    op.create_primary_key(f'{PARENT}_pkey', PARENT, ['id'])
+    op.create_foreign_key(f'{PARENT}_user_id_fkey', PARENT, 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_foreign_key(
+        f'{PARENT}_question_id_fkey', PARENT, 'questions', ['question_id'], ['id'], ondelete='CASCADE'
+    )
+    for name, columns in UNPARTITIONED_INDEXES:
+        op.create_index(name, PARENT, columns, unique=False)
+    for statement in trigger_ddl(PARENT):
+        op.execute(statement)
@@ -20,6 +20,18 @@ def get_api_router():
     except ImportError as e:
         print(f"Warning: Could not import auth router: {e}")
     
+    try:
+        from . import search
+        api_router.include_router(search.router)
+    except ImportError as e:
+        print(f"Warning: Could not import search router: {e}")
+    
+    try:
+        from . import srs
+        api_router.include_router(srs.router)
+    except ImportError as e:
+        print(f"Warning: Could not import SRS router: {e}")
+    
     # Add other routers here as they are implemented
     # from . import content
     # api_router.include_router(content.router)
@@ -2,11 +2,13 @@
 Complete Authentication API endpoints
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.revocation import revocation_list
+from app.core.security import verify_token
 from app.core.dependencies import (
     get_current_user, get_current_verified_user, 
     get_current_user_token, AuthDependencies
@@ -115,15 +117,31 @@ async def refresh_access_token(
 
 @router.post("/logout")
 async def logout_user(
+    refresh_token_data: Optional[Dict[str, str]] = None,
+    user_token: Dict[str, Any] = Depends(get_current_user_token),
     current_user: User = Depends(get_current_user)
 ):
     """
     Logout current user
     
-    Note: Since we're using stateless JWT tokens, logout is handled client-side
-    by removing tokens from storage. This endpoint is provided for consistency
-    and future token blacklisting implementation.
+    - **refresh_token**: Refresh token to revoke as well (optional)
+    
+    Revokes the access token used for this request, and the refresh token if
+    one is supplied. Revoked tokens are rejected until they expire.
     """
+    await revocation_list.revoke(user_token["jti"], user_token["exp"])
+    
+    refresh_token = (refresh_token_data or {}).get("refresh_token")
+    if refresh_token:
+        try:
+            payload = verify_token(refresh_token, "refresh")
+        except HTTPException:
+            payload = None
+        
+        # Only revoke refresh tokens that belong to the caller
+        if payload and payload.get("sub") == user_token["user_id"]:
+            await revocation_list.revoke(payload.get("jti"), payload["exp"])
+    
     logger.info(f"User logged out: {current_user.email}")
     
     return {"message": "Logout successful"}
@@ -438,6 +456,7 @@ async def update_user_status(
     user.is_active = is_active
     db.add(user)
     await db.commit()
+    AuthService.invalidate_cached_user(user.id)
     
     action = "activated" if is_active else "deactivated"
     logger.info(f"User {action}: {user.email}")
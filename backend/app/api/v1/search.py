@@ -0,0 +1,119 @@
+"""
+Search API endpoints
+"""
+
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.schemas.search import (
+    FacetCountsResponse, SearchResponse, SearchResult, SuggestResponse, SuggestionResult
+)
+from app.services.search_service import search_service, suggest_service
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+def search_filters(
+    kind: Optional[List[str]] = Query(None, description="lesson and/or question"),
+    level: Optional[List[str]] = Query(None, description="CEFR levels, e.g. A1"),
+    skill: Optional[List[str]] = Query(None),
+    topic: Optional[List[str]] = Query(None),
+    type: Optional[List[str]] = Query(None, description="Question types"),
+    difficulty: Optional[List[int]] = Query(None, description="Difficulty 1-5")
+) -> Dict[str, Optional[List[str]]]:
+    """Facet filters shared by search and facet counts"""
+    return {
+        "kind": kind,
+        "level": level,
+        "skill": skill,
+        "topic": topic,
+        "type": type,
+        "difficulty": [str(value) for value in difficulty] if difficulty else None,
+    }
+
+
+def require_search_index() -> None:
+    if not search_service.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is loading, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+
+
+@router.get("", response_model=SearchResponse)
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200, description="Search query"),
+    filters: Dict[str, Optional[List[str]]] = Depends(search_filters),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    fuzzy: bool = Query(True, description="Also match misspelled words")
+):
+    """
+    Search published lessons and questions
+    
+    Results are ranked with BM25 over lesson titles/descriptions and question
+    stems, tags and topics. Repeat a filter parameter to accept several values
+    (e.g. `level=A1&level=A2`); different filters must all match.
+    
+    Misspelled words ("grammer") are matched to the closest vocabulary terms
+    at a lower weight than exact matches; `corrections` lists what was used.
+    """
+    require_search_index()
+    
+    results = search_service.search(q, filters=filters, limit=limit, offset=offset, fuzzy=fuzzy)
+    
+    return SearchResponse(
+        query=q,
+        total=results.total,
+        limit=limit,
+        offset=offset,
+        results=[SearchResult(score=hit.score, **hit.meta) for hit in results.hits],
+        corrections=results.corrections
+    )
+
+
+@router.get("/facets", response_model=FacetCountsResponse)
+async def facet_counts(
+    q: Optional[str] = Query(None, max_length=200, description="Optional search query"),
+    filters: Dict[str, Optional[List[str]]] = Depends(search_filters)
+):
+    """
+    Count published content per level, skill, topic, type and difficulty
+    
+    Counts come from in-memory bitsets, not GROUP BY queries. Each facet's
+    counts ignore that facet's own filter, so every alternative value shows
+    how many results selecting it would give.
+    """
+    require_search_index()
+    
+    counts = search_service.facet_counts(filters=filters, query=q)
+    return FacetCountsResponse(total=counts.total, facets=counts.facets)
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    q: str = Query(..., min_length=1, max_length=100, description="Text typed so far"),
+    kind: Optional[List[str]] = Query(None, description="lesson, topic, subtopic and/or tag"),
+    limit: int = Query(10, ge=1, le=20)
+):
+    """
+    Typeahead suggestions for lessons, topics, subtopics and tags
+    
+    Matches any word start in the suggestion ("perf" finds "Present Perfect"),
+    ranked by lesson views and completions.
+    """
+    if not suggest_service.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Suggestions are loading, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    suggestions = suggest_service.suggest(q, limit=limit, kinds=kind)
+    return SuggestResponse(
+        query=q,
+        suggestions=[
+            SuggestionResult(text=s.text, kind=s.kind, ref=s.ref) for s in suggestions
+        ]
+    )
@@ -0,0 +1,117 @@
+"""
+Spaced repetition (SRS) API endpoints
+"""
+
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db, get_read_db
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.srs import (
+    DueCard, DueQueueResponse, ForecastDay, ForecastResponse, QueueSizeResponse,
+    ReviewBatchRequest, ReviewBatchResponse
+)
+from app.services.srs_service import SRSService
+
+router = APIRouter(prefix="/srs", tags=["SRS"])
+
+
+@router.get("/queue", response_model=DueQueueResponse)
+async def get_due_queue(
+    limit: int = Query(50, ge=1, le=500, description="Maximum cards to return"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the cards due for review today, most overdue first
+    
+    Suspended and buried cards are excluded. `due_count` is the size of the
+    whole queue, which may be larger than `limit`.
+    """
+    today = datetime.now(timezone.utc).date()
+    due_count, cards = await SRSService(db).due_queue(current_user.id, limit=limit, today=today)
+    
+    return DueQueueResponse(
+        date=today,
+        due_count=due_count,
+        cards=[DueCard.model_validate(card) for card in cards]
+    )
+
+
+@router.get("/queue/tomorrow", response_model=QueueSizeResponse)
+async def get_tomorrow_queue_size(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get how many cards will be due tomorrow (dashboard)
+    
+    Sizes are precomputed by the nightly `manage_db.py srs-reschedule` run
+    and refreshed whenever the user submits reviews.
+    """
+    tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+    return QueueSizeResponse(**await SRSService(db).queue_size(current_user.id, tomorrow))
+
+
+@router.get("/forecast", response_model=ForecastResponse)
+async def get_workload_forecast(
+    days: int = Query(90, ge=30, le=365, description="Forecast horizon in days"),
+    runs: int = Query(10, ge=1, le=50, description="Monte Carlo runs"),
+    new_cards_per_day: int = Query(0, ge=0, le=200, description="New cards added per day"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Project the daily review load of the user's cards
+    
+    Simulates the scheduler day by day with recall drawn from each card's
+    history; `p10`/`p90` bound the daily count across simulation runs. Use
+    `new_cards_per_day` to see what keeping up the current pace would cost.
+    """
+    forecast = await SRSService(db).forecast(
+        current_user.id, days=days, runs=runs, new_cards_per_day=new_cards_per_day
+    )
+    peak_date, peak_reviews = forecast.peak()
+    
+    return ForecastResponse(
+        start_date=forecast.start,
+        days=forecast.days,
+        runs=forecast.runs,
+        new_cards_per_day=new_cards_per_day,
+        peak_date=peak_date,
+        peak_reviews=peak_reviews,
+        daily=[
+            ForecastDay(date=day, mean=mean, p10=p10, p90=p90)
+            for day, mean, p10, p90 in zip(
+                forecast.dates(), forecast.mean.tolist(), forecast.p10.tolist(), forecast.p90.tolist()
+            )
+        ]
+    )
+
+
+@router.post("/reviews", response_model=ReviewBatchResponse)
+async def submit_reviews(
+    batch: ReviewBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Submit the grades of a review session in one request
+    
+    - **batch_id**: Client-generated UUID; resend the same id when retrying
+    - **reviews**: card_id, grade (0-5) and response_time_ms per card
+    
+    All cards are updated in one transaction with a fixed number of
+    statements, and question cards get a QuestionAttempt with
+    context_type `srs`. Resubmitting a batch id returns the original
+    results with `replayed: true` instead of grading the cards again.
+    """
+    results, replayed = await SRSService(db).submit_review_batch(
+        current_user.id,
+        batch.batch_id,
+        [(review.card_id, review.grade, review.response_time_ms) for review in batch.reviews]
+    )
+    
+    return ReviewBatchResponse(batch_id=batch.batch_id, replayed=replayed, results=results)
@@ -2,8 +2,13 @@
 Database configuration and connection management
 """
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import itertools
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, Dict, Iterator, List, Optional, Union
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
 from sqlalchemy.pool import NullPool
 import logging
 
@@ -21,25 +26,252 @@ engine = create_async_engine(
     echo=settings.DEBUG,  # Log SQL queries in debug mode
 )
 
-# Create async session factory
+# Read replica engines (empty when no replicas are configured)
+replica_engines: List[AsyncEngine] = [
+    create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"),
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=settings.DEBUG,
+    )
+    for url in settings.database_replica_urls
+]
+
+
+class ReplicaRouter:
+    """
+    Chooses a read replica for replica-eligible reads
+    
+    Replicas are polled for replication lag; any replica that is unreachable
+    or lagging more than ``max_lag`` seconds is skipped until it catches up.
+    With no healthy replica, reads fall back to the primary.
+    """
+    
+    LAG_QUERY = text("""
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+    """)
+    
+    def __init__(self, engines: List[AsyncEngine], max_lag: float = 5.0, check_interval: float = 5.0):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # Replicas start healthy so reads use them before the first check
+        self.lag: Dict[int, Optional[float]] = {i: 0.0 for i in range(len(engines))}
+        self._cycle = itertools.cycle(range(len(engines))) if engines else None
+        self._monitor_task: Optional[asyncio.Task] = None
+    
+    def healthy(self, index: int) -> bool:
+        lag = self.lag.get(index)
+        return lag is not None and lag <= self.max_lag
+    
+    def choose(self) -> Optional[AsyncEngine]:
+        """Pick the next healthy replica round-robin, or None to use the primary"""
+        for _ in range(len(self.engines)):
+            index = next(self._cycle)
+            if self.healthy(index):
+                return self.engines[index]
+        return None
+    
+    async def check_lag(self) -> None:
+        """Measure replication lag on every replica"""
+        for index, replica in enumerate(self.engines):
+            try:
+                async with replica.connect() as conn:
+                    self.lag[index] = float((await conn.execute(self.LAG_QUERY)).scalar() or 0)
+            except Exception as e:
+                logger.warning(f"Replica {index} lag check failed: {e}")
+                self.lag[index] = None
+    
+    async def _monitor_forever(self) -> None:
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_interval)
+    
+    def start(self) -> None:
+        """Start polling replica lag in the background"""
+        if self.engines and self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor_forever())
+    
+    async def stop(self) -> None:
+        """Stop polling replica lag"""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_SECONDS,
+)
+
+
+class TrackedSession(Session):
+    """
+    Session that records whether its current transaction has written anything.
+    Lets get_db skip the COMMIT round-trip for read-only requests.
+    """
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _mark_write_statements(orm_execute_state):
+    # Anything other than a SELECT (DML, raw text()) is treated as a write
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _reset_write_flag(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("has_writes", None)
+
+
+def run_after_commit(session: Union[AsyncSession, Session], callback: Callable[[], None]) -> None:
+    """
+    Call ``callback`` once the session's current transaction commits.
+    It is dropped if the transaction rolls back instead, so in-memory side
+    effects (buffered counters) never count writes that were not stored.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session):
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"After-commit callback failed: {e}")
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+
+class RoutingSession(TrackedSession):
+    """
+    Session that can send reads to a replica
+    
+    SELECTs go to a replica only inside ``read_from_replica()`` (or in a
+    ReadOnlySession), and only while the current transaction has not
+    written, so a request always reads its own writes. Everything else uses
+    the primary.
+    """
+    
+    router = replica_router
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            self.info.get("replica_reads")
+            and not self._flushing
+            and not self.info.get("has_writes")
+            and (clause is None or getattr(clause, "is_select", False))
+        ):
+            replica = self.router.choose()
+            if replica is not None:
+                return replica.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReadOnlySession(RoutingSession):
+    """
+    Session whose transactions are opened with SET TRANSACTION READ ONLY.
+    All of its reads are replica-eligible.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.info["replica_reads"] = True
+
+
+@event.listens_for(ReadOnlySession, "after_begin")
+def _set_transaction_read_only(session, transaction, connection):
+    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+# Create async session factory.
+# Sessions only check out a pooled connection on their first query.
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Read-only session factory for endpoints that never write
+ReadOnlySessionLocal = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
 
+@contextmanager
+def read_from_replica(session: AsyncSession) -> Iterator[AsyncSession]:
+    """
+    Let SELECTs issued inside the block use a read replica
+    
+    Reads stay on the primary once the session's transaction has written.
+    Use for work that tolerates replication lag, e.g. browsing and statistics.
+    """
+    previous = session.info.get("replica_reads")
+    session.info["replica_reads"] = True
+    try:
+        yield session
+    finally:
+        session.info["replica_reads"] = previous
+
+
+def session_has_writes(session: AsyncSession) -> bool:
+    """
+    Check whether a session has anything to commit
+    
+    Covers statements already sent in the current transaction and pending
+    ORM changes that have not been flushed yet.
+    """
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to get database session.
     Used with FastAPI's Depends() for dependency injection.
+    
+    A connection is only checked out if the request actually queries, and
+    the closing COMMIT is skipped when nothing was written.
     """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session_has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -47,6 +279,18 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get a read-only database session.
+    Writes fail at the database, and the session is never committed.
+    """
+    async with ReadOnlySessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db() -> None:
     """
     Initialize database connection and create tables if needed.
@@ -65,6 +309,9 @@ async def init_db() -> None:
                 # Uncomment the next line only for initial development
                 # await conn.run_sync(Base.metadata.create_all)
                 pass
+        
+        # Start replica lag monitoring (no-op without replicas)
+        replica_router.start()
                 
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -76,7 +323,10 @@ async def close_db() -> None:
     Close database connections.
     This should be called on application shutdown.
     """
+    await replica_router.stop()
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
     logger.info("Database connections closed")
 
 
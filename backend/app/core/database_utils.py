@@ -2,20 +2,138 @@
 Database utility functions for common operations
 """
 
-from typing import Optional, List, Dict, Any, Type, TypeVar
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import (
+    Optional, List, Dict, Any, Type, TypeVar, Callable, Iterable, AsyncIterable, AsyncIterator, Sequence, Union
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, text, Index
+from sqlalchemy import JSON, Column, bindparam, select, func, text, tuple_, Index
 from sqlalchemy.orm import selectinload, joinedload
 from sqlalchemy.sql import Select
 import logging
 
-from .database import AsyncSessionLocal
+from .cache import TTLCache
+from .database import AsyncSessionLocal, read_from_replica
 from ..models.base import Base
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=Base)
 
+# Exact counts for keyset pagination, keyed by compiled count query
+_count_cache: TTLCache[int] = TTLCache(maxsize=1000, ttl=60)
+
+
+def encode_cursor(sort_value: Any, id_value: Any) -> str:
+    """Encode a (sort key, id) position as an opaque URL-safe cursor"""
+    def plain(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (uuid.UUID, Decimal)):
+            return str(value)
+        return value
+    
+    raw = json.dumps([plain(sort_value), plain(id_value)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_column: Any, id_column: Any) -> tuple:
+    """
+    Decode a cursor back into typed (sort key, id) values
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    def typed(column: Any, value: Any) -> Any:
+        if value is None:
+            return None
+        python_type = column.type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type in (uuid.UUID, Decimal):
+            return python_type(value)
+        return value
+    
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, id_value = json.loads(base64.urlsafe_b64decode(padded))
+        return typed(sort_column, sort_value), typed(id_column, id_value)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def _copy_converter(column: Column) -> Optional[Callable[[Any], Any]]:
+    """Build a converter from JSON-friendly input to what binary COPY expects"""
+    if isinstance(column.type, JSON):
+        # SQLAlchemy's asyncpg JSON/JSONB codecs take JSON text
+        return lambda value: None if value is None else json.dumps(value)
+    
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    
+    parsers = {
+        datetime: datetime.fromisoformat,
+        date: date.fromisoformat,
+        uuid.UUID: uuid.UUID,
+        Decimal: Decimal,
+    }
+    parse = parsers.get(python_type)
+    if parse is None:
+        return None
+    return lambda value: parse(value) if isinstance(value, str) else value
+
+
+def _column_default(column: Column) -> Callable[[], Any]:
+    """Get a zero-argument factory for a column's Python-side default"""
+    default = column.default
+    if default is None:
+        return lambda: None
+    if default.is_callable:
+        return lambda: default.arg(None)
+    return lambda: default.arg
+
+
+async def _aiter_rows(
+    rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(rows, '__aiter__'):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+def _to_list(values: Sequence[Any]) -> List[Any]:
+    # NumPy arrays become plain Python scalars, which database drivers accept
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def _array_type(column: Column) -> str:
+    """PostgreSQL array type used to ship a column's values through unnest"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return "text[]"
+    # Wide base types; assignment casts narrow them (e.g. float8 -> numeric(4,2))
+    return {
+        uuid.UUID: "uuid[]",
+        int: "int8[]",
+        float: "float8[]",
+        Decimal: "float8[]",
+        bool: "bool[]",
+        date: "date[]",
+        datetime: "timestamptz[]",
+    }.get(python_type, "text[]")
+
 
 class DatabaseUtils:
     """Utility class for common database operations"""
@@ -24,16 +142,11 @@ class DatabaseUtils:
     async def create_indexes_if_not_exist(session: AsyncSession) -> None:
         """Create performance indexes if they don't exist"""
         try:
-            # Full-text search indexes for lessons and questions (without CONCURRENTLY in transaction)
-            await session.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_lessons_fts 
-                ON lessons USING gin(to_tsvector('english', title || ' ' || COALESCE(description, '')))
-            """))
-            
-            await session.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_questions_fts 
-                ON questions USING gin(to_tsvector('english', stem || ' ' || COALESCE(explanation, '')))
-            """))
+            # Full-text search uses the stored search_vector columns (see
+            # app.core.search_vectors); the old per-expression indexes are unused.
+            # The SRS due-queue index is declared on SRSCard.
+            await session.execute(text("DROP INDEX IF EXISTS idx_lessons_fts"))
+            await session.execute(text("DROP INDEX IF EXISTS idx_questions_fts"))
             
             # Composite indexes for common queries
             await session.execute(text("""
@@ -46,12 +159,6 @@ class DatabaseUtils:
                 ON question_attempts (user_id, created_at DESC, is_correct)
             """))
             
-            await session.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_srs_cards_review_queue 
-                ON srs_cards (user_id, next_review_date, is_suspended) 
-                WHERE is_suspended = false
-            """))
-            
             await session.commit()
             logger.info("Performance indexes created successfully")
             
@@ -75,8 +182,9 @@ class DatabaseUtils:
             for rel in relationships:
                 query = query.options(selectinload(getattr(model, rel)))
         
-        result = await session.execute(query)
-        return result.scalar_one_or_none()
+        with read_from_replica(session):
+            result = await session.execute(query)
+            return result.scalar_one_or_none()
     
     @staticmethod
     async def get_by_field(
@@ -93,8 +201,9 @@ class DatabaseUtils:
             for rel in relationships:
                 query = query.options(selectinload(getattr(model, rel)))
         
-        result = await session.execute(query)
-        return result.scalar_one_or_none()
+        with read_from_replica(session):
+            result = await session.execute(query)
+            return result.scalar_one_or_none()
     
     @staticmethod
     async def get_paginated(
@@ -112,15 +221,16 @@ class DatabaseUtils:
         # Calculate offset
         offset = (page - 1) * per_page
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
-        
-        # Get paginated results
-        paginated_query = query.offset(offset).limit(per_page)
-        result = await session.execute(paginated_query)
-        items = result.scalars().all()
+        with read_from_replica(session):
+            # Get total count
+            count_query = select(func.count()).select_from(query.subquery())
+            total_result = await session.execute(count_query)
+            total = total_result.scalar()
+            
+            # Get paginated results
+            paginated_query = query.offset(offset).limit(per_page)
+            result = await session.execute(paginated_query)
+            items = result.scalars().all()
         
         # Calculate pagination metadata
         total_pages = (total + per_page - 1) // per_page
@@ -141,6 +251,103 @@ class DatabaseUtils:
             }
         }
     
+    @staticmethod
+    async def get_keyset_paginated(
+        session: AsyncSession,
+        query: Select,
+        model: Type[T],
+        sort_field: str = 'created_at',
+        descending: bool = True,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        max_per_page: int = 100,
+        total: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get a page of results positioned by an opaque cursor over (sort key, id)
+        
+        Unlike get_paginated there is no OFFSET, so with an index on
+        (sort_field, id) every page costs the same as the first. The sort
+        column must be non-nullable.
+        
+        Args:
+            session: Database session
+            query: Base query selecting ``model``
+            model: Model being paginated
+            sort_field: Column to order by (ties broken by id)
+            descending: Newest/highest first when True
+            cursor: ``next_cursor`` from the previous page, None for the first page
+            per_page: Page size
+            max_per_page: Upper bound for page size
+            total: None to skip counting, 'estimate' for the planner's row
+                estimate of the whole table (pg_class.reltuples), or 'cached'
+                for an exact count cached for a minute
+        
+        Raises:
+            ValueError: If the cursor or total mode is invalid
+        """
+        per_page = min(max_per_page, max(1, per_page))
+        sort_column = getattr(model, sort_field)
+        id_column = model.id
+        
+        page_query = query.order_by(None)
+        if cursor:
+            sort_value, id_value = decode_cursor(cursor, sort_column, id_column)
+            position = tuple_(sort_column, id_column)
+            page_query = page_query.where(
+                position < tuple_(sort_value, id_value) if descending
+                else position > tuple_(sort_value, id_value)
+            )
+        
+        if descending:
+            page_query = page_query.order_by(sort_column.desc(), id_column.desc())
+        else:
+            page_query = page_query.order_by(sort_column.asc(), id_column.asc())
+        
+        with read_from_replica(session):
+            # Fetch one extra row to learn whether another page exists
+            result = await session.execute(page_query.limit(per_page + 1))
+            items = result.scalars().all()
+            
+            total_count = None
+            if total == 'estimate':
+                estimate = await session.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                    {"table": model.__tablename__}
+                )
+                total_count = estimate.scalar()
+                # reltuples is -1 for tables that were never analyzed
+                if total_count is not None and total_count < 0:
+                    total_count = None
+            elif total == 'cached':
+                count_query = select(func.count()).select_from(query.order_by(None).subquery())
+                compiled = count_query.compile()
+                cache_key = (str(compiled), repr(sorted(compiled.params.items())))
+                total_count = _count_cache.get(cache_key)
+                if total_count is None:
+                    total_count = (await session.execute(count_query)).scalar()
+                    _count_cache.set(cache_key, total_count)
+            elif total is not None:
+                raise ValueError(f"Unsupported total mode: {total}")
+        
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        next_cursor = None
+        if has_next:
+            last = items[-1]
+            next_cursor = encode_cursor(getattr(last, sort_field), last.id)
+        
+        return {
+            'items': items,
+            'pagination': {
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': next_cursor,
+                'total': total_count,
+                'total_is_estimate': total == 'estimate'
+            }
+        }
+    
     @staticmethod
     async def bulk_create(
         session: AsyncSession,
@@ -153,27 +360,222 @@ class DatabaseUtils:
         await session.flush()  # Get IDs without committing
         return instances
     
+    @staticmethod
+    async def bulk_copy(
+        session: AsyncSession,
+        model: Type[T],
+        rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        on_conflict: Optional[str] = None,
+        conflict_columns: Optional[Iterable[str]] = None,
+        update_columns: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Bulk insert rows with PostgreSQL binary COPY (asyncpg only)
+        
+        Meant for loads far beyond what bulk_create handles: rows are streamed
+        from a sync or async iterable straight into COPY without building ORM
+        instances. The column set is taken from the first row. IDs and other
+        Python-side defaults are filled in client-side, and columns with only
+        a server default are left to the database. Runs inside the session's
+        transaction.
+        
+        Args:
+            session: Database session
+            model: Target model
+            rows: Dicts keyed by column name; ISO strings are accepted for
+                date/time, UUID and numeric columns
+            on_conflict: None for a plain COPY, 'nothing' or 'update' to load
+                through a staging table with INSERT ... ON CONFLICT
+            conflict_columns: Conflict target for the upsert (defaults to
+                the primary key, which includes the partition column on
+                partitioned tables)
+            update_columns: Columns overwritten on conflict with 'update'
+                (defaults to every copied non-key column)
+        
+        Returns:
+            Number of rows inserted or upserted
+        """
+        if on_conflict not in (None, 'nothing', 'update'):
+            raise ValueError(f"Unsupported on_conflict mode: {on_conflict}")
+        
+        iterator = _aiter_rows(rows)
+        try:
+            first = await iterator.__anext__()
+        except StopAsyncIteration:
+            return 0
+        
+        table = model.__table__
+        columns = [
+            column for column in table.columns
+            if column.key in first or column.default is not None
+        ]
+        plan = [
+            (column.key, _copy_converter(column), _column_default(column))
+            for column in columns
+        ]
+        
+        def to_record(row: Dict[str, Any]) -> tuple:
+            values = []
+            for key, convert, default in plan:
+                value = row[key] if key in row else default()
+                values.append(convert(value) if convert else value)
+            return tuple(values)
+        
+        async def records():
+            yield to_record(first)
+            async for row in iterator:
+                yield to_record(row)
+        
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        # The COPY bypasses the ORM, so tell get_db there is something to commit
+        session.info["has_writes"] = True
+        
+        names = [column.name for column in columns]
+        if on_conflict is None:
+            status = await driver.copy_records_to_table(
+                table.name, records=records(), columns=names
+            )
+            return int(status.split()[-1])
+        
+        staging = f"_copy_staging_{table.name}"
+        column_list = ", ".join(f'"{name}"' for name in names)
+        primary_key = [column.name for column in table.primary_key.columns]
+        conflict_keys = list(conflict_columns) if conflict_columns is not None else primary_key
+        if on_conflict == 'nothing':
+            action = "DO NOTHING"
+        else:
+            if update_columns is None:
+                update_columns = [
+                    name for name in names if name not in conflict_keys and name not in primary_key
+                ]
+            action = "DO UPDATE SET " + ", ".join(
+                f'"{name}" = EXCLUDED."{name}"' for name in update_columns
+            )
+        
+        await driver.execute(
+            f'CREATE TEMP TABLE "{staging}" (LIKE "{table.name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+        )
+        try:
+            await driver.copy_records_to_table(staging, records=records(), columns=names)
+            status = await driver.execute(
+                f'INSERT INTO "{table.name}" ({column_list}) '
+                f'SELECT {column_list} FROM "{staging}" '
+                f'ON CONFLICT ({", ".join(conflict_keys)}) {action}'
+            )
+        finally:
+            await driver.execute(f'DROP TABLE IF EXISTS "{staging}"')
+        return int(status.split()[-1])
+    
     @staticmethod
     async def bulk_update(
         session: AsyncSession,
         model: Type[T],
-        updates: List[Dict[str, Any]]
+        updates: List[Dict[str, Any]],
+        chunk_size: int = 1000
     ) -> None:
-        """Bulk update multiple instances"""
+        """
+        Bulk update multiple instances
+        
+        Rows are grouped by the set of columns they change and each group is
+        sent as one executemany UPDATE per chunk, instead of one statement per
+        row. The caller's dicts are not modified.
+        """
         if not updates:
             return
         
-        # Group updates by model
+        # Group updates by the columns they set
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
         for update_data in updates:
             if 'id' not in update_data:
                 raise ValueError("Each update must include an 'id' field")
             
-            instance_id = update_data.pop('id')
-            await session.execute(
-                model.__table__.update()
-                .where(model.id == instance_id)
-                .values(**update_data)
+            columns = tuple(sorted(key for key in update_data if key != 'id'))
+            if not columns:
+                continue
+            groups.setdefault(columns, []).append(
+                {f"b_{key}": value for key, value in update_data.items()}
             )
+        
+        table = model.__table__
+        for columns, params in groups.items():
+            # Bind names are prefixed so they cannot clash with column names
+            statement = (
+                table.update()
+                .where(table.c.id == bindparam('b_id'))
+                .values({column: bindparam(f"b_{column}") for column in columns})
+            )
+            for start in range(0, len(params), chunk_size):
+                await session.execute(statement, params[start:start + chunk_size])
+    
+    @staticmethod
+    async def bulk_update_columns(
+        session: AsyncSession,
+        model: Type[T],
+        ids: Sequence[Any],
+        values: Dict[str, Sequence[Any]],
+        constants: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50000
+    ) -> None:
+        """
+        Set-based update from column arrays: row i of every array belongs to ids[i]
+        
+        On PostgreSQL each chunk is a single ``UPDATE ... FROM unnest(...)``
+        statement with one array parameter per column, so a million rows cost
+        a few statements rather than a million. Other databases fall back to
+        bulk_update.
+        
+        Args:
+            session: Database session
+            model: Model to update
+            ids: Primary keys
+            values: Column name to per-row values (lists or NumPy arrays)
+            constants: Column name to a value applied to every row
+            chunk_size: Rows per statement
+        """
+        constants = constants or {}
+        columns = list(values)
+        for name, column_values in values.items():
+            if len(column_values) != len(ids):
+                raise ValueError(f"Column {name} has {len(column_values)} values for {len(ids)} ids")
+        if not len(ids):
+            return
+        
+        lists = {name: _to_list(column_values) for name, column_values in values.items()}
+        id_list = _to_list(ids)
+        
+        if session.bind.dialect.name != "postgresql":
+            updates = [
+                {"id": row_id, **{name: lists[name][i] for name in columns}, **constants}
+                for i, row_id in enumerate(id_list)
+            ]
+            await DatabaseUtils.bulk_update(session, model, updates, chunk_size=chunk_size)
+            return
+        
+        table = model.__table__
+        preparer = session.bind.dialect.identifier_preparer
+        assignments = [
+            f"{preparer.quote_identifier(name)} = v.{preparer.quote_identifier(name)}" for name in columns
+        ] + [
+            f"{preparer.quote_identifier(name)} = :c_{name}" for name in constants
+        ]
+        arrays = ", ".join(
+            [f"CAST(:a_id AS {_array_type(table.c.id)})"]
+            + [f"CAST(:a_{name} AS {_array_type(table.c[name])})" for name in columns]
+        )
+        aliases = ", ".join(["id"] + [preparer.quote_identifier(name) for name in columns])
+        statement = text(
+            f"UPDATE {preparer.format_table(table)} AS t SET {', '.join(assignments)} "
+            f"FROM unnest({arrays}) AS v({aliases}) WHERE t.id = v.id"
+        )
+        
+        for start in range(0, len(id_list), chunk_size):
+            end = start + chunk_size
+            params = {"a_id": id_list[start:end]}
+            params.update({f"a_{name}": lists[name][start:end] for name in columns})
+            params.update({f"c_{name}": value for name, value in constants.items()})
+            await session.execute(statement, params)
     
     @staticmethod
     async def soft_delete(
@@ -192,6 +594,28 @@ class DatabaseUtils:
         )
         return result.rowcount > 0
     
+    @staticmethod
+    def build_full_text_query(model: Type[T], search_term: str, search_fields: List[str]):
+        """Build the ranked full-text select used by search_full_text"""
+        ts_query = func.plainto_tsquery('english', search_term)
+        if hasattr(model, 'search_vector'):
+            search_vector = model.search_vector
+        else:
+            search_vector = func.to_tsvector(
+                'english',
+                func.concat(*[
+                    func.coalesce(getattr(model, field), '') + ' '
+                    for field in search_fields
+                ])
+            )
+        
+        return select(
+            model,
+            func.ts_rank(search_vector, ts_query).label('rank')
+        ).where(
+            search_vector.op('@@')(ts_query)
+        )
+    
     @staticmethod
     async def search_full_text(
         session: AsyncSession,
@@ -201,23 +625,15 @@ class DatabaseUtils:
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 50
     ) -> List[T]:
-        """Perform full-text search on specified fields"""
-        # Build search vector from specified fields
-        search_vector = func.to_tsvector(
-            'english',
-            func.concat(*[
-                func.coalesce(getattr(model, field), '') + ' '
-                for field in search_fields
-            ])
-        )
+        """
+        Perform full-text search on specified fields
         
-        # Build query with search ranking
-        query = select(
-            model,
-            func.ts_rank(search_vector, func.plainto_tsquery('english', search_term)).label('rank')
-        ).where(
-            search_vector.op('@@')(func.plainto_tsquery('english', search_term))
-        )
+        Models with a stored ``search_vector`` column (lessons, questions) are
+        matched against it so the GIN index is used and results are ranked
+        by the weighted vector; ``search_fields`` only applies to models
+        without one, where the vector is computed per row.
+        """
+        query = DatabaseUtils.build_full_text_query(model, search_term, search_fields)
         
         # Apply additional filters
         if filters:
@@ -228,71 +644,25 @@ class DatabaseUtils:
         # Order by relevance and limit results
         query = query.order_by(text('rank DESC')).limit(limit)
         
-        result = await session.execute(query)
-        return [row[0] for row in result.all()]  # Return only the model instances
+        with read_from_replica(session):
+            result = await session.execute(query)
+            return [row[0] for row in result.all()]  # Return only the model instances
     
     @staticmethod
     async def get_user_statistics(
         session: AsyncSession,
         user_id: str
     ) -> Dict[str, Any]:
-        """Get comprehensive user statistics"""
-        from ..models.progress import LessonProgress, QuestionAttempt
-        from ..models.srs import SRSCard
-        
-        # Lesson progress stats
-        lesson_stats = await session.execute(
-            select(
-                func.count(LessonProgress.id).label('total_lessons'),
-                func.count(LessonProgress.id).filter(LessonProgress.is_completed == True).label('completed_lessons'),
-                func.avg(LessonProgress.completion_percentage).label('avg_completion'),
-                func.sum(LessonProgress.time_spent).label('total_time_spent')
-            ).where(LessonProgress.user_id == user_id)
-        )
-        lesson_data = lesson_stats.first()
-        
-        # Question attempt stats
-        question_stats = await session.execute(
-            select(
-                func.count(QuestionAttempt.id).label('total_attempts'),
-                func.count(QuestionAttempt.id).filter(QuestionAttempt.is_correct == True).label('correct_attempts'),
-                func.avg(QuestionAttempt.time_taken).label('avg_time_per_question')
-            ).where(QuestionAttempt.user_id == user_id)
-        )
-        question_data = question_stats.first()
-        
-        # SRS stats
-        srs_stats = await session.execute(
-            select(
-                func.count(SRSCard.id).label('total_cards'),
-                func.count(SRSCard.id).filter(SRSCard.is_learning == False).label('mature_cards'),
-                func.avg(SRSCard.ease_factor).label('avg_ease_factor')
-            ).where(SRSCard.user_id == user_id)
-        )
-        srs_data = srs_stats.first()
+        """
+        Get comprehensive user statistics
         
-        return {
-            'lessons': {
-                'total': lesson_data.total_lessons or 0,
-                'completed': lesson_data.completed_lessons or 0,
-                'avg_completion': float(lesson_data.avg_completion or 0),
-                'total_time_spent': lesson_data.total_time_spent or 0
-            },
-            'questions': {
-                'total_attempts': question_data.total_attempts or 0,
-                'correct_attempts': question_data.correct_attempts or 0,
-                'accuracy_rate': (
-                    (question_data.correct_attempts / question_data.total_attempts * 100)
-                    if question_data.total_attempts else 0
-                ),
-                'avg_time_per_question': float(question_data.avg_time_per_question or 0)
-            },
-            'srs': {
-                'total_cards': srs_data.total_cards or 0,
-                'mature_cards': srs_data.mature_cards or 0,
-                'avg_ease_factor': float(srs_data.avg_ease_factor or 2.5)
-            }
-        }
+        Read from the trigger-maintained user_stats rollup, so the cost does
+        not grow with the user's history.
+        """
+        from .user_stats import get_user_stats
+        
+        with read_from_replica(session):
+            return await get_user_stats(session, user_id)
 
 
 # Convenience functions for common operations
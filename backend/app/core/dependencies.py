@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.security import extract_user_from_token, RoleChecker
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthService, user_cache
 from app.models.user import User
 
 
@@ -49,7 +49,11 @@ async def get_current_user(
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
-    Get current user from database using token information
+    Get current user using token information
+    
+    The user is served from the short-TTL snapshot cache when possible, so
+    most requests skip the users lookup. Account changes made through
+    AuthService invalidate the snapshot immediately.
     
     Args:
         user_token: User information from token
@@ -62,7 +66,7 @@ async def get_current_user(
         HTTPException: If user not found or inactive
     """
     auth_service = AuthService(db)
-    user = await auth_service.get_user_by_id(user_token["user_id"])
+    user = await auth_service.get_cached_user(user_token["user_id"])
     
     if not user:
         raise HTTPException(
@@ -146,6 +150,10 @@ def require_role(required_role: str):
     """
     Dependency factory for role-based access control
     
+    Roles are checked against the token scopes only, so these endpoints never
+    open a database session. A user whose cached snapshot shows the account
+    as deactivated is still rejected.
+    
     Args:
         required_role: Required role for access
         
@@ -169,6 +177,13 @@ def require_role(required_role: str):
         Raises:
             HTTPException: If user doesn't have required role
         """
+        snapshot = user_cache.get(user_token["user_id"])
+        if snapshot is not None and not snapshot["is_active"]:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User account is deactivated"
+            )
+        
         user_scopes = user_token.get("scopes", [])
         
         if not role_checker(user_scopes):
@@ -235,7 +250,7 @@ async def get_optional_user(
         user_info = extract_user_from_token(token)
         
         auth_service = AuthService(db)
-        user = await auth_service.get_user_by_id(user_info["user_id"])
+        user = await auth_service.get_cached_user(user_info["user_id"])
         
         if user and user.is_active:
             return user
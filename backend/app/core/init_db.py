@@ -10,6 +10,9 @@ from sqlalchemy import text
 from .config import settings
 from .database import engine, AsyncSessionLocal
 from .database_utils import DatabaseUtils
+from .partitions import ensure_partitions
+from .search_vectors import install_search_triggers
+from .user_stats import install_user_stats_triggers
 from ..models.base import Base
 
 logger = logging.getLogger(__name__)
@@ -65,6 +68,11 @@ async def create_tables():
             # Create all tables
             await conn.run_sync(Base.metadata.create_all)
             logger.info("All tables created successfully")
+        
+        async with AsyncSessionLocal() as session:
+            await install_search_triggers(session)
+            await install_user_stats_triggers(session)
+            await ensure_partitions(session, settings.QUESTION_ATTEMPT_PARTITIONS_AHEAD)
             
     except Exception as e:
         logger.error(f"Failed to create tables: {e}")
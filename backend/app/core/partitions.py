@@ -0,0 +1,483 @@
+"""
+Monthly range partitions for question_attempts
+
+question_attempts is partitioned by RANGE (created_at) with one partition per
+calendar month (``question_attempts_2025_03``, bounds in UTC) and a DEFAULT
+partition for rows outside every range. Time-range scans prune to the months
+they touch and use the BRIN index on created_at, and old months leave the
+table by detaching a partition instead of a bulk DELETE.
+
+``ensure_partitions`` creates upcoming months ahead of the writes,
+``apply_retention`` detaches months past the retention window (archiving
+them to another schema or dropping them), and ``PartitionMigration``
+converts an existing unpartitioned table without blocking writes.
+"""
+
+from datetime import date, datetime, timezone
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Index, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.progress import QuestionAttempt
+from .user_stats import decrement_sql, drop_trigger_ddl, trigger_ddl
+
+logger = logging.getLogger(__name__)
+
+PARENT = QuestionAttempt.__tablename__
+STAGING = f"{PARENT}_partitioned"
+LEGACY = f"{PARENT}_legacy"
+DEFAULT_PARTITION = f"{PARENT}_default"
+MIRROR_TRIGGER = f"{PARENT}_partition_mirror"
+PARTITION_NAME = re.compile(rf"^{PARENT}_(\d{{4}})_(\d{{2}})$")
+
+# Renames and detaches wait for running queries; give up rather than queue
+# every other query on the table behind them
+LOCK_TIMEOUT = "5s"
+
+ATTACHED_PARTITIONS_SQL = """
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = to_regclass(:parent)
+"""
+
+TABLE_INDEXES_SQL = """
+    SELECT indexname FROM pg_indexes
+    WHERE schemaname = current_schema() AND tablename = :table
+"""
+
+# Keyset batches by id (the legacy primary key). FOR SHARE holds off a
+# concurrent delete until the copy commits, so the mirror trigger then
+# removes the copied row instead of racing with it.
+COPY_BATCH_SQL = f"""
+    WITH batch AS (
+        SELECT * FROM {PARENT}
+        WHERE id > CAST(:after_id AS uuid)
+        ORDER BY id
+        LIMIT :batch_size
+        FOR SHARE
+    ), copied AS (
+        INSERT INTO {STAGING} SELECT * FROM batch
+        ON CONFLICT (id, created_at) DO NOTHING
+    )
+    SELECT count(*) AS rows,
+           (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id
+    FROM batch
+"""
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def utc_month(value: datetime) -> date:
+    return month_start(value.astimezone(timezone.utc).date())
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a partition, or None for the default partition"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def partition_months(
+    first: Optional[datetime],
+    months_ahead: int,
+    today: Optional[date] = None
+) -> List[date]:
+    """Every month from the one holding ``first`` to ``months_ahead`` past now"""
+    current = month_start(today or datetime.now(timezone.utc).date())
+    month = min(utc_month(first), current) if first else current
+    months = []
+    while month <= add_months(current, months_ahead):
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def _bounds(month: date) -> str:
+    return (
+        f"FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def _in_month(month: date) -> str:
+    return (
+        f"created_at >= '{month.isoformat()} 00:00:00+00' "
+        f"AND created_at < '{add_months(month, 1).isoformat()} 00:00:00+00'"
+    )
+
+
+def partition_ddl(month: date, parent: str = PARENT) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {parent} FOR VALUES {_bounds(month)}"
+    )
+
+
+def default_partition_ddl(parent: str = PARENT) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} "
+        f"PARTITION OF {parent} DEFAULT"
+    )
+
+
+def split_default_ddl(month: date) -> List[str]:
+    """
+    Create a month that already has rows in the default partition
+
+    Postgres refuses a new partition while the default holds rows for its
+    range, so the default is detached, the rows moved and the default
+    re-attached in one transaction. The rows are written to the partitions
+    directly, so the parent's user_stats triggers do not count them twice.
+    """
+    name = partition_name(month)
+    return [
+        f"ALTER TABLE {PARENT} DETACH PARTITION {DEFAULT_PARTITION}",
+        partition_ddl(month),
+        f"INSERT INTO {name} "
+        f"SELECT * FROM {DEFAULT_PARTITION} WHERE {_in_month(month)}",
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE {_in_month(month)}",
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT",
+    ]
+
+
+def _model_indexes() -> List[Index]:
+    return sorted(QuestionAttempt.__table__.indexes, key=lambda index: index.name)
+
+
+def index_ddl(table: str, suffix: str = "") -> List[str]:
+    """The model's indexes, created on the partitioned ``table``"""
+    statements = []
+    for index in _model_indexes():
+        using = index.dialect_options["postgresql"]["using"] or "btree"
+        columns = ", ".join(column.name for column in index.columns)
+        statements.append(
+            f"CREATE INDEX IF NOT EXISTS {index.name}{suffix} "
+            f"ON {table} USING {using} ({columns})"
+        )
+    return statements
+
+
+def staging_ddl(months: List[date]) -> List[str]:
+    """Partitioned copy of question_attempts, with its months, keys and indexes"""
+    statements = [
+        f"CREATE TABLE {STAGING} "
+        f"(LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (created_at)",
+        f"ALTER TABLE {STAGING} "
+        f"ADD CONSTRAINT {STAGING}_pkey PRIMARY KEY (id, created_at)",
+    ]
+    constraints = sorted(
+        QuestionAttempt.__table__.foreign_key_constraints,
+        key=lambda constraint: constraint.column_keys
+    )
+    for constraint in constraints:
+        target = constraint.elements[0].target_fullname.split(".")[0]
+        remote = ", ".join(
+            element.target_fullname.split(".")[1] for element in constraint.elements
+        )
+        keys = constraint.column_keys
+        statements.append(
+            f"ALTER TABLE {STAGING} ADD CONSTRAINT {PARENT}_{'_'.join(keys)}_fkey "
+            f"FOREIGN KEY ({', '.join(keys)}) REFERENCES {target} ({remote}) "
+            f"ON DELETE {constraint.ondelete}"
+        )
+    statements += [partition_ddl(month, parent=STAGING) for month in months]
+    statements.append(default_partition_ddl(parent=STAGING))
+    # Index names are schema-wide, so these carry a suffix until the swap
+    statements += index_ddl(STAGING, suffix="_new")
+    return statements
+
+
+def mirror_trigger_ddl() -> List[str]:
+    """Row trigger replaying question_attempts changes onto the staging table"""
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {MIRROR_TRIGGER}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {STAGING} WHERE id = OLD.id AND created_at = OLD.created_at;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {STAGING} SELECT (NEW).*
+                ON CONFLICT (id, created_at) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {MIRROR_TRIGGER} ON {PARENT}",
+        f"""
+        CREATE TRIGGER {MIRROR_TRIGGER}
+        AFTER INSERT OR UPDATE OR DELETE ON {PARENT}
+        FOR EACH ROW EXECUTE FUNCTION {MIRROR_TRIGGER}()
+        """,
+    ]
+
+
+def drop_mirror_trigger_ddl() -> List[str]:
+    return [
+        f"DROP TRIGGER IF EXISTS {MIRROR_TRIGGER} ON {PARENT}",
+        f"DROP FUNCTION IF EXISTS {MIRROR_TRIGGER}()",
+    ]
+
+
+def swap_ddl(legacy_indexes: List[str]) -> List[str]:
+    """
+    Put the staging table in place of question_attempts
+
+    Run in one transaction holding an ACCESS EXCLUSIVE lock on
+    question_attempts; ``legacy_indexes`` are its index names. The old table
+    is kept as question_attempts_legacy with its indexes renamed.
+    """
+    statements = drop_mirror_trigger_ddl() + drop_trigger_ddl(PARENT)
+    statements.append(f"ALTER TABLE {PARENT} RENAME TO {LEGACY}")
+    statements += [
+        f"ALTER INDEX {name} RENAME TO {name}_legacy" for name in legacy_indexes
+    ]
+    statements.append(f"ALTER TABLE {STAGING} RENAME TO {PARENT}")
+    statements += [
+        f"ALTER INDEX {index.name}_new RENAME TO {index.name}"
+        for index in _model_indexes()
+    ]
+    statements.append(f"ALTER INDEX {STAGING}_pkey RENAME TO {PARENT}_pkey")
+    return statements + trigger_ddl(PARENT)
+
+
+async def is_partitioned(session: AsyncSession, table: str = PARENT) -> bool:
+    return bool((await session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:table))"
+        ),
+        {"table": table}
+    )).scalar())
+
+
+async def _attached_partitions(
+    session: AsyncSession,
+    parent: str = PARENT
+) -> List[str]:
+    result = await session.execute(text(ATTACHED_PARTITIONS_SQL), {"parent": parent})
+    return list(result.scalars().all())
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    months_ahead: int = 3,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Create the current month's partition and ``months_ahead`` after it
+
+    Months that already have rows in the default partition (e.g. because
+    this did not run for a while) are split out of it as well. Does nothing
+    until question_attempts is partitioned.
+
+    Returns:
+        Names of the partitions created
+    """
+    if not await is_partitioned(session):
+        return []
+    await session.execute(text(default_partition_ddl()))
+    attached = set(await _attached_partitions(session))
+    stray = {
+        value.date() for value in (await session.execute(text(
+            "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+            f"FROM {DEFAULT_PARTITION}"
+        ))).scalars().all()
+    }
+
+    created = []
+    for month in sorted(set(partition_months(None, months_ahead, today)) | stray):
+        name = partition_name(month)
+        if name in attached:
+            continue
+        if month in stray:
+            await session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+            for statement in split_default_ddl(month):
+                await session.execute(text(statement))
+        else:
+            await session.execute(text(partition_ddl(month)))
+        created.append(name)
+    await session.commit()
+    if created:
+        logger.info(f"Created question_attempts partitions: {', '.join(created)}")
+    return created
+
+
+async def apply_retention(
+    session: AsyncSession,
+    keep_months: int,
+    archive_schema: Optional[str] = None,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Detach monthly partitions older than ``keep_months`` before the current month
+
+    Each partition is handled in its own transaction: its attempts are
+    subtracted from user_stats (statistics cover the attempts still in the
+    table), then it is detached and moved to ``archive_schema``, or dropped
+    when no schema is given.
+
+    Returns:
+        Names of the partitions detached
+    """
+    if keep_months <= 0 or not await is_partitioned(session):
+        return []
+    current = month_start(today or datetime.now(timezone.utc).date())
+    cutoff = add_months(current, -keep_months)
+    expired = sorted(
+        name for name in await _attached_partitions(session)
+        if partition_month(name) and partition_month(name) < cutoff
+    )
+    for name in expired:
+        await session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+        # Blocks stray writes to the month between the decrement and the detach
+        await session.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        await session.execute(text(decrement_sql(PARENT, name)))
+        await session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if archive_schema:
+            await session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+            await session.execute(
+                text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+            )
+        else:
+            await session.execute(text(f"DROP TABLE {name}"))
+        await session.commit()
+        destination = f" to {archive_schema}" if archive_schema else " and dropped it"
+        logger.info(f"Detached {name}{destination}")
+    return expired
+
+
+class PartitionMigration:
+    """
+    Convert an unpartitioned question_attempts table to monthly partitions online
+
+    1. Create the partitioned staging table and a row trigger on
+       question_attempts that replays every later insert, update and delete
+       onto it.
+    2. Copy the existing rows in id order, one short transaction per batch.
+       The checkpoint records the last id copied, so an interrupted run
+       resumes there; rows copied twice are skipped by the primary key.
+    3. Under a brief ACCESS EXCLUSIVE lock, swap the tables by renaming and
+       move the user_stats triggers to the new table.
+
+    The old table stays behind as question_attempts_legacy to be dropped
+    once the result is verified.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        checkpoint_path: str,
+        batch_size: int = 10000,
+        months_ahead: int = 3
+    ):
+        self.session_factory = session_factory
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.months_ahead = months_ahead
+        self.stats = {"batches": 0, "rows": 0}
+
+    def load_checkpoint(self) -> Optional[str]:
+        """Last id copied by an interrupted run, if any"""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as source:
+            checkpoint = json.load(source)
+        self.stats.update(checkpoint.get("stats", {}))
+        return checkpoint["after_id"]
+
+    def save_checkpoint(self, after_id: str) -> None:
+        # Write then rename, so a crash never leaves a truncated checkpoint
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as target:
+            json.dump({
+                "after_id": after_id,
+                "stats": self.stats,
+                "saved_at": datetime.now(timezone.utc).isoformat(),
+            }, target)
+        os.replace(temporary, self.checkpoint_path)
+
+    async def run(self, restart: bool = False) -> Dict[str, Any]:
+        """
+        Prepare, copy and swap, resuming whichever step was interrupted
+
+        Args:
+            restart: Ignore an existing checkpoint and copy from the first row
+
+        Returns:
+            Batches and rows copied, and whether the table was already partitioned
+        """
+        async with self.session_factory() as session:
+            if await is_partitioned(session):
+                return {**self.stats, "already_partitioned": True}
+
+            staged = (await session.execute(
+                text("SELECT to_regclass(:table)"), {"table": STAGING}
+            )).scalar()
+            if not staged:
+                await self.prepare(session)
+            after = (None if restart else self.load_checkpoint()) or NIL_UUID
+            while True:
+                batch = (await session.execute(
+                    text(COPY_BATCH_SQL),
+                    {"after_id": after, "batch_size": self.batch_size}
+                )).one()
+                await session.commit()
+                if not batch.rows:
+                    break
+                after = str(batch.last_id)
+                self.stats["batches"] += 1
+                self.stats["rows"] += batch.rows
+                self.save_checkpoint(after)
+                logger.info(f"Copied {self.stats['rows']} question attempts")
+
+            await self.swap(session)
+
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return {**self.stats, "already_partitioned": False}
+
+    async def prepare(self, session: AsyncSession) -> None:
+        """Create the staging table and start mirroring writes onto it"""
+        first = (await session.execute(
+            text(f"SELECT min(created_at) FROM {PARENT}")
+        )).scalar()
+        statements = staging_ddl(partition_months(first, self.months_ahead))
+        # Creating the trigger waits for in-flight writers, so every row
+        # committed before it exists is visible to the copy
+        for statement in statements + mirror_trigger_ddl():
+            await session.execute(text(statement))
+        await session.commit()
+
+    async def swap(self, session: AsyncSession) -> None:
+        await session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+        await session.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+        legacy_indexes = (await session.execute(
+            text(TABLE_INDEXES_SQL), {"table": PARENT}
+        )).scalars().all()
+        for statement in swap_ddl(list(legacy_indexes)):
+            await session.execute(text(statement))
+        await session.commit()
+        logger.info(
+            f"question_attempts is partitioned; the old table is kept as {LEGACY}"
+        )
@@ -0,0 +1,206 @@
+"""
+Token-bucket rate limiting middleware
+
+Requests are limited per authenticated user, or per client IP when there is
+no valid bearer token. The middleware runs before routing, so rejected
+requests never reach dependencies and never open a database session.
+"""
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+
+from .config import settings
+from .security import verify_token
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Sustained rate plus bucket size"""
+
+    per_minute: int
+    burst: int
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.per_minute / 60.0
+
+
+class InMemoryTokenBucketBackend:
+    """
+    Per-process token buckets
+
+    ``consume`` never awaits between reading and writing a bucket, so on a
+    single event loop it is atomic without any lock.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at, refilled_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    async def consume(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> Tuple[bool, float]:
+        now = time.monotonic()
+        state = self._buckets.get(key)
+        if state is None:
+            tokens = float(rule.burst)
+        else:
+            tokens = min(float(rule.burst), state[0] + (now - state[1]) * rule.rate)
+
+        if tokens >= cost:
+            allowed, retry_after = True, 0.0
+            tokens -= cost
+        else:
+            allowed, retry_after = False, (cost - tokens) / rule.rate
+
+        self._buckets[key] = (tokens, now, now + (rule.burst - tokens) / rule.rate)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return allowed, retry_after
+
+    def _prune(self, now: float) -> None:
+        # A bucket that has refilled completely is the same as no bucket
+        self._buckets = {
+            key: state for key, state in self._buckets.items() if state[2] > now
+        }
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisTokenBucketBackend:
+    """Token buckets shared by all workers, updated atomically in a Lua script"""
+
+    SCRIPT = """
+    local now_parts = redis.call('TIME')
+    local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+    local allowed = 0
+    local retry_after = 0
+    if tokens >= cost then
+        allowed = 1
+        tokens = tokens - cost
+    else
+        retry_after = (cost - tokens) / rate
+    end
+
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(retry_after)}
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._script = self._redis.register_script(self.SCRIPT)
+        self.prefix = prefix
+
+    async def consume(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, retry_after = await self._script(
+            keys=[self.prefix + key],
+            args=[rule.rate, rule.burst, cost],
+        )
+        return bool(allowed), float(retry_after)
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing token-bucket limits
+
+    Each request draws from the bucket for its (rule, identity) pair. Paths
+    listed in ``route_rules`` get their own stricter buckets; everything else
+    shares the default bucket. Backend errors fail open.
+    """
+
+    def __init__(
+        self,
+        app,
+        backend=None,
+        default_rule: Optional[RateLimitRule] = None,
+        route_rules: Optional[Dict[str, RateLimitRule]] = None,
+        exempt_paths: Iterable[str] = (),
+        enabled: bool = True,
+    ):
+        self.app = app
+        self.backend = backend or InMemoryTokenBucketBackend()
+        self.default_rule = default_rule or RateLimitRule(
+            settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST
+        )
+        self.route_rules = route_rules or {}
+        self.exempt_paths = frozenset(exempt_paths)
+        self.enabled = enabled
+
+    @staticmethod
+    def _identity(scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        return "user:" + verify_token(token, "access")["sub"]
+                    except (HTTPException, KeyError, TypeError):
+                        pass
+                break
+
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        rule = self.route_rules.get(path)
+        bucket = path if rule else "default"
+        rule = rule or self.default_rule
+        key = f"{bucket}:{self._identity(scope)}"
+
+        try:
+            allowed, retry_after = await self.backend.consume(key, rule)
+        except Exception as e:
+            logger.warning(f"Rate limit backend failed, allowing request: {e}")
+            allowed, retry_after = True, 0.0
+
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Too many requests, please slow down"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_rate_limit_backend():
+    """Create the configured rate limit backend"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBucketBackend(settings.REDIS_URL)
+    return InMemoryTokenBucketBackend()
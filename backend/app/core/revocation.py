@@ -0,0 +1,207 @@
+"""
+JWT revocation list keyed by token ID (jti)
+
+Revoked token IDs are kept in a local dict fronted by a Bloom filter, so the
+check in verify_token is a few hash probes with no I/O. A shared backend
+(Redis in production, in-memory for tests and single-process development)
+propagates revocations between workers. Each worker pulls it periodically.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys"""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: derive k probe positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class InMemoryRevocationBackend:
+    """
+    Process-local revocation store, used for tests and single-worker setups.
+    Refresh tokens are only single-use within the process; run more than one
+    worker with the Redis backend.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+
+    async def add(self, jti: str, expires_at: float) -> bool:
+        if self._revoked.get(jti, 0) > time.time():
+            return False
+        self._revoked[jti] = expires_at
+        return True
+
+    async def fetch_active(self, now: float) -> Dict[str, float]:
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        return dict(self._revoked)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisRevocationBackend:
+    """Shared revocation store backed by a Redis sorted set scored by expiry"""
+
+    KEY = "auth:revoked_tokens"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def add(self, jti: str, expires_at: float) -> bool:
+        # NX: only the first caller across all workers adds the member
+        return bool(await self._redis.zadd(self.KEY, {jti: expires_at}, nx=True))
+
+    async def fetch_active(self, now: float) -> Dict[str, float]:
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(self.KEY, "-inf", now)
+        pipe.zrangebyscore(self.KEY, now, "+inf", withscores=True)
+        _, members = await pipe.execute()
+        return {jti: float(exp) for jti, exp in members}
+
+    async def close(self) -> None:
+        await self._redis.close()
+
+
+class TokenRevocationList:
+    """
+    Revoked token IDs with O(1) local lookup
+
+    ``is_revoked`` never awaits: most tokens are not revoked and the Bloom
+    filter rules them out without touching the dict. Revocations from other
+    workers show up after at most one sync interval.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        sync_interval: float = 5.0,
+    ):
+        self.backend = backend or InMemoryRevocationBackend()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Check whether a token ID has been revoked
+
+        Args:
+            jti: Token ID from the JWT payload
+
+        Returns:
+            True if the token is revoked and not yet expired
+        """
+        if not jti or jti not in self._bloom:
+            return False
+
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    async def revoke(self, jti: Optional[str], expires_at: float) -> bool:
+        """
+        Revoke a token until it would have expired anyway
+
+        The shared backend adds the ID atomically, so of several concurrent
+        calls for one token (on any worker sharing the backend) exactly one
+        claims it. Refresh rotation relies on this to let a refresh token be
+        used once.
+
+        Args:
+            jti: Token ID from the JWT payload
+            expires_at: Token expiry as a Unix timestamp
+
+        Returns:
+            True if this call revoked the token, False if it was already
+            revoked, has no ID or has expired
+        """
+        if not jti or expires_at <= time.time() or self.is_revoked(jti):
+            return False
+
+        claimed = await self.backend.add(jti, expires_at)
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+        return claimed
+
+    async def sync(self) -> None:
+        """Reload unexpired revocations from the backend and drop expired ones"""
+        now = time.time()
+        revoked = await self.backend.fetch_active(now)
+        # Keep local revocations made while the fetch was in flight
+        revoked.update({jti: exp for jti, exp in self._revoked.items() if exp > now})
+        bloom = BloomFilter(max(self.capacity, len(revoked)), self.error_rate)
+        for jti in revoked:
+            bloom.add(jti)
+        self._revoked, self._bloom = revoked, bloom
+
+    async def _sync_forever(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Token revocation sync failed: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def start(self) -> None:
+        """Start the periodic sync task, which loads revocations immediately"""
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self) -> None:
+        """Stop the sync task and close the backend"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.backend.close()
+
+
+def _create_backend():
+    if settings.TOKEN_REVOCATION_BACKEND == "redis":
+        return RedisRevocationBackend(settings.REDIS_URL)
+    return InMemoryRevocationBackend()
+
+
+revocation_list = TokenRevocationList(
+    backend=_create_backend(),
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_SECONDS,
+)
@@ -0,0 +1,144 @@
+"""
+Weighted full-text search vectors for lessons and questions
+
+The ``search_vector`` columns are maintained by BEFORE INSERT/UPDATE triggers
+so queries can match against the stored vector and use the GIN indexes
+(``idx_lessons_search``, ``idx_questions_search``) instead of computing
+``to_tsvector`` per row.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = "english"
+
+# (column, weight) per table: title/stem > tags > description/explanation
+SEARCH_VECTOR_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "lessons": (("title", "A"), ("tags", "B"), ("description", "C")),
+    "questions": (("stem", "A"), ("tags", "B"), ("explanation", "C")),
+}
+
+# JSONB array columns are flattened to space-separated text
+JSONB_ARRAY_FIELDS = {"tags"}
+
+
+def _field_text_sql(column: str, prefix: str) -> str:
+    ref = f"{prefix}{column}"
+    if column in JSONB_ARRAY_FIELDS:
+        return (
+            f"CASE WHEN jsonb_typeof({ref}) = 'array' THEN "
+            f"(SELECT string_agg(value, ' ') FROM jsonb_array_elements_text({ref})) END"
+        )
+    return ref
+
+
+def search_vector_sql(table: str, prefix: str = "") -> str:
+    """
+    Build the weighted tsvector expression for a table
+
+    Args:
+        table: Table name from SEARCH_VECTOR_FIELDS
+        prefix: Column prefix, e.g. 'NEW.' inside a trigger
+
+    Returns:
+        SQL expression producing the row's search vector
+    """
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({_field_text_sql(column, prefix)}, '')), '{weight}')"
+        for column, weight in SEARCH_VECTOR_FIELDS[table]
+    )
+
+
+def trigger_ddl(table: str) -> List[str]:
+    """Statements that (re)create the search vector trigger for a table"""
+    function = f"{table}_search_vector_update"
+    trigger = f"{table}_search_vector_trigger"
+    columns = ", ".join(column for column, _ in SEARCH_VECTOR_FIELDS[table])
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {search_vector_sql(table, 'NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {trigger} ON {table}",
+        f"""
+        CREATE TRIGGER {trigger}
+        BEFORE INSERT OR UPDATE OF {columns} ON {table}
+        FOR EACH ROW EXECUTE FUNCTION {function}()
+        """,
+    ]
+
+
+def drop_trigger_ddl(table: str) -> List[str]:
+    """Statements that remove the search vector trigger for a table"""
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}",
+        f"DROP FUNCTION IF EXISTS {table}_search_vector_update()",
+    ]
+
+
+async def install_search_triggers(session: AsyncSession) -> None:
+    """Create or replace the search vector triggers (idempotent)"""
+    for table in SEARCH_VECTOR_FIELDS:
+        for statement in trigger_ddl(table):
+            await session.execute(text(statement))
+    await session.commit()
+    logger.info("Search vector triggers installed")
+
+
+async def backfill_search_vectors(
+    session: AsyncSession,
+    table: str,
+    batch_size: int = 1000,
+    only_missing: bool = True
+) -> int:
+    """
+    Recompute stored search vectors in batches
+
+    Each batch is committed separately so a large table is never locked in
+    one long transaction. Rows are walked in id order.
+
+    Args:
+        session: Database session
+        table: Table name from SEARCH_VECTOR_FIELDS
+        batch_size: Rows per UPDATE
+        only_missing: Only fill rows whose search_vector is NULL
+
+    Returns:
+        Number of rows updated
+    """
+    if table not in SEARCH_VECTOR_FIELDS:
+        raise ValueError(f"No search vector defined for table: {table}")
+
+    missing = "AND search_vector IS NULL" if only_missing else ""
+    statement = text(f"""
+        WITH batch AS (
+            SELECT id FROM {table}
+            WHERE (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)) {missing}
+            ORDER BY id
+            LIMIT :batch_size
+        )
+        UPDATE {table} AS t
+        SET search_vector = {search_vector_sql(table, 't.')}
+        FROM batch
+        WHERE t.id = batch.id
+        RETURNING t.id
+    """)
+
+    total, last_id = 0, None
+    while True:
+        result = await session.execute(statement, {"last_id": last_id, "batch_size": batch_size})
+        ids = [row[0] for row in result.all()]
+        await session.commit()
+        if not ids:
+            return total
+        total += len(ids)
+        last_id = str(max(ids))
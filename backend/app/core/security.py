@@ -2,19 +2,36 @@
 Security utilities for authentication and authorization
 """
 
+import asyncio
+import copy
+import hashlib
 import secrets
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+from typing import Optional, Dict, Any, Callable, TypeVar
+from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.revocation import revocation_list
 
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+# Decoded payloads of recently verified tokens, keyed by SHA-256 digest of the
+# token. Entries never outlive the token's own expiry.
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -34,7 +51,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -57,18 +74,17 @@ def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
+def _decode_token(token: str) -> Dict[str, Any]:
     """
-    Verify and decode JWT token
+    Decode a JWT and validate its signature and expiry
     
     Args:
-        token: JWT token to verify
-        token_type: Expected token type (access or refresh)
+        token: JWT token to decode
         
     Returns:
         Decoded token payload
@@ -78,32 +94,74 @@ def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
     """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        
-        # Check token type
-        if payload.get("type") != token_type:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Invalid token type. Expected {token_type}",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Check expiration
-        exp = payload.get("exp")
-        if exp is None or datetime.utcnow() > datetime.fromtimestamp(exp):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return payload
-        
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # jwt.decode only checks "exp" when present, so reject tokens without one
+    if not isinstance(payload.get("exp"), (int, float)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return payload
+
+
+def verify_token(token: str, token_type: str = "access") -> Dict[str, Any]:
+    """
+    Verify and decode JWT token
+    
+    Decoded payloads are cached by token digest until the token expires, so
+    repeated requests with the same bearer token skip the HMAC and JSON work.
+    Token type and revocation are checked on every call.
+    
+    Args:
+        token: JWT token to verify
+        token_type: Expected token type (access or refresh)
+        
+    Returns:
+        Decoded token payload
+        
+    Raises:
+        HTTPException: If token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    
+    if payload is None or time.time() >= payload["exp"]:
+        payload = _decode_token(token)
+        token_cache.set(digest, payload, ttl=payload["exp"] - time.time())
+    
+    # Check token type
+    if payload.get("type") != token_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid token type. Expected {token_type}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Revocation is checked on every call, cache hit or not
+    if revocation_list.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Callers get their own deep copy so neither the payload nor its lists
+    # (e.g. scopes) can be mutated in the cache
+    return copy.deepcopy(payload)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -133,6 +191,119 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification
+    
+    bcrypt is deliberately slow (~200ms per call), so running it inline in an
+    async handler blocks the event loop for every login. The pool moves the
+    work to threads (bcrypt releases the GIL) or processes and sheds load with
+    a 503 once ``max_pending`` calls are already queued or running.
+    """
+    
+    def __init__(self, executor_type: str = "thread", max_workers: int = 4, max_pending: int = 64):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor type: {executor_type}")
+        
+        self.executor_type = executor_type
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+    
+    @property
+    def pending(self) -> int:
+        """Number of calls currently queued or running"""
+        return self._pending
+    
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing this module never forks or spawns threads
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+        return self._executor
+    
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a hashing function on the pool
+        
+        Args:
+            func: Picklable module-level function to execute
+            *args: Positional arguments for the function
+            
+        Returns:
+            Function result
+            
+        Raises:
+            HTTPException: If the pool is saturated
+        """
+        # The counter is only touched from the event loop thread, so no lock is needed
+        if self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying executor"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash without blocking the event loop
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+        
+    Raises:
+        HTTPException: If the hashing pool is saturated
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password
+        
+    Raises:
+        HTTPException: If the hashing pool is saturated
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def generate_verification_token() -> str:
     """
     Generate a secure random token for email verification or password reset
@@ -191,7 +362,9 @@ def extract_user_from_token(token: str) -> Dict[str, Any]:
     return {
         "user_id": payload.get("sub"),
         "email": payload.get("email"),
-        "scopes": payload.get("scopes", [])
+        "scopes": payload.get("scopes", []),
+        "jti": payload.get("jti"),
+        "exp": payload.get("exp")
     }
 
 
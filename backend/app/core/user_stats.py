@@ -0,0 +1,274 @@
+"""
+Incrementally maintained per-user statistics (the user_stats rollup)
+
+Every INSERT, UPDATE and DELETE statement on lesson_progress,
+question_attempts and srs_cards runs one AFTER ... FOR EACH STATEMENT
+trigger that sums the statement's net change per user from its transition
+tables and adds it to user_stats. A statement that changes no counted value
+(e.g. the nightly SRS reschedule moving due dates) writes nothing. Reading a
+user's statistics is then a single lookup on user_stats.user_id instead of
+three aggregates over the user's history.
+
+``check_user_stats`` recomputes the rollup from the source tables and can
+repair drift (rows changed with triggers disabled, TRUNCATE, manual fixes).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.progress import UserStats
+
+logger = logging.getLogger(__name__)
+
+# Source table -> (user_stats column, per-row value) pairs
+ROLLUP_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "lesson_progress": (
+        ("lessons_started", "1"),
+        ("lessons_completed", "CASE WHEN is_completed THEN 1 ELSE 0 END"),
+        ("completion_percentage_sum", "completion_percentage"),
+        ("time_spent", "time_spent"),
+    ),
+    "question_attempts": (
+        ("attempts", "1"),
+        ("correct_attempts", "CASE WHEN is_correct THEN 1 ELSE 0 END"),
+        ("attempt_time_sum", "time_taken"),
+    ),
+    "srs_cards": (
+        ("srs_cards", "1"),
+        ("srs_mature_cards", "CASE WHEN is_learning THEN 0 ELSE 1 END"),
+        ("ease_factor_sum", "ease_factor"),
+    ),
+}
+
+ROLLUP_COLUMNS: List[str] = [column for fields in ROLLUP_FIELDS.values() for column, _ in fields]
+
+# (trigger suffix, event, transition tables)
+TRIGGER_EVENTS = (
+    ("insert", "INSERT", "NEW TABLE AS new_rows"),
+    ("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("delete", "DELETE", "OLD TABLE AS old_rows"),
+)
+
+
+def _delta_sql(table: str, sources: List[Tuple[str, str]]) -> str:
+    """Net change per user from (sign, transition table) sources, zero rows dropped"""
+    fields = ROLLUP_FIELDS[table]
+    rows = " UNION ALL ".join(
+        f"SELECT user_id, {', '.join(f'{sign}({expression}) AS {column}' for column, expression in fields)} FROM {source}"
+        for sign, source in sources
+    )
+    sums = ", ".join(f"sum({column}) AS {column}" for column, _ in fields)
+    changed = " OR ".join(f"sum({column}) <> 0" for column, _ in fields)
+    return f"SELECT user_id, {sums} FROM ({rows}) AS changes GROUP BY user_id HAVING {changed}"
+
+
+def _upsert_sql(table: str, delta: str) -> str:
+    columns = [column for column, _ in ROLLUP_FIELDS[table]]
+    increments = ", ".join(f"{column} = user_stats.{column} + EXCLUDED.{column}" for column in columns)
+    # Rows are locked in user order, so concurrent multi-user statements cannot deadlock
+    return f"""
+        INSERT INTO user_stats (id, user_id, {', '.join(columns)})
+        SELECT gen_random_uuid(), delta.* FROM ({delta}) AS delta ORDER BY delta.user_id
+        ON CONFLICT (user_id) DO UPDATE SET {increments}, updated_at = now()
+    """
+
+
+def decrement_sql(table: str, source: str) -> str:
+    """Subtract the rows in ``source`` (shaped like ``table``) from user_stats"""
+    columns = [column for column, _ in ROLLUP_FIELDS[table]]
+    # Only touches existing rows: when a user is deleted, the cascade may
+    # already have removed their user_stats row
+    decrements = ", ".join(f"{column} = user_stats.{column} + delta.{column}" for column in columns)
+    return f"""
+        UPDATE user_stats SET {decrements}, updated_at = now()
+        FROM ({_delta_sql(table, [('-', source)])}) AS delta
+        WHERE user_stats.user_id = delta.user_id
+    """
+
+
+def trigger_ddl(table: str) -> List[str]:
+    """Statements that (re)create the user_stats triggers for a source table"""
+    function = f"{table}_user_stats_update"
+    statements = [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {_upsert_sql(table, _delta_sql(table, [('+', 'new_rows')]))};
+            ELSIF TG_OP = 'UPDATE' THEN
+                {_upsert_sql(table, _delta_sql(table, [('+', 'new_rows'), ('-', 'old_rows')]))};
+            ELSE
+                {decrement_sql(table, 'old_rows')};
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+    ]
+    for suffix, event, transition in TRIGGER_EVENTS:
+        trigger = f"{table}_user_stats_{suffix}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {trigger} ON {table}",
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER {event} ON {table} REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """,
+        ]
+    return statements
+
+
+def drop_trigger_ddl(table: str) -> List[str]:
+    """Statements that remove the user_stats triggers for a source table"""
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_user_stats_{suffix} ON {table}"
+        for suffix, _, _ in TRIGGER_EVENTS
+    ] + [f"DROP FUNCTION IF EXISTS {table}_user_stats_update()"]
+
+
+def source_totals_sql(users: str = "unnest(CAST(:user_ids AS uuid[])) AS u(user_id)") -> str:
+    """Rollup values recomputed from the source tables for the users in ``users`` (aliased u)"""
+    joins, selected = [], []
+    for table, fields in ROLLUP_FIELDS.items():
+        alias = f"{table}_totals"
+        sums = ", ".join(f"COALESCE(sum({expression}), 0) AS {column}" for column, expression in fields)
+        joins.append(
+            f"CROSS JOIN LATERAL (SELECT {sums} FROM {table} WHERE {table}.user_id = u.user_id) AS {alias}"
+        )
+        selected += [f"{alias}.{column}" for column, _ in fields]
+    return (
+        f"SELECT u.user_id, {', '.join(selected)} "
+        f"FROM {users} {' '.join(joins)}"
+    )
+
+
+async def install_user_stats_triggers(session: AsyncSession) -> None:
+    """Create or replace the user_stats triggers (idempotent)"""
+    for table in ROLLUP_FIELDS:
+        for statement in trigger_ddl(table):
+            await session.execute(text(statement))
+    await session.commit()
+    logger.info("User statistics triggers installed")
+
+
+def format_user_statistics(stats: Optional[Any]) -> Dict[str, Any]:
+    """Shape user_stats values like DatabaseUtils.get_user_statistics always has"""
+    values = {column: getattr(stats, column, 0) or 0 for column in ROLLUP_COLUMNS}
+    lessons, attempts, cards = values["lessons_started"], values["attempts"], values["srs_cards"]
+    return {
+        'lessons': {
+            'total': lessons,
+            'completed': values["lessons_completed"],
+            'avg_completion': float(values["completion_percentage_sum"]) / lessons if lessons else 0.0,
+            'total_time_spent': values["time_spent"]
+        },
+        'questions': {
+            'total_attempts': attempts,
+            'correct_attempts': values["correct_attempts"],
+            'accuracy_rate': (values["correct_attempts"] / attempts * 100) if attempts else 0,
+            'avg_time_per_question': values["attempt_time_sum"] / attempts if attempts else 0.0
+        },
+        'srs': {
+            'total_cards': cards,
+            'mature_cards': values["srs_mature_cards"],
+            'avg_ease_factor': float(values["ease_factor_sum"]) / cards if cards else 2.5
+        }
+    }
+
+
+async def get_user_stats(session: AsyncSession, user_id: uuid.UUID) -> Dict[str, Any]:
+    """Read one user's statistics from the rollup (one indexed row lookup)"""
+    stats = (await session.execute(
+        select(UserStats).where(UserStats.user_id == user_id)
+    )).scalar_one_or_none()
+    return format_user_statistics(stats)
+
+
+async def check_user_stats(
+    session: AsyncSession,
+    repair: bool = False,
+    batch_size: int = 1000,
+    user_ids: Optional[List[uuid.UUID]] = None
+) -> Dict[str, Any]:
+    """
+    Compare user_stats with totals recomputed from the source tables
+
+    Users are walked in id order, one transaction per batch. Each batch's
+    rollup rows are locked before the sources are read, so writes racing
+    with the check are applied on top of the repaired values rather than
+    lost or reported as drift.
+
+    Args:
+        session: Database session
+        repair: Overwrite drifted rows with the recomputed totals
+        batch_size: Users per batch
+        user_ids: Only check these users (default: every user)
+
+    Returns:
+        Users checked, users whose rollup drifted and a sample of their ids
+    """
+    recompute = text(source_totals_sql())
+    table = UserStats.__table__
+    repair_statement = (
+        update(table)
+        .where(table.c.user_id == bindparam("b_user_id"))
+        .values(updated_at=func.now(), **{column: bindparam(f"b_{column}") for column in ROLLUP_COLUMNS})
+    )
+    checked, drifted, sample = 0, 0, []
+    last_id = None
+    while True:
+        if user_ids is not None:
+            batch = sorted(user_ids)[checked:checked + batch_size]
+        else:
+            batch = (await session.execute(text(
+                "SELECT id FROM users WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid) "
+                "ORDER BY id LIMIT :batch_size"
+            ), {"last_id": last_id, "batch_size": batch_size})).scalars().all()
+        if not batch:
+            break
+        last_id = str(batch[-1])
+        checked += len(batch)
+
+        await session.execute(text(
+            "INSERT INTO user_stats (id, user_id) "
+            "SELECT gen_random_uuid(), user_id FROM unnest(CAST(:user_ids AS uuid[])) AS u(user_id) "
+            "ORDER BY user_id ON CONFLICT (user_id) DO NOTHING"
+        ), {"user_ids": batch})
+        stored = {
+            row.user_id: row
+            for row in (await session.execute(
+                select(UserStats.user_id, *[getattr(UserStats, column) for column in ROLLUP_COLUMNS])
+                .where(UserStats.user_id.in_(batch))
+                .order_by(UserStats.user_id)
+                .with_for_update()
+            )).all()
+        }
+        expected = (await session.execute(recompute, {"user_ids": batch})).all()
+
+        repairs = []
+        for row in expected:
+            current = stored[row.user_id]
+            if any(getattr(current, column) != getattr(row, column) for column in ROLLUP_COLUMNS):
+                drifted += 1
+                if len(sample) < 20:
+                    sample.append(str(row.user_id))
+                repairs.append({
+                    "b_user_id": row.user_id,
+                    **{f"b_{column}": getattr(row, column) for column in ROLLUP_COLUMNS},
+                })
+
+        if repair and repairs:
+            await session.execute(repair_statement, repairs)
+            await session.commit()
+        elif repair:
+            await session.commit()  # keep the rows created for users without one
+        else:
+            await session.rollback()
+
+    if drifted:
+        logger.warning(f"user_stats drift for {drifted} of {checked} users")
+    return {"checked": checked, "drifted": drifted, "sample": sample}
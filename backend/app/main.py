@@ -11,6 +11,14 @@ import time
 
 from app.core.config import settings
 from app.core.database import init_db, close_db, check_db_health
+from app.core.rate_limit import (
+    RateLimitMiddleware, RateLimitRule, create_rate_limit_backend
+)
+from app.core.revocation import revocation_list
+from app.core.security import password_hash_pool
+from app.services.counter_buffer import counter_buffer
+from app.services.progress_buffer import progress_buffer
+from app.services.search_service import search_service, suggest_service
 from app.api.v1 import get_api_router
 
 
@@ -33,6 +41,17 @@ async def lifespan(app: FastAPI):
         await init_db()
         logger.info("Database initialized successfully")
         
+        # Start syncing revoked tokens from the shared store
+        await revocation_list.start()
+        
+        # Load the search index (snapshot or rebuild) in the background
+        await search_service.start()
+        await suggest_service.start()
+        
+        # Periodically write buffered lesson progress and content counters
+        await progress_buffer.start()
+        await counter_buffer.start()
+        
         # Add any other startup tasks here
         
     except Exception as e:
@@ -45,7 +64,24 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down English Learning Platform API...")
     
     try:
-        # Close database connections
+        # Stop token revocation sync
+        await revocation_list.stop()
+        
+        # Snapshot the search index for a fast next start
+        await search_service.stop()
+        await suggest_service.stop()
+        
+        # Write buffered lesson progress and counters while the database is still open
+        await progress_buffer.stop()
+        await counter_buffer.stop()
+        
+        # Stop password hashing workers
+        password_hash_pool.shutdown()
+        
+        # Close the rate limiter's Redis connections
+        await rate_limit_backend.close()
+        
+        # Close database connections last, once nothing above can still use them
         await close_db()
         logger.info("Database connections closed")
         
@@ -66,6 +102,22 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Add rate limiting middleware (added before CORS so CORS wraps 429 responses)
+# Kept here so the lifespan can close it on shutdown
+rate_limit_backend = create_rate_limit_backend()
+auth_rate_limit = RateLimitRule(settings.RATE_LIMIT_AUTH_PER_MINUTE, settings.RATE_LIMIT_AUTH_BURST)
+app.add_middleware(
+    RateLimitMiddleware,
+    backend=rate_limit_backend,
+    default_rule=RateLimitRule(settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST),
+    route_rules={
+        f"{settings.API_V1_STR}/auth/login": auth_rate_limit,
+        f"{settings.API_V1_STR}/auth/password/reset/request": auth_rate_limit,
+    },
+    exempt_paths=["/health", "/health/db", "/health/buffers"],
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -107,6 +159,15 @@ async def database_health_check():
         )
 
 
+@app.get("/health/buffers")
+async def buffer_health_check():
+    """Write buffer backlog and flush lag"""
+    return {
+        "lesson_progress": progress_buffer.stats(),
+        "content_counters": counter_buffer.stats(),
+    }
+
+
 # Root endpoint
 @app.get("/")
 async def root():
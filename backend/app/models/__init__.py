@@ -6,8 +6,8 @@ Database models for English Learning Platform
 from .base import Base
 from .user import User, UserPreference
 from .content import Lesson, Question, QuestionSet
-from .progress import LessonProgress, QuestionAttempt, UserAchievement
-from .srs import SRSCard
+from .progress import LessonProgress, QuestionAttempt, UserAchievement, UserAchievementState, UserStats
+from .srs import SRSCard, SRSQueueSize, SRSReviewBatch, SRSUserParameters
 from .assessment import TryoutSession, TryoutAnswer
 from .subscription import Subscription, PaymentTransaction
 
@@ -21,7 +21,12 @@ __all__ = [
     "LessonProgress",
     "QuestionAttempt",
     "UserAchievement",
+    "UserAchievementState",
+    "UserStats",
     "SRSCard",
+    "SRSQueueSize",
+    "SRSReviewBatch",
+    "SRSUserParameters",
     "TryoutSession",
     "TryoutAnswer",
     "Subscription",
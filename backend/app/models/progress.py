@@ -2,13 +2,16 @@
 Progress tracking and achievement models
 """
 
+import uuid
+
 from sqlalchemy import (
-    Boolean, Column, String, Text, Integer, 
+    BigInteger, Boolean, Column, DateTime, String, Text, Integer, 
     ForeignKey, Index, CheckConstraint, UniqueConstraint,
-    Numeric
+    Numeric, DDL, event
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 
 from .base import Base
 
@@ -87,6 +90,16 @@ class QuestionAttempt(Base):
     
     __tablename__ = "question_attempts"
     
+    # Partitioned by month on created_at (see app.core.partitions), so the
+    # primary key has to include it; lookups by id still use its index
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+        nullable=False
+    )
+    
     user_id = Column(
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
@@ -138,14 +151,29 @@ class QuestionAttempt(Base):
             "points_earned >= 0 AND points_earned <= max_points",
             name="valid_points_earned"
         ),
-        Index("idx_question_attempts_user", "user_id"),
+        # user_id lookups use the composite indexes below
         Index("idx_question_attempts_question", "question_id"),
         Index("idx_question_attempts_context", "context_type", "context_id"),
         Index("idx_question_attempts_user_question", "user_id", "question_id"),
         Index("idx_question_attempts_performance", "user_id", "is_correct", "created_at"),
+        # Rows arrive in time order, so a BRIN index serves time-range scans
+        Index("idx_question_attempts_created_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
 
+# Catches rows outside every monthly partition, so a freshly created table
+# accepts writes before `manage_db.py attempts-maintain` adds the months
+event.listen(
+    QuestionAttempt.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS question_attempts_default "
+        "PARTITION OF question_attempts DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
+
+
 class UserAchievement(Base):
     """Track user achievements and badges"""
     
@@ -201,4 +229,63 @@ class UserAchievement(Base):
         Index("idx_user_achievements_user", "user_id"),
         Index("idx_user_achievements_type", "achievement_type"),
         Index("idx_user_achievements_completed", "user_id", "is_completed"),
-    )
\ No newline at end of file
+    )
+
+
+class UserAchievementState(Base):
+    """
+    Incremental rule state behind a user's achievements
+    
+    Holds one entry per achievement metric (counters, streak run-lengths,
+    sliding windows), so new events are evaluated without re-reading the
+    user's attempt and lesson history.
+    """
+    
+    __tablename__ = "user_achievement_states"
+    
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    
+    # metric name -> state (see app/services/achievement_engine.py)
+    state = Column(JSONB, default=dict, nullable=False)
+    event_count = Column(Integer, default=0, nullable=False)
+
+
+class UserStats(Base):
+    """
+    Per-user totals behind the statistics dashboard
+    
+    Maintained by statement-level triggers on lesson_progress,
+    question_attempts and srs_cards (see app/core/user_stats.py), which add
+    each statement's net change. Only sums and counts are stored, so averages
+    are derived exactly at read time.
+    """
+    
+    __tablename__ = "user_stats"
+    
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    
+    # lesson_progress
+    lessons_started = Column(Integer, server_default="0", nullable=False)
+    lessons_completed = Column(Integer, server_default="0", nullable=False)
+    completion_percentage_sum = Column(Numeric(14, 2), server_default="0", nullable=False)
+    time_spent = Column(BigInteger, server_default="0", nullable=False)  # seconds
+    
+    # question_attempts
+    attempts = Column(Integer, server_default="0", nullable=False)
+    correct_attempts = Column(Integer, server_default="0", nullable=False)
+    attempt_time_sum = Column(BigInteger, server_default="0", nullable=False)  # seconds
+    
+    # srs_cards
+    srs_cards = Column(Integer, server_default="0", nullable=False)
+    srs_mature_cards = Column(Integer, server_default="0", nullable=False)
+    ease_factor_sum = Column(Numeric(14, 2), server_default="0", nullable=False)
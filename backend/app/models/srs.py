@@ -3,9 +3,9 @@ Spaced Repetition System (SRS) models
 """
 
 from sqlalchemy import (
-    Boolean, Column, String, Integer, 
+    Boolean, Column, Date, DateTime, Float, String, Integer, 
     ForeignKey, Index, CheckConstraint,
-    Numeric
+    Numeric, UniqueConstraint, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
@@ -41,8 +41,8 @@ class SRSCard(Base):
     repetitions = Column(Integer, default=0, nullable=False)
     
     # Scheduling
-    next_review_date = Column(String, nullable=False)  # ISO date string
-    last_reviewed_date = Column(String, nullable=True)
+    next_review_date = Column(Date, nullable=False)
+    last_reviewed_date = Column(Date, nullable=True)
     
     # Performance tracking
     total_reviews = Column(Integer, default=0, nullable=False)
@@ -99,7 +99,93 @@ class SRSCard(Base):
         Index("idx_srs_cards_user", "user_id"),
         Index("idx_srs_cards_item", "item_type", "item_id"),
         Index("idx_srs_cards_question", "question_id"),
-        Index("idx_srs_cards_due", "user_id", "next_review_date"),
+        # Due queue: the next N cards of a user in one index-only scan
+        Index(
+            "idx_srs_cards_review_queue",
+            "user_id", "next_review_date", "id",
+            postgresql_include=["item_type", "item_id", "question_id", "is_learning"],
+            postgresql_where=text("NOT is_suspended AND NOT is_buried"),
+        ),
         Index("idx_srs_cards_learning", "user_id", "is_learning"),
         Index("idx_srs_cards_suspended", "user_id", "is_suspended"),
-    )
\ No newline at end of file
+    )
+
+
+class SRSQueueSize(Base):
+    """Precomputed size of a user's review queue for one day (dashboard)"""
+    
+    __tablename__ = "srs_queue_sizes"
+    
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    queue_date = Column(Date, nullable=False)
+    
+    # Cards due on or before queue_date
+    due_count = Column(Integer, default=0, nullable=False)
+    learning_count = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint("user_id", "queue_date", name="uq_srs_queue_sizes_user_date"),
+    )
+
+
+class SRSReviewBatch(Base):
+    """
+    A submitted batch of SRS reviews, keyed by the client-generated batch id
+    
+    Lets a retried submission return the stored outcome instead of grading
+    the cards twice.
+    """
+    
+    __tablename__ = "srs_review_batches"
+    
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    review_count = Column(Integer, nullable=False)
+    results = Column(JSONB, default=list)  # per-card outcome returned to the client
+    
+    __table_args__ = (
+        Index("idx_srs_review_batches_created", "created_at"),
+    )
+
+
+class SRSUserParameters(Base):
+    """
+    Memory parameters fitted to a user's review history (srs-optimize)
+    
+    Recall after ``t`` days is modelled as exp(-t / S) with stability
+    S = initial_stability * stability_growth ** (correct reviews so far).
+    stability_growth is what SM-2's ease factor approximates.
+    """
+    
+    __tablename__ = "srs_user_parameters"
+    
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    
+    # Fitted model
+    initial_stability = Column(Float, nullable=False)  # days
+    stability_growth = Column(Float, nullable=False)
+    ease_factor = Column(Numeric(4, 2), nullable=False)  # stability_growth within SM-2 bounds
+    
+    # Fit quality
+    review_count = Column(Integer, nullable=False)
+    log_loss = Column(Float, nullable=False)
+    fitted_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        CheckConstraint(
+            "ease_factor >= 1.3 AND ease_factor <= 5.0",
+            name="valid_fitted_ease_factor"
+        ),
+    )
@@ -0,0 +1,48 @@
+"""
+Search-related Pydantic schemas
+"""
+
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class SearchResult(BaseModel):
+    """A single lesson or question search hit"""
+    kind: str
+    id: str
+    score: float
+    title: str
+    level: Optional[str] = None
+    skill: Optional[str] = None
+    topic: Optional[str] = None
+    type: Optional[str] = None
+    slug: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    """Ranked search results page"""
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchResult]
+    corrections: Dict[str, str] = {}  # misspelled word -> correction used
+
+
+class FacetCountsResponse(BaseModel):
+    """Matching total and per-value counts for each facet"""
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+
+class SuggestionResult(BaseModel):
+    """A typeahead suggestion"""
+    text: str
+    kind: str
+    ref: Optional[str] = None
+
+
+class SuggestResponse(BaseModel):
+    """Typeahead suggestions for a prefix"""
+    query: str
+    suggestions: List[SuggestionResult]
@@ -0,0 +1,94 @@
+"""
+Spaced repetition (SRS) Pydantic schemas
+"""
+
+import uuid
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel, Field, validator
+
+from app.core.config import settings
+
+
+class DueCard(BaseModel):
+    """A card in the user's review queue"""
+    id: uuid.UUID
+    item_type: str
+    item_id: uuid.UUID
+    question_id: Optional[uuid.UUID] = None
+    is_learning: bool
+    next_review_date: date
+    
+    class Config:
+        from_attributes = True
+
+
+class DueQueueResponse(BaseModel):
+    """The next cards due for review"""
+    date: date
+    due_count: int  # all cards due, not only those returned
+    cards: List[DueCard]
+
+
+class QueueSizeResponse(BaseModel):
+    """Number of cards due on a given day"""
+    queue_date: date
+    due_count: int
+    learning_count: int
+    precomputed: bool
+
+
+class ReviewItem(BaseModel):
+    """One graded card"""
+    card_id: uuid.UUID
+    grade: int = Field(..., ge=0, le=5)  # 0 (blackout) to 5 (perfect)
+    response_time_ms: int = Field(..., ge=0, le=3_600_000)
+
+
+class ReviewBatchRequest(BaseModel):
+    """A review session's grades, submitted at once"""
+    batch_id: uuid.UUID  # generated by the client and reused on retries
+    reviews: List[ReviewItem] = Field(..., min_length=1)
+    
+    @validator('reviews')
+    def validate_batch_size(cls, v):
+        if len(v) > settings.SRS_MAX_BATCH_SIZE:
+            raise ValueError(f'At most {settings.SRS_MAX_BATCH_SIZE} reviews per batch')
+        return v
+
+
+class ReviewOutcome(BaseModel):
+    """New schedule of a reviewed card"""
+    card_id: uuid.UUID
+    passed: bool
+    interval: int
+    ease_factor: float
+    repetitions: int
+    next_review_date: date
+    is_learning: bool
+
+
+class ReviewBatchResponse(BaseModel):
+    """Outcome of a batch submission"""
+    batch_id: uuid.UUID
+    replayed: bool  # true when this batch id had already been processed
+    results: List[ReviewOutcome]
+
+
+class ForecastDay(BaseModel):
+    """Projected reviews on one day"""
+    date: date
+    mean: float
+    p10: float
+    p90: float
+
+
+class ForecastResponse(BaseModel):
+    """Projected daily review load"""
+    start_date: date
+    days: int
+    runs: int
+    new_cards_per_day: int
+    peak_date: date
+    peak_reviews: float
+    daily: List[ForecastDay]
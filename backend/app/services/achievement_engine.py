@@ -0,0 +1,185 @@
+"""
+Incremental achievement evaluation
+
+Achievements are declared as data: a ``Metric`` says how to fold events into
+a small piece of per-user state (a counter, a streak run-length, a sliding
+window of outcomes or a run of study days), and an ``AchievementRule`` says
+which metric value earns which badge. Events are applied to the stored state
+one at a time, so evaluating a new attempt costs the same whether the user
+has ten attempts of history or ten thousand, and adding a badge only adds an
+entry to ACHIEVEMENTS.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Event kinds
+ATTEMPT = "attempt"
+LESSON_COMPLETED = "lesson_completed"
+
+MAX_WINDOW = 62  # window outcomes are kept as bits of one JSON integer
+
+
+@dataclass(frozen=True)
+class AchievementEvent:
+    """Something a learner did"""
+    kind: str  # ATTEMPT or LESSON_COMPLETED
+    at: datetime
+    is_correct: bool = False
+    time_taken: Optional[int] = None  # seconds, attempts only
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    How events fold into one value per user
+
+    aggregate is one of:
+        count: events that match
+        run: longest run of consecutive matching events of ``event`` kind
+        window: most matching events among the last ``window`` of ``event`` kind
+        days: longest run of consecutive days with any event of ``event`` kind
+    """
+    name: str
+    aggregate: str
+    event: Optional[str] = None  # None matches every kind
+    correct: Optional[bool] = None
+    max_time: Optional[int] = None  # seconds
+    window: int = 0
+
+    def applies(self, event: AchievementEvent) -> bool:
+        return self.event is None or event.kind == self.event
+
+    def matches(self, event: AchievementEvent) -> bool:
+        if self.correct is not None and event.is_correct != self.correct:
+            return False
+        if self.max_time is not None and (event.time_taken is None or event.time_taken > self.max_time):
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    """A badge earned once ``metric`` reaches ``target``"""
+    key: str
+    title: str
+    description: str
+    achievement_type: str  # streak, completion, accuracy, speed, milestone, special
+    category: str  # learning, social, progress, mastery, engagement
+    metric: str
+    target: int
+    difficulty: str = "bronze"
+    points_reward: int = 0
+
+
+METRICS: Dict[str, Metric] = {metric.name: metric for metric in (
+    Metric("attempts", "count", ATTEMPT),
+    Metric("correct_answers", "count", ATTEMPT, correct=True),
+    Metric("fast_correct_answers", "count", ATTEMPT, correct=True, max_time=5),
+    Metric("correct_streak", "run", ATTEMPT, correct=True),
+    Metric("recent_accuracy", "window", ATTEMPT, correct=True, window=20),
+    Metric("lessons_completed", "count", LESSON_COMPLETED),
+    Metric("study_days", "days"),
+)}
+
+ACHIEVEMENTS: Tuple[AchievementRule, ...] = (
+    AchievementRule("first_answers", "First Steps", "Answer 10 questions",
+                    "milestone", "progress", "attempts", 10, points_reward=10),
+    AchievementRule("answers_500", "Dedicated Learner", "Answer 500 questions",
+                    "milestone", "progress", "attempts", 500, "silver", 50),
+    AchievementRule("correct_1000", "Knowledge Bank", "Answer 1,000 questions correctly",
+                    "milestone", "mastery", "correct_answers", 1000, "gold", 100),
+    AchievementRule("streak_10", "On a Roll", "Answer 10 questions correctly in a row",
+                    "streak", "learning", "correct_streak", 10, points_reward=20),
+    AchievementRule("streak_25", "Unstoppable", "Answer 25 questions correctly in a row",
+                    "streak", "mastery", "correct_streak", 25, "gold", 75),
+    AchievementRule("accuracy_18_of_20", "Sharpshooter", "Get 18 of 20 consecutive answers right",
+                    "accuracy", "mastery", "recent_accuracy", 18, "silver", 40),
+    AchievementRule("fast_50", "Quick Thinker", "Answer 50 questions correctly within 5 seconds",
+                    "speed", "mastery", "fast_correct_answers", 50, "silver", 40),
+    AchievementRule("first_lesson", "Lesson One", "Complete your first lesson",
+                    "completion", "progress", "lessons_completed", 1, points_reward=10),
+    AchievementRule("lessons_25", "Curriculum Climber", "Complete 25 lessons",
+                    "completion", "progress", "lessons_completed", 25, "gold", 100),
+    AchievementRule("study_week", "Week Warrior", "Study 7 days in a row",
+                    "streak", "engagement", "study_days", 7, "silver", 50),
+    AchievementRule("study_month", "Habit Formed", "Study 30 days in a row",
+                    "streak", "engagement", "study_days", 30, "platinum", 200),
+)
+
+
+def _validate() -> None:
+    keys = set()
+    for rule in ACHIEVEMENTS:
+        if rule.key in keys:
+            raise ValueError(f"Duplicate achievement key: {rule.key}")
+        keys.add(rule.key)
+        metric = METRICS.get(rule.metric)
+        if metric is None:
+            raise ValueError(f"Achievement {rule.key} uses unknown metric {rule.metric}")
+        if metric.aggregate == "window" and not 1 <= rule.target <= metric.window <= MAX_WINDOW:
+            raise ValueError(f"Achievement {rule.key} target does not fit window {metric.window}")
+
+
+_validate()
+
+
+def _apply(metric: Metric, state: Dict[str, Any], event: AchievementEvent) -> None:
+    """Fold one applicable event into a metric's state in place"""
+    matched = metric.matches(event)
+
+    if metric.aggregate == "count":
+        if matched:
+            state["value"] = state.get("value", 0) + 1
+
+    elif metric.aggregate == "run":
+        current = state.get("current", 0) + 1 if matched else 0
+        state["current"] = current
+        state["value"] = max(state.get("value", 0), current)
+
+    elif metric.aggregate == "window":
+        # Bit i is the outcome i events ago
+        size = min(state.get("size", 0) + 1, metric.window)
+        bits = ((state.get("bits", 0) << 1) | int(matched)) & ((1 << metric.window) - 1)
+        state["size"], state["bits"] = size, bits
+        state["value"] = max(state.get("value", 0), bin(bits).count("1"))
+
+    elif metric.aggregate == "days":
+        day = event.at.date()
+        last = date.fromisoformat(state["last"]) if "last" in state else None
+        if last is not None and day <= last:
+            return  # same day, or late-arriving history
+        current = state.get("current", 0) + 1 if last == day - timedelta(days=1) else 1
+        state["current"], state["last"] = current, day.isoformat()
+        state["value"] = max(state.get("value", 0), current)
+
+    else:
+        raise ValueError(f"Unknown aggregate: {metric.aggregate}")
+
+
+def apply_events(state: Dict[str, Dict[str, Any]], events: Iterable[AchievementEvent]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fold events, in order, into a user's metric states
+
+    Args:
+        state: Stored state (metric name -> metric state); not modified
+        events: New events, oldest first
+
+    Returns:
+        The new state
+    """
+    state = {name: dict(metric_state) for name, metric_state in state.items()}
+    for event in events:
+        for metric in METRICS.values():
+            if metric.applies(event):
+                _apply(metric, state.setdefault(metric.name, {}), event)
+    return state
+
+
+def progress(state: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Current progress of every achievement, capped at its target"""
+    return {
+        rule.key: min(state.get(rule.metric, {}).get("value", 0), rule.target)
+        for rule in ACHIEVEMENTS
+    }
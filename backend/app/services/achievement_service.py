@@ -0,0 +1,190 @@
+"""
+Achievement service: feeds learner events through the achievement engine
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Sequence, Tuple
+import uuid
+
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.progress import LessonProgress, QuestionAttempt, UserAchievement, UserAchievementState
+from app.services.achievement_engine import (
+    ACHIEVEMENTS, ATTEMPT, LESSON_COMPLETED, AchievementEvent, AchievementRule, apply_events, progress
+)
+
+# Rows changed by one evaluation: (user id, rule, progress)
+ProgressChange = Tuple[uuid.UUID, AchievementRule, int]
+
+
+class AchievementService:
+    """
+    Evaluates achievements incrementally from stored per-user rule state
+
+    Each call costs four statements however many users, events and rules it
+    covers: create missing state rows, lock and read the states, write them
+    back, and upsert the achievements whose progress moved.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, user_id: uuid.UUID, events: Sequence[AchievementEvent]) -> List[AchievementRule]:
+        """
+        Apply one user's new events
+
+        Returns:
+            Achievements earned by these events
+        """
+        earned = await self.record_many({user_id: events})
+        return earned.get(user_id, [])
+
+    async def record_many(
+        self,
+        events_by_user: Dict[uuid.UUID, Sequence[AchievementEvent]]
+    ) -> Dict[uuid.UUID, List[AchievementRule]]:
+        """
+        Apply new events for several users in one batch
+
+        Args:
+            events_by_user: Events per user, in any order
+
+        Returns:
+            Achievements earned per user (users who earned none are omitted)
+        """
+        users = sorted(user_id for user_id, events in events_by_user.items() if events)
+        if not users:
+            return {}
+
+        stored = await self._lock_states(users)
+
+        states, changes, earned = [], [], {}
+        for user_id in users:
+            events = sorted(events_by_user[user_id], key=lambda event: event.at)
+            before = progress(stored[user_id].state)
+            state = apply_events(stored[user_id].state, events)
+            after = progress(state)
+            states.append({
+                "id": uuid.uuid4(), "user_id": user_id, "state": state,
+                "event_count": stored[user_id].event_count + len(events),
+            })
+            for rule in ACHIEVEMENTS:
+                if after[rule.key] != before[rule.key]:
+                    changes.append((user_id, rule, after[rule.key]))
+                    if after[rule.key] >= rule.target:
+                        earned.setdefault(user_id, []).append(rule)
+
+        await self._store(states, changes)
+        return earned
+
+    async def rebuild(self, user_id: uuid.UUID) -> int:
+        """
+        Recompute a user's rule state from their full history
+
+        Used to backfill users who were active before achievements were
+        evaluated, or after rules change. Progress is overwritten, but
+        achievements already earned stay earned.
+
+        Returns:
+            Number of events replayed
+        """
+        # Holds off live events for this user until the rebuild commits
+        await self._lock_states([user_id])
+        attempts = (await self.db.execute(
+            select(QuestionAttempt.created_at, QuestionAttempt.is_correct, QuestionAttempt.time_taken)
+            .where(QuestionAttempt.user_id == user_id)
+            .order_by(QuestionAttempt.created_at)
+        )).all()
+        completions = (await self.db.execute(
+            select(LessonProgress.completed_at)
+            .where(LessonProgress.user_id == user_id, LessonProgress.is_completed.is_(True))
+        )).scalars().all()
+
+        events = [
+            AchievementEvent(ATTEMPT, attempt.created_at, attempt.is_correct, attempt.time_taken)
+            for attempt in attempts
+        ] + [
+            AchievementEvent(LESSON_COMPLETED, datetime.fromisoformat(completed_at))
+            for completed_at in completions if completed_at
+        ]
+        events.sort(key=lambda event: event.at)
+
+        state = apply_events({}, events)
+        after = progress(state)
+        await self._store(
+            [{"id": uuid.uuid4(), "user_id": user_id, "state": state, "event_count": len(events)}],
+            [(user_id, rule, after[rule.key]) for rule in ACHIEVEMENTS if after[rule.key] > 0],
+            replace=True,
+        )
+        return len(events)
+
+    async def _lock_states(self, users: List[uuid.UUID]) -> Dict[uuid.UUID, Row]:
+        """Create missing state rows, then lock and read them in user order (no deadlocks)"""
+        await self.db.execute(
+            pg_insert(UserAchievementState)
+            .on_conflict_do_nothing(index_elements=[UserAchievementState.user_id]),
+            [{"id": uuid.uuid4(), "user_id": user_id, "state": {}, "event_count": 0} for user_id in users]
+        )
+        rows = await self.db.execute(
+            select(UserAchievementState.user_id, UserAchievementState.state, UserAchievementState.event_count)
+            .where(UserAchievementState.user_id.in_(users))
+            .order_by(UserAchievementState.user_id)
+            .with_for_update()
+        )
+        return {row.user_id: row for row in rows.all()}
+
+    async def _store(self, states: List[Dict], changes: List[ProgressChange], replace: bool = False) -> None:
+        statement = pg_insert(UserAchievementState)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UserAchievementState.user_id],
+                set_={
+                    "state": statement.excluded.state,
+                    "event_count": statement.excluded.event_count,
+                    "updated_at": func.now(),
+                },
+            ),
+            states
+        )
+        if not changes:
+            return
+
+        earned_at = datetime.now(timezone.utc).isoformat()
+        statement = pg_insert(UserAchievement)
+        current = UserAchievement.current_progress
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                constraint="unique_user_achievement",
+                set_={
+                    # Progress never goes backwards on an incremental update
+                    "current_progress": (
+                        statement.excluded.current_progress if replace
+                        else func.greatest(current, statement.excluded.current_progress)
+                    ),
+                    "target_progress": statement.excluded.target_progress,
+                    "is_completed": or_(UserAchievement.is_completed, statement.excluded.is_completed),
+                    "earned_at": func.coalesce(UserAchievement.earned_at, statement.excluded.earned_at),
+                    "updated_at": func.now(),
+                },
+            ),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "achievement_type": rule.achievement_type,
+                    "achievement_key": rule.key,
+                    "title": rule.title,
+                    "description": rule.description,
+                    "current_progress": value,
+                    "target_progress": rule.target,
+                    "is_completed": value >= rule.target,
+                    "category": rule.category,
+                    "difficulty": rule.difficulty,
+                    "points_reward": rule.points_reward,
+                    "earned_at": earned_at if value >= rule.target else None,
+                }
+                for user_id, rule, value in changes
+            ]
+        )
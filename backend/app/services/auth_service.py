@@ -2,10 +2,12 @@
 Authentication service for user management and authentication
 """
 
+import copy
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
 from fastapi import HTTPException, status
 import logging
 
@@ -14,13 +16,28 @@ from app.schemas.auth import (
     UserCreate, UserLogin, UserUpdate, UserPreferencesUpdate,
     PasswordReset, PasswordResetConfirm, ChangePassword
 )
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.revocation import revocation_list
 from app.core.security import (
-    verify_password, get_password_hash, generate_verification_token,
+    verify_password_async, get_password_hash_async, generate_verification_token,
     create_token_response, get_user_roles
 )
 
 logger = logging.getLogger(__name__)
 
+# Per-process cache of user column values keyed by user ID, used by
+# get_current_user to skip the users lookup on most requests
+user_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# Credentials are never cached; they are always read fresh from the database
+USER_CACHE_EXCLUDED_FIELDS = frozenset({
+    "password_hash", "verification_token", "reset_password_token"
+})
+
 
 class AuthService:
     """Authentication and user management service"""
@@ -51,7 +68,7 @@ class AuthService:
                 )
             
             # Create new user
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await get_password_hash_async(user_data.password)
             verification_token = generate_verification_token()
             
             new_user = User(
@@ -154,7 +171,7 @@ class AuthService:
                 )
             
             # Verify password
-            if not verify_password(login_data.password, user.password_hash):
+            if not await verify_password_async(login_data.password, user.password_hash):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid email or password"
@@ -228,6 +245,45 @@ class AuthService:
             logger.error(f"Error getting user by ID {user_id}: {e}")
             return None
     
+    async def get_cached_user(self, user_id: str) -> Optional[User]:
+        """
+        Get user by ID through the in-process snapshot cache
+        
+        On a cache hit no query is made and a fresh detached User is built
+        from the snapshot, so requests never share an instance. Credential
+        columns are not loaded on cached instances.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            User object or None if not found
+        """
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            user = User(**copy.deepcopy(snapshot))
+            make_transient_to_detached(user)
+            return user
+        
+        user = await self.get_user_by_id(user_id)
+        if user is not None:
+            user_cache.set(user_id, {
+                column.key: copy.deepcopy(getattr(user, column.key))
+                for column in User.__table__.columns
+                if column.key not in USER_CACHE_EXCLUDED_FIELDS
+            })
+        return user
+    
+    @staticmethod
+    def invalidate_cached_user(user_id: Any) -> None:
+        """
+        Drop a user's cached snapshot after their account data changes
+        
+        Args:
+            user_id: User ID
+        """
+        user_cache.pop(str(user_id))
+    
     async def get_user_by_email(self, email: str) -> Optional[User]:
         """
         Get user by email
@@ -277,6 +333,7 @@ class AuthService:
             user.updated_at = datetime.utcnow()
             await self.db.commit()
             await self.db.refresh(user)
+            self.invalidate_cached_user(user.id)
             
             logger.info(f"User profile updated: {user.email}")
             
@@ -488,11 +545,12 @@ class AuthService:
                 )
             
             # Update password and clear reset token
-            user.password_hash = get_password_hash(reset_data.new_password)
+            user.password_hash = await get_password_hash_async(reset_data.new_password)
             user.reset_password_token = None
             user.updated_at = datetime.utcnow()
             
             await self.db.commit()
+            self.invalidate_cached_user(user.id)
             
             logger.info(f"Password reset completed for: {user.email}")
             
@@ -531,17 +589,18 @@ class AuthService:
                 )
             
             # Verify current password
-            if not verify_password(password_data.current_password, user.password_hash):
+            if not await verify_password_async(password_data.current_password, user.password_hash):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Current password is incorrect"
                 )
             
             # Update password
-            user.password_hash = get_password_hash(password_data.new_password)
+            user.password_hash = await get_password_hash_async(password_data.new_password)
             user.updated_at = datetime.utcnow()
             
             await self.db.commit()
+            self.invalidate_cached_user(user.id)
             
             logger.info(f"Password changed for user: {user.email}")
             
@@ -595,6 +654,7 @@ class AuthService:
             user.updated_at = datetime.utcnow()
             
             await self.db.commit()
+            self.invalidate_cached_user(user.id)
             
             logger.info(f"Email verified for user: {user.email}")
             
@@ -614,6 +674,9 @@ class AuthService:
         """
         Refresh access token using refresh token
         
+        The presented refresh token is revoked, so each one can be used once;
+        concurrent refreshes with the same token get one new pair between them.
+        
         Args:
             refresh_token: Valid refresh token
             
@@ -637,6 +700,15 @@ class AuthService:
                     detail="Invalid refresh token"
                 )
             
+            # Tokens issued before rotation carry no ID to claim; they are not
+            # a replay, the client just has to sign in again
+            if not payload.get("jti"):
+                logger.info(f"Refresh token without an ID rejected for user: {email}")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token format is no longer supported, please log in again"
+                )
+            
             # Get user to check if still active
             user = await self.get_user_by_id(user_id)
             if not user or not user.is_active:
@@ -645,6 +717,15 @@ class AuthService:
                     detail="User not found or inactive"
                 )
             
+            # Rotate: claiming the token's ID is atomic, so a refresh token
+            # presented twice (a replay, or two racing refreshes) wins once
+            if not await revocation_list.revoke(payload["jti"], payload["exp"]):
+                logger.warning(f"Refresh token reuse rejected for user: {email}")
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token has already been used"
+                )
+            
             # Generate new tokens
             user_roles = get_user_roles(
                 is_premium=user.is_premium,
@@ -0,0 +1,251 @@
+"""
+Buffered increments for denormalized content counters
+
+Lesson.view_count, Question.attempt_count and the other analytics counters
+sit on rows every learner touches. Incrementing them inline makes popular
+lessons a row-lock queue, so increments are summed in memory instead and
+applied periodically as one set-based UPDATE per table.
+
+Each worker process is one shard of the total; within a process, counters
+are split over lock-striped shards so threads can increment without
+contending on a single lock. Everything a shard holds is a sum, so shards
+merge by addition. Question.average_time is carried as (attempts, total
+seconds) and folded into the stored average weighted by the stored
+attempt_count, which gives the same result in whatever order shards flush.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# table -> deltas carried per row, in order
+COUNTER_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "lessons": ("views", "completions"),
+    "questions": ("attempts", "correct", "total_time"),
+    "question_sets": ("uses",),
+}
+
+# updated_at is deliberately left alone: counters are not content edits and
+# must not make the search index catch-up reindex every viewed lesson
+UPDATE_SQL: Dict[str, str] = {
+    "lessons": """
+        UPDATE lessons SET
+            view_count = lessons.view_count + v.views,
+            completion_count = lessons.completion_count + v.completions
+        FROM unnest(CAST(:ids AS uuid[]), CAST(:views AS int[]), CAST(:completions AS int[]))
+            AS v(id, views, completions)
+        WHERE lessons.id = v.id
+    """,
+    "questions": """
+        UPDATE questions SET
+            attempt_count = questions.attempt_count + v.attempts,
+            correct_count = questions.correct_count + v.correct,
+            average_time = round(
+                (COALESCE(questions.average_time, 0)::numeric * questions.attempt_count + v.total_time)
+                / GREATEST(questions.attempt_count + v.attempts, 1)
+            )
+        FROM unnest(CAST(:ids AS uuid[]), CAST(:attempts AS int[]), CAST(:correct AS int[]),
+                    CAST(:total_time AS bigint[]))
+            AS v(id, attempts, correct, total_time)
+        WHERE questions.id = v.id
+    """,
+    "question_sets": """
+        UPDATE question_sets SET usage_count = question_sets.usage_count + v.uses
+        FROM unnest(CAST(:ids AS uuid[]), CAST(:uses AS int[])) AS v(id, uses)
+        WHERE question_sets.id = v.id
+    """,
+}
+
+CounterKey = Tuple[str, uuid.UUID]  # (table, row id)
+
+
+class _Shard:
+    """One lock stripe of pending increments"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deltas: Dict[CounterKey, List[int]] = {}
+        self.oldest: Optional[float] = None  # monotonic time of the first unflushed increment
+
+
+class CounterBuffer:
+    """
+    Per-process accumulator of content counter increments
+
+    Increments are thread-safe and never touch the database. A background
+    task applies them every ``flush_interval`` seconds, and ``stop`` (from
+    the application lifespan) applies what is left. A failed flush is added
+    back and retried on the next interval.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval: float = 5.0,
+        shards: int = 8
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+        self.last_flush_lag = 0.0  # seconds the oldest increment waited in the last flush
+        self.max_flush_lag = 0.0
+
+    def __len__(self) -> int:
+        return sum(len(shard.deltas) for shard in self._shards)
+
+    def lesson_viewed(self, lesson_id: uuid.UUID) -> None:
+        self._increment("lessons", lesson_id, (1, 0))
+
+    def lesson_completed(self, lesson_id: uuid.UUID) -> None:
+        self._increment("lessons", lesson_id, (0, 1))
+
+    def question_attempted(self, question_id: uuid.UUID, is_correct: bool, time_taken: int) -> None:
+        """Count an attempt; time_taken (seconds) feeds Question.average_time"""
+        self._increment("questions", question_id, (1, int(is_correct), max(0, int(time_taken))))
+
+    def question_set_used(self, question_set_id: uuid.UUID) -> None:
+        self._increment("question_sets", question_set_id, (1,))
+
+    def pending(self, table: str, row_id: uuid.UUID) -> Optional[Dict[str, int]]:
+        """Unflushed deltas of one row, so reads can include them"""
+        key = (table, row_id)
+        shard = self._shard(key)
+        with shard.lock:
+            deltas = shard.deltas.get(key)
+            return dict(zip(COUNTER_COLUMNS[table], deltas)) if deltas else None
+
+    def _shard(self, key: CounterKey) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _increment(self, table: str, row_id: uuid.UUID, deltas: Tuple[int, ...], at: Optional[float] = None) -> None:
+        key = (table, row_id)
+        shard = self._shard(key)
+        with shard.lock:
+            current = shard.deltas.get(key)
+            if current is None:
+                shard.deltas[key] = list(deltas)
+            else:
+                for i, delta in enumerate(deltas):
+                    current[i] += delta
+            now = at if at is not None else time.monotonic()
+            if shard.oldest is None or now < shard.oldest:
+                shard.oldest = now
+
+    def _drain(self) -> Tuple[Dict[CounterKey, List[int]], Optional[float]]:
+        """Take every shard's increments, summed per row"""
+        merged: Dict[CounterKey, List[int]] = {}
+        oldest = None
+        for shard in self._shards:
+            with shard.lock:
+                deltas, shard.deltas = shard.deltas, {}
+                started, shard.oldest = shard.oldest, None
+            if started is not None and (oldest is None or started < oldest):
+                oldest = started
+            # A key always maps to the same shard, so no summing across shards
+            merged.update(deltas)
+        return merged, oldest
+
+    async def flush(self) -> int:
+        """
+        Apply all pending increments, one UPDATE per table
+
+        Returns:
+            Number of rows updated (0 if the write failed and was requeued)
+        """
+        async with self._flush_lock:
+            batch, oldest = self._drain()
+            if not batch:
+                return 0
+            lag = time.monotonic() - oldest
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to flush {len(batch)} content counters: {e}")
+                for (table, row_id), deltas in batch.items():
+                    self._increment(table, row_id, tuple(deltas), at=oldest)
+                return 0
+
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            self.last_flush_lag = lag
+            self.max_flush_lag = max(self.max_flush_lag, lag)
+            return len(batch)
+
+    async def _write(self, batch: Dict[CounterKey, List[int]]) -> None:
+        by_table: Dict[str, List[Tuple[uuid.UUID, List[int]]]] = {}
+        for (table, row_id), deltas in batch.items():
+            by_table.setdefault(table, []).append((row_id, deltas))
+
+        async with self.session_factory() as session:
+            for table, rows in by_table.items():
+                # Same row order in every worker, so concurrent flushes lock rows consistently
+                rows.sort(key=lambda row: row[0])
+                parameters = {"ids": [row_id for row_id, _ in rows]}
+                for i, column in enumerate(COUNTER_COLUMNS[table]):
+                    parameters[column] = [deltas[i] for _, deltas in rows]
+                await session.execute(text(UPDATE_SQL[table]), parameters)
+            await session.commit()
+
+    async def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Content counter flush loop error: {e}")
+
+    async def stop(self) -> None:
+        """Stop the flush task and apply what is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if len(self):
+            logger.error(f"{len(self)} content counters could not be written on shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pending rows, flush counters and flush lag"""
+        oldest = [shard.oldest for shard in self._shards if shard.oldest is not None]
+        return {
+            "pending": len(self),
+            "oldest_pending_seconds": (time.monotonic() - min(oldest)) if oldest else 0.0,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failures": self.failures,
+            "last_flush_lag_seconds": self.last_flush_lag,
+            "max_flush_lag_seconds": self.max_flush_lag,
+        }
+
+
+counter_buffer = CounterBuffer(
+    flush_interval=settings.COUNTER_FLUSH_INTERVAL_SECONDS,
+    shards=settings.COUNTER_BUFFER_SHARDS,
+)
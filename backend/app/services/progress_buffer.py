@@ -0,0 +1,332 @@
+"""
+Write-coalescing buffer for LessonProgress updates
+
+Section views arrive many times a minute per active learner. Instead of one
+row-locking UPDATE per click, deltas are merged in memory per (user, lesson)
+and written periodically as a single INSERT ... ON CONFLICT upsert on
+unique_user_lesson_progress covering every buffered row.
+
+Crash safety is bounded rather than absolute: a worker that dies loses at
+most ``flush_interval`` seconds (or ``max_entries`` rows) of progress. If the
+database is unavailable, failed batches are merged back and retried, and
+beyond ``max_pending`` rows the oldest progress is dropped and counted.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, column, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.achievement_engine import LESSON_COMPLETED, AchievementEvent
+from app.services.achievement_service import AchievementService
+from app.services.counter_buffer import counter_buffer
+
+logger = logging.getLogger(__name__)
+
+ProgressKey = Tuple[uuid.UUID, uuid.UUID]  # (user_id, lesson_id)
+
+
+@dataclass
+class PendingProgress:
+    """Merged, not yet written progress of one user on one lesson"""
+    total_sections: int
+    time_spent: int = 0  # seconds
+    # section id -> state; "completed": true is only ever added, never removed
+    sections: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    first_accessed_at: str = ""
+    last_accessed_at: str = ""
+    recorded_at: float = field(default_factory=time.monotonic)  # first unflushed delta
+
+    def merge(self, other: "PendingProgress") -> None:
+        """Fold a later delta for the same row into this one"""
+        self.total_sections = other.total_sections
+        self.time_spent += other.time_spent
+        for section_id, state in other.sections.items():
+            self.sections.setdefault(section_id, {}).update(state)
+        self.first_accessed_at = min(self.first_accessed_at, other.first_accessed_at)
+        self.last_accessed_at = max(self.last_accessed_at, other.last_accessed_at)
+        self.recorded_at = min(self.recorded_at, other.recorded_at)
+
+
+# Sections completed by this flush that the stored row did not have yet
+_NEWLY_COMPLETED = """(
+    SELECT count(*) FROM jsonb_each(EXCLUDED.section_progress) AS added
+    WHERE added.value->>'completed' = 'true'
+      AND COALESCE(lesson_progress.section_progress->added.key->>'completed', 'false') <> 'true'
+)"""
+_SECTIONS_COMPLETED = f"LEAST(lesson_progress.sections_completed + {_NEWLY_COMPLETED}, EXCLUDED.total_sections)"
+
+UPSERT_SQL = f"""
+INSERT INTO lesson_progress (
+    id, user_id, lesson_id, total_sections, sections_completed, completion_percentage,
+    time_spent, section_progress, first_started_at, last_accessed_at, is_completed, completed_at,
+    questions_attempted, questions_correct, accuracy_rate, is_bookmarked
+)
+SELECT
+    gen_random_uuid(), v.user_id, v.lesson_id, v.total_sections,
+    LEAST(v.completed, v.total_sections),
+    CASE WHEN v.total_sections > 0 THEN round(100.0 * LEAST(v.completed, v.total_sections) / v.total_sections, 2) ELSE 0 END,
+    v.time_spent, v.section_progress::jsonb, v.first_accessed_at, v.last_accessed_at,
+    v.total_sections > 0 AND v.completed >= v.total_sections,
+    CASE WHEN v.total_sections > 0 AND v.completed >= v.total_sections THEN v.last_accessed_at END,
+    0, 0, 0, false
+FROM unnest(
+    CAST(:user_ids AS uuid[]), CAST(:lesson_ids AS uuid[]), CAST(:total_sections AS int[]),
+    CAST(:completed AS int[]), CAST(:time_spent AS int[]), CAST(:section_progress AS text[]),
+    CAST(:first_accessed_at AS text[]), CAST(:last_accessed_at AS text[])
+) AS v(user_id, lesson_id, total_sections, completed, time_spent, section_progress,
+       first_accessed_at, last_accessed_at)
+ON CONFLICT ON CONSTRAINT unique_user_lesson_progress DO UPDATE SET
+    time_spent = lesson_progress.time_spent + EXCLUDED.time_spent,
+    total_sections = EXCLUDED.total_sections,
+    sections_completed = {_SECTIONS_COMPLETED},
+    completion_percentage = CASE WHEN EXCLUDED.total_sections > 0
+        THEN round(100.0 * {_SECTIONS_COMPLETED} / EXCLUDED.total_sections, 2) ELSE 0 END,
+    is_completed = lesson_progress.is_completed
+        OR (EXCLUDED.total_sections > 0 AND {_SECTIONS_COMPLETED} >= EXCLUDED.total_sections),
+    completed_at = COALESCE(lesson_progress.completed_at, CASE
+        WHEN EXCLUDED.total_sections > 0 AND {_SECTIONS_COMPLETED} >= EXCLUDED.total_sections
+        THEN EXCLUDED.last_accessed_at END),
+    section_progress = (
+        SELECT COALESCE(jsonb_object_agg(key, COALESCE(stored.value, '{{}}'::jsonb) || added.value), '{{}}'::jsonb)
+        FROM jsonb_each(EXCLUDED.section_progress) AS added
+        LEFT JOIN jsonb_each(COALESCE(lesson_progress.section_progress, '{{}}'::jsonb)) AS stored USING (key)
+    ) || (
+        SELECT COALESCE(jsonb_object_agg(key, value), '{{}}'::jsonb)
+        FROM jsonb_each(COALESCE(lesson_progress.section_progress, '{{}}'::jsonb))
+        WHERE NOT EXCLUDED.section_progress ? key
+    ),
+    first_started_at = COALESCE(lesson_progress.first_started_at, EXCLUDED.first_started_at),
+    last_accessed_at = GREATEST(lesson_progress.last_accessed_at, EXCLUDED.last_accessed_at),
+    updated_at = now()
+RETURNING user_id, lesson_id, completed_at
+"""
+UPSERT = text(UPSERT_SQL).columns(
+    column("user_id", UUID(as_uuid=True)), column("lesson_id", UUID(as_uuid=True)), column("completed_at", String)
+)
+
+
+class ProgressBuffer:
+    """
+    Per-process accumulator of lesson progress deltas
+
+    ``record`` only touches memory. A background task flushes every
+    ``flush_interval`` seconds, or as soon as ``max_entries`` rows are
+    pending; ``stop`` (from the application lifespan) flushes what is left.
+    Entries are only touched from the event loop thread, so no locking is
+    done.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval: float = 2.0,
+        max_entries: int = 1000,
+        max_pending: int = 20000
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_entries = max(1, max_entries)
+        self.max_pending = max(self.max_entries, max_pending)
+        # In recorded_at order: a merge keeps a row's earliest recorded_at, so
+        # new keys are always the newest and the first entry is the oldest
+        self._pending: OrderedDict[ProgressKey, PendingProgress] = OrderedDict()
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_lag = 0.0  # seconds the oldest delta waited in the last flush
+        self.max_flush_lag = 0.0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        user_id: uuid.UUID,
+        lesson_id: uuid.UUID,
+        total_sections: int,
+        section_id: Optional[str] = None,
+        seconds: int = 0,
+        completed: bool = False,
+        state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Buffer one progress event
+
+        Args:
+            user_id: Learner
+            lesson_id: Lesson being studied
+            total_sections: Number of sections in the lesson
+            section_id: Section viewed, if any
+            seconds: Time spent since the previous event
+            completed: Whether the section is now completed
+            state: Extra section state (e.g. scroll position), merged per key
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        delta = PendingProgress(
+            total_sections=total_sections,
+            time_spent=max(0, int(seconds)),
+            first_accessed_at=now,
+            last_accessed_at=now,
+        )
+        if section_id is not None:
+            section = dict(state or {})
+            section.pop("completed", None)
+            if completed:
+                section["completed"] = True
+            delta.sections[str(section_id)] = section
+        self._add((user_id, lesson_id), delta)
+
+        if len(self._pending) >= self.max_entries:
+            self._flush_requested.set()
+
+    def pending(self, user_id: uuid.UUID, lesson_id: uuid.UUID) -> Optional[PendingProgress]:
+        """Unflushed progress for a row, so reads can include it"""
+        return self._pending.get((user_id, lesson_id))
+
+    def _add(self, key: ProgressKey, delta: PendingProgress) -> None:
+        existing = self._pending.get(key)
+        if existing is None:
+            self._pending[key] = delta
+        else:
+            existing.merge(delta)
+
+        # Past the hard bound (database down), shed the oldest progress
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+
+    async def flush(self) -> int:
+        """
+        Write all buffered progress with one upsert
+
+        Returns:
+            Number of rows written (0 if the write failed and was requeued)
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, OrderedDict()
+            self._flush_requested.clear()
+
+            lag = time.monotonic() - next(iter(batch.values())).recorded_at
+            try:
+                await self._write(batch)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to flush {len(batch)} lesson progress rows: {e}")
+                # Older deltas first, so newer ones win on merge
+                requeued, self._pending = self._pending, OrderedDict()
+                for key, entry in batch.items():
+                    self._add(key, entry)
+                for key, entry in requeued.items():
+                    self._add(key, entry)
+                return 0
+
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            self.last_flush_lag = lag
+            self.max_flush_lag = max(self.max_flush_lag, lag)
+            return len(batch)
+
+    async def _write(self, batch: Dict[ProgressKey, PendingProgress]) -> None:
+        # Same row order in every worker, so concurrent flushes lock rows consistently
+        entries = sorted(batch.items(), key=lambda item: item[0])
+        parameters = {
+            "user_ids": [user_id for (user_id, _), _ in entries],
+            "lesson_ids": [lesson_id for (_, lesson_id), _ in entries],
+            "total_sections": [entry.total_sections for _, entry in entries],
+            "completed": [
+                sum(1 for section in entry.sections.values() if section.get("completed"))
+                for _, entry in entries
+            ],
+            "time_spent": [entry.time_spent for _, entry in entries],
+            "section_progress": [json.dumps(entry.sections) for _, entry in entries],
+            "first_accessed_at": [entry.first_accessed_at for _, entry in entries],
+            "last_accessed_at": [entry.last_accessed_at for _, entry in entries],
+        }
+        async with self.session_factory() as session:
+            result = await session.execute(UPSERT, parameters)
+            # completed_at is only ever set once, to the last access of the
+            # flush that completed the lesson
+            completions: Dict[uuid.UUID, List[AchievementEvent]] = {}
+            completed_lessons = []
+            for row in result:
+                entry = batch[(row.user_id, row.lesson_id)]
+                if row.completed_at is not None and row.completed_at == entry.last_accessed_at:
+                    completions.setdefault(row.user_id, []).append(AchievementEvent(
+                        LESSON_COMPLETED, datetime.fromisoformat(row.completed_at)
+                    ))
+                    completed_lessons.append(row.lesson_id)
+            await AchievementService(session).record_many(completions)
+            await session.commit()
+        # Only once committed: a failed flush is retried and would count again
+        for lesson_id in completed_lessons:
+            counter_buffer.lesson_completed(lesson_id)
+
+    async def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Lesson progress flush loop error: {e}")
+
+    async def stop(self) -> None:
+        """Stop the flush task and write what is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"{len(self._pending)} lesson progress rows could not be written on shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get buffer size, flush counters and flush lag"""
+        oldest = next(iter(self._pending.values())).recorded_at if self._pending else None
+        return {
+            "pending": len(self._pending),
+            "oldest_pending_seconds": (time.monotonic() - oldest) if oldest is not None else 0.0,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_lag_seconds": self.last_flush_lag,
+            "max_flush_lag_seconds": self.max_flush_lag,
+        }
+
+
+progress_buffer = ProgressBuffer(
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_entries=settings.PROGRESS_FLUSH_MAX_ENTRIES,
+    max_pending=settings.PROGRESS_BUFFER_MAX_PENDING,
+)
@@ -0,0 +1,537 @@
+"""
+In-memory inverted index for published lessons and questions
+
+Postings are kept as parallel ``array`` columns (document ids and weighted
+term frequencies) rather than per-document objects, documents are ranked with
+BM25, and facet values (kind, level, skill, topic, type, difficulty) are
+bitsets: filters are ANDed together before scoring, and facet counts for any
+filter combination are popcounts of the same bitsets. Misspelled query words
+are matched to nearby vocabulary terms (see app.services.spelling). Updates
+are incremental: a changed document gets a new internal id and the old one is
+tombstoned until the next compaction.
+"""
+
+import heapq
+import math
+import os
+import pickle
+import re
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.spelling import SymSpell, max_edit_distance
+
+SNAPSHOT_VERSION = 2
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "with",
+})
+
+# Weighted term frequency per field (a simplified BM25F)
+FIELD_WEIGHTS = {
+    "title": 2.0,
+    "stem": 2.0,
+    "tags": 1.5,
+    "topic": 1.5,
+    "description": 1.0,
+}
+
+FACETS = ("kind", "level", "skill", "topic", "type", "difficulty")
+
+# Score multiplier for terms matched through a spelling correction, by edit
+# distance, so exact matches keep ranking above fuzzy ones
+FUZZY_WEIGHTS = {1: 0.6, 2: 0.4}
+MAX_CORRECTIONS_PER_TERM = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into index terms, dropping stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class Bitset:
+    """Growable bitset over internal document ids"""
+
+    __slots__ = ("bits", "_value")
+
+    def __init__(self, bits: Optional[bytearray] = None):
+        self.bits = bits if bits is not None else bytearray()
+        self._value: Optional[int] = None
+
+    def add(self, doc: int) -> None:
+        index = doc >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index + 1 - len(self.bits)))
+        self.bits[index] |= 1 << (doc & 7)
+        self._value = None
+
+    def discard(self, doc: int) -> None:
+        index = doc >> 3
+        if index < len(self.bits):
+            self.bits[index] &= ~(1 << (doc & 7)) & 0xFF
+            self._value = None
+
+    def __contains__(self, doc: int) -> bool:
+        index = doc >> 3
+        return index < len(self.bits) and bool(self.bits[index] >> (doc & 7) & 1)
+
+    def as_int(self) -> int:
+        """The bitset as an int, cached until the next mutation"""
+        if self._value is None:
+            self._value = int.from_bytes(self.bits, "little")
+        return self._value
+
+    def __len__(self) -> int:
+        return self.as_int().bit_count()
+
+
+@dataclass
+class SearchDocument:
+    """A lesson or question as seen by the index"""
+    key: str  # "<kind>:<id>"
+    fields: Dict[str, str]
+    facets: Dict[str, str]
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SearchHit:
+    key: str
+    score: float
+    meta: Dict[str, Any]
+
+
+@dataclass
+class SearchResults:
+    total: int
+    hits: List[SearchHit]
+    corrections: Dict[str, str] = field(default_factory=dict)  # typed term -> best correction
+
+
+@dataclass
+class FacetCounts:
+    total: int
+    facets: Dict[str, Dict[str, int]]
+
+
+class _Postings:
+    __slots__ = ("doc_ids", "freqs")
+
+    def __init__(self):
+        self.doc_ids = array("I")
+        self.freqs = array("f")
+
+
+class InvertedIndex:
+    """
+    BM25 inverted index with bitset facet filters
+
+    Not thread-safe; it is meant to be used from the event loop only.
+    Corpus statistics (document count, average length, document frequency)
+    include tombstoned documents until the next compaction.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, compact_ratio: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self.postings: Dict[str, _Postings] = {}
+        self.doc_keys: List[Optional[str]] = []
+        self.doc_meta: List[Optional[Dict[str, Any]]] = []
+        self.doc_facets: List[Optional[Dict[str, str]]] = []
+        self.doc_lengths = array("f")
+        self.total_length = 0.0
+        self.key_to_doc: Dict[str, int] = {}
+        self.alive = Bitset()
+        self.facets: Dict[str, Dict[str, Bitset]] = {name: {} for name in FACETS}
+        self.built_at = time.time()
+        self._norms: Optional[array] = None
+        self._norms_average = 0.0
+        self.speller = SymSpell()
+
+    def __len__(self) -> int:
+        return len(self.key_to_doc)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_doc
+
+    def add(self, document: SearchDocument) -> None:
+        """Index a document, replacing any previous version with the same key"""
+        if document.key in self.key_to_doc:
+            self._tombstone(document.key)
+            self._maybe_compact()
+
+        doc = len(self.doc_keys)
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+        for name, text in document.fields.items():
+            weight = FIELD_WEIGHTS.get(name, 1.0)
+            for term in tokenize(text or ""):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+
+        for term, frequency in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = _Postings()
+                self.speller.add(term)
+            postings.doc_ids.append(doc)
+            postings.freqs.append(frequency)
+
+        self.doc_keys.append(document.key)
+        self.doc_meta.append(document.meta)
+        facets = {
+            name: value for name, value in document.facets.items()
+            if name in self.facets and value is not None
+        }
+        self.doc_facets.append(facets)
+        self.doc_lengths.append(length)
+        self.total_length += length
+        self.key_to_doc[document.key] = doc
+        self.alive.add(doc)
+        for name, value in facets.items():
+            self.facets[name].setdefault(value, Bitset()).add(doc)
+
+    def add_many(self, documents: Iterable[SearchDocument]) -> None:
+        for document in documents:
+            self.add(document)
+
+    def remove(self, key: str) -> bool:
+        """Remove a document by key; returns False if it was not indexed"""
+        if key not in self.key_to_doc:
+            return False
+        self._tombstone(key)
+        self._maybe_compact()
+        return True
+
+    def _tombstone(self, key: str) -> None:
+        doc = self.key_to_doc.pop(key)
+        self.alive.discard(doc)
+        for name, value in self.doc_facets[doc].items():
+            self.facets[name][value].discard(doc)
+        self.doc_keys[doc] = None
+        self.doc_meta[doc] = None
+        self.doc_facets[doc] = None
+
+    def _maybe_compact(self) -> None:
+        dead = len(self.doc_keys) - len(self.key_to_doc)
+        if dead > 1000 and dead > self.compact_ratio * len(self.doc_keys):
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop tombstoned documents and renumber the survivors"""
+        remap = array("i", [-1]) * len(self.doc_keys)
+        doc_keys, doc_meta, doc_facets, doc_lengths = [], [], [], array("f")
+        for old, key in enumerate(self.doc_keys):
+            if key is not None:
+                remap[old] = len(doc_keys)
+                doc_keys.append(key)
+                doc_meta.append(self.doc_meta[old])
+                doc_facets.append(self.doc_facets[old])
+                doc_lengths.append(self.doc_lengths[old])
+
+        postings: Dict[str, _Postings] = {}
+        for term, old_postings in self.postings.items():
+            new_postings = _Postings()
+            for old, frequency in zip(old_postings.doc_ids, old_postings.freqs):
+                new = remap[old]
+                if new >= 0:
+                    new_postings.doc_ids.append(new)
+                    new_postings.freqs.append(frequency)
+            if new_postings.doc_ids:
+                postings[term] = new_postings
+
+        facets: Dict[str, Dict[str, Bitset]] = {name: {} for name in FACETS}
+        alive = Bitset()
+        for doc, values in enumerate(doc_facets):
+            alive.add(doc)
+            for name, value in values.items():
+                facets[name].setdefault(value, Bitset()).add(doc)
+
+        self.postings = postings
+        self.doc_keys = doc_keys
+        self.doc_meta = doc_meta
+        self.doc_facets = doc_facets
+        self.doc_lengths = doc_lengths
+        self.total_length = sum(doc_lengths)
+        self.key_to_doc = {key: doc for doc, key in enumerate(doc_keys)}
+        self.alive = alive
+        self.facets = facets
+        self._norms = None
+        self.speller = SymSpell()
+        self.speller.add_many(postings)
+
+    def _length_norms(self) -> array:
+        """
+        Per-document BM25 length normalisation, k1 * (1 - b + b * dl / avgdl)
+
+        Cached; new documents are appended with the current average and the
+        whole array is only recomputed once the average drifts by over 1%.
+        """
+        doc_count = len(self.doc_keys)
+        average_length = self.total_length / doc_count if doc_count else 1.0
+        average_length = average_length or 1.0
+        k1, b = self.k1, self.b
+        if self._norms is None or abs(average_length - self._norms_average) > 0.01 * self._norms_average:
+            self._norms = array("f", (k1 * (1 - b + b * length / average_length) for length in self.doc_lengths))
+            self._norms_average = average_length
+        elif len(self._norms) < doc_count:
+            average_length = self._norms_average
+            self._norms.extend(
+                k1 * (1 - b + b * length / average_length)
+                for length in self.doc_lengths[len(self._norms):]
+            )
+        return self._norms
+
+    def _facet_masks(self, filters: Optional[Dict[str, Iterable[str]]]) -> Dict[str, int]:
+        """One bitset per filtered facet; values within a facet are ORed"""
+        masks = {}
+        for name, values in (filters or {}).items():
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            bitsets = self.facets.get(name, {})
+            combined = 0
+            for value in values:
+                bitset = bitsets.get(str(value))
+                if bitset is not None:
+                    combined |= bitset.as_int()
+            masks[name] = combined
+        return masks
+
+    def filter_mask(self, filters: Optional[Dict[str, Iterable[str]]] = None) -> int:
+        """
+        Combine facet filters into a bitset of matching live documents
+
+        Values within a facet are ORed, facets are ANDed.
+        """
+        mask = self.alive.as_int()
+        for facet_mask in self._facet_masks(filters).values():
+            mask &= facet_mask
+        return mask
+
+    def resolve_terms(self, query: str, fuzzy: bool = True) -> Tuple[List[Tuple[str, float]], Dict[str, str]]:
+        """
+        Map query words to index terms with a score weight
+
+        Words in the vocabulary match as-is (weight 1). Unknown words are
+        replaced by the closest vocabulary terms within max_edit_distance,
+        most frequent first, at a reduced weight.
+
+        Returns:
+            (term, weight) pairs and a typed-word -> best-correction map
+        """
+        weights: Dict[str, float] = {}
+        corrections: Dict[str, str] = {}
+        for word in dict.fromkeys(tokenize(query)):
+            if word in self.postings:
+                weights[word] = 1.0
+                continue
+            if not fuzzy:
+                continue
+            matches = self.speller.lookup(word, max_edit_distance(word))
+            if not matches:
+                continue
+            distance = matches[0][1]
+            closest = sorted(
+                (term for term, term_distance in matches if term_distance == distance),
+                key=lambda term: -len(self.postings[term].doc_ids),
+            )[:MAX_CORRECTIONS_PER_TERM]
+            corrections[word] = closest[0]
+            for term in closest:
+                weights[term] = max(weights.get(term, 0.0), FUZZY_WEIGHTS[distance])
+        return list(weights.items()), corrections
+
+    def match_mask(self, query: str) -> int:
+        """Bitset of documents containing any query term"""
+        bits = bytearray((len(self.doc_keys) + 7) // 8)
+        terms, _ = self.resolve_terms(query)
+        for term, _ in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            for doc in postings.doc_ids:
+                bits[doc >> 3] |= 1 << (doc & 7)
+        return int.from_bytes(bits, "little")
+
+    def facet_counts(
+        self,
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        facets: Iterable[str] = FACETS,
+        query: Optional[str] = None
+    ) -> FacetCounts:
+        """
+        Count documents per facet value for a filter combination
+
+        Counts are disjunctive: a facet's own filter is ignored when counting
+        that facet, so a UI can show how many results each alternative value
+        would give (e.g. level=A1 still reports counts for A2, B1, ...).
+
+        Args:
+            filters: Facet name to accepted values, as for search()
+            facets: Facets to count
+            query: Optional free-text query the documents must also match
+
+        Returns:
+            Total documents matching everything, and non-zero counts per facet
+        """
+        base = self.alive.as_int()
+        if query:
+            base &= self.match_mask(query)
+        masks = self._facet_masks(filters)
+
+        total = base
+        for facet_mask in masks.values():
+            total &= facet_mask
+
+        counts: Dict[str, Dict[str, int]] = {}
+        for name in facets:
+            mask = base
+            for other, facet_mask in masks.items():
+                if other != name:
+                    mask &= facet_mask
+            values = {}
+            if mask:
+                for value, bitset in self.facets.get(name, {}).items():
+                    count = (mask & bitset.as_int()).bit_count()
+                    if count:
+                        values[value] = count
+            counts[name] = values
+        return FacetCounts(total=total.bit_count(), facets=counts)
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        fuzzy: bool = True
+    ) -> SearchResults:
+        """
+        Rank documents matching any query term with BM25
+
+        Args:
+            query: Free-text query
+            filters: Facet name to accepted values, e.g. {"level": ["A1", "A2"]}
+            limit: Maximum hits to return
+            offset: Hits to skip
+            fuzzy: Match misspelled words to nearby vocabulary terms
+
+        Returns:
+            Total matching documents, the requested page of hits and any
+            spelling corrections applied
+        """
+        if not self.key_to_doc:
+            return SearchResults(total=0, hits=[])
+        terms, corrections = self.resolve_terms(query, fuzzy=fuzzy)
+        if not terms:
+            return SearchResults(total=0, hits=[])
+
+        mask_int = self.filter_mask(filters)
+        if not mask_int:
+            return SearchResults(total=0, hits=[], corrections=corrections)
+        doc_count = len(self.doc_keys)
+        # Skip per-posting mask checks when every allocated document matches
+        mask = None
+        if mask_int.bit_count() < doc_count:
+            mask = mask_int.to_bytes((doc_count + 7) // 8, "little")
+
+        norms = self._length_norms()
+        k1_plus_one = self.k1 + 1
+        scores: Dict[int, float] = {}
+        get_score = scores.get
+
+        for term, term_weight in terms:
+            postings = self.postings[term]
+            frequency_count = len(postings.doc_ids)
+            idf = math.log(1 + (doc_count - frequency_count + 0.5) / (frequency_count + 0.5))
+            weight = term_weight * idf * k1_plus_one
+            if mask is None:
+                for doc, frequency in zip(postings.doc_ids, postings.freqs):
+                    scores[doc] = get_score(doc, 0.0) + weight * frequency / (frequency + norms[doc])
+            else:
+                for doc, frequency in zip(postings.doc_ids, postings.freqs):
+                    if mask[doc >> 3] >> (doc & 7) & 1:
+                        scores[doc] = get_score(doc, 0.0) + weight * frequency / (frequency + norms[doc])
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])[offset:]
+        return SearchResults(
+            total=len(scores),
+            hits=[SearchHit(self.doc_keys[doc], score, self.doc_meta[doc]) for doc, score in top],
+            corrections=corrections,
+        )
+
+    def save(self, path: str) -> None:
+        """Write a snapshot atomically (temp file + rename)"""
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "built_at": self.built_at,
+            "params": (self.k1, self.b, self.compact_ratio),
+            "postings": {term: (p.doc_ids, p.freqs) for term, p in self.postings.items()},
+            "doc_keys": self.doc_keys,
+            "doc_meta": self.doc_meta,
+            "doc_facets": self.doc_facets,
+            "doc_lengths": self.doc_lengths,
+            "alive": bytes(self.alive.bits),
+            "facets": {
+                name: {value: bytes(bitset.bits) for value, bitset in values.items()}
+                for name, values in self.facets.items()
+            },
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as snapshot:
+                pickle.dump(state, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "InvertedIndex":
+        """
+        Restore a snapshot written by save()
+
+        Snapshots are pickles, so only load files this service wrote.
+
+        Raises:
+            ValueError: If the snapshot format version does not match
+        """
+        with open(path, "rb") as snapshot:
+            state = pickle.load(snapshot)
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported search snapshot version: {state.get('version')}")
+
+        k1, b, compact_ratio = state["params"]
+        index = cls(k1=k1, b=b, compact_ratio=compact_ratio)
+        index.built_at = state["built_at"]
+        for term, (doc_ids, freqs) in state["postings"].items():
+            postings = index.postings[term] = _Postings()
+            postings.doc_ids, postings.freqs = doc_ids, freqs
+        index.doc_keys = state["doc_keys"]
+        index.doc_meta = state["doc_meta"]
+        index.doc_facets = state["doc_facets"]
+        index.doc_lengths = state["doc_lengths"]
+        index.total_length = sum(index.doc_lengths)
+        index.key_to_doc = {key: doc for doc, key in enumerate(index.doc_keys) if key is not None}
+        index.alive = Bitset(bytearray(state["alive"]))
+        for name, values in state["facets"].items():
+            index.facets[name] = {value: Bitset(bytearray(bits)) for value, bits in values.items()}
+        # The spelling index is derived from the vocabulary, so it is not stored
+        index.speller.add_many(index.postings)
+        return index
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    """Split an index key into (kind, id)"""
+    kind, _, identifier = key.partition(":")
+    return kind, identifier
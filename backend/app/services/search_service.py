@@ -0,0 +1,405 @@
+"""
+Search service backed by the in-memory inverted index
+
+Keeps one InvertedIndex of published lessons and questions per process.
+On startup it restores the last snapshot (catching up on rows updated since)
+or rebuilds from the database. Afterwards, lessons and questions committed
+through this process are applied incrementally as soon as they commit, and
+a periodic catch-up picks up changes made by other workers.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, select
+
+from app.core.config import settings
+from app.core.database import ReadOnlySessionLocal, TrackedSession
+from app.models.content import Lesson, Question
+from app.services.search_index import FacetCounts, InvertedIndex, SearchDocument, SearchResults
+from app.services.suggest_index import Suggestion, SuggestIndex, SuggestIndexBuilder
+
+logger = logging.getLogger(__name__)
+
+PENDING_CHANGES_KEY = "search_index_changes"
+
+# Overlap applied to catch-up windows to absorb app/database clock skew
+CATCH_UP_MARGIN_SECONDS = 5.0
+
+# (key, document); a None document removes the key from the index
+Change = Tuple[str, Optional[SearchDocument]]
+
+
+def _tags_text(tags: Any) -> str:
+    if isinstance(tags, list):
+        return " ".join(str(tag) for tag in tags)
+    return ""
+
+
+def _difficulty(difficulty: Optional[int]) -> Optional[str]:
+    # Facet values are strings, matching query parameters
+    return None if difficulty is None else str(difficulty)
+
+
+def question_document(question: Any) -> SearchDocument:
+    """Build the index document for a Question (ORM object or row)"""
+    return SearchDocument(
+        key=f"question:{question.id}",
+        fields={
+            "stem": question.stem or "",
+            "tags": _tags_text(question.tags),
+            "topic": question.topic or "",
+        },
+        facets={
+            "kind": "question",
+            "level": question.level,
+            "skill": question.skill,
+            "topic": question.topic,
+            "type": question.type,
+            "difficulty": _difficulty(question.difficulty),
+        },
+        meta={
+            "kind": "question",
+            "id": str(question.id),
+            "title": (question.stem or "")[:200],
+            "level": question.level,
+            "skill": question.skill,
+            "topic": question.topic,
+            "type": question.type,
+        },
+    )
+
+
+def lesson_document(lesson: Any) -> SearchDocument:
+    """Build the index document for a Lesson (ORM object or row)"""
+    return SearchDocument(
+        key=f"lesson:{lesson.id}",
+        fields={
+            "title": lesson.title or "",
+            "description": lesson.description or "",
+            "tags": _tags_text(lesson.tags),
+            "topic": lesson.topic or "",
+        },
+        facets={
+            "kind": "lesson",
+            "level": lesson.level,
+            "skill": lesson.skill,
+            "topic": lesson.topic,
+            "difficulty": _difficulty(lesson.difficulty),
+        },
+        meta={
+            "kind": "lesson",
+            "id": str(lesson.id),
+            "title": lesson.title,
+            "slug": lesson.slug,
+            "level": lesson.level,
+            "skill": lesson.skill,
+            "topic": lesson.topic,
+        },
+    )
+
+
+# Model -> (key prefix, document builder, columns the builder reads)
+INDEXED_MODELS = {
+    Question: ("question", question_document, (
+        Question.id, Question.stem, Question.tags, Question.topic,
+        Question.level, Question.skill, Question.type, Question.difficulty, Question.status,
+    )),
+    Lesson: ("lesson", lesson_document, (
+        Lesson.id, Lesson.title, Lesson.slug, Lesson.description, Lesson.tags,
+        Lesson.topic, Lesson.level, Lesson.skill, Lesson.difficulty, Lesson.status,
+    )),
+}
+
+
+def content_change(obj: Any, deleted: bool = False) -> Change:
+    """Turn a lesson/question into an index change (remove unless published)"""
+    prefix, build, _ = INDEXED_MODELS[type(obj)]
+    if deleted or obj.status != "published":
+        return f"{prefix}:{obj.id}", None
+    document = build(obj)
+    return document.key, document
+
+
+class SearchService:
+    """Owns the process-wide search index and keeps it current"""
+
+    def __init__(
+        self,
+        snapshot_path: Optional[str] = None,
+        enabled: bool = True,
+        refresh_interval: float = 60.0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 60.0
+    ):
+        self.snapshot_path = snapshot_path
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.index = InvertedIndex()
+        self.ready = False
+        self._pending: List[Change] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        limit: int = 20,
+        offset: int = 0,
+        fuzzy: bool = True
+    ) -> SearchResults:
+        return self.index.search(query, filters=filters, limit=limit, offset=offset, fuzzy=fuzzy)
+
+    def facet_counts(
+        self,
+        filters: Optional[Dict[str, Iterable[str]]] = None,
+        query: Optional[str] = None
+    ) -> FacetCounts:
+        return self.index.facet_counts(filters=filters, query=query)
+
+    def apply_changes(self, changes: List[Change]) -> None:
+        """Apply committed changes, or queue them while the index is loading"""
+        if not self.ready:
+            self._pending.extend(changes)
+            return
+        for key, document in changes:
+            if document is None:
+                self.index.remove(key)
+            else:
+                self.index.add(document)
+
+    async def rebuild(self, session) -> InvertedIndex:
+        """Build a fresh index from all published content, streaming rows"""
+        index = InvertedIndex()
+        for model, (_, build, columns) in INDEXED_MODELS.items():
+            result = await session.stream(
+                select(*columns)
+                .where(model.status == "published")
+                .execution_options(yield_per=1000)
+            )
+            async for row in result:
+                index.add(build(row))
+        return index
+
+    async def catch_up(self, session, index: InvertedIndex) -> int:
+        """
+        Re-index rows updated since index.built_at and advance it
+
+        Hard-deleted rows are not detected; unpublishing is the supported
+        way to take content out of search.
+        """
+        started = datetime.now(timezone.utc).timestamp()
+        since = datetime.fromtimestamp(index.built_at - CATCH_UP_MARGIN_SECONDS, timezone.utc)
+        count = 0
+        for model, (prefix, build, columns) in INDEXED_MODELS.items():
+            result = await session.stream(
+                select(*columns)
+                .where(model.updated_at >= since)
+                .execution_options(yield_per=1000)
+            )
+            async for row in result:
+                if row.status == "published":
+                    index.add(build(row))
+                else:
+                    index.remove(f"{prefix}:{row.id}")
+                count += 1
+        index.built_at = started
+        return count
+
+    async def load(self) -> None:
+        """Restore the snapshot (or rebuild), then replay queued changes"""
+        started = datetime.now(timezone.utc).timestamp()
+        index = None
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            try:
+                index = await asyncio.to_thread(InvertedIndex.load, self.snapshot_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable search snapshot: {e}")
+
+        async with ReadOnlySessionLocal() as session:
+            if index is None:
+                index = await self.rebuild(session)
+                index.built_at = started
+            else:
+                updated = await self.catch_up(session, index)
+                logger.info(f"Search snapshot restored, {updated} updated rows re-indexed")
+
+        self.index = index
+        self.ready = True
+        pending, self._pending = self._pending, []
+        self.apply_changes(pending)
+        logger.info(f"Search index ready with {len(index)} documents")
+
+    async def start(self) -> None:
+        """Load the index in the background so startup is not blocked"""
+        if not self.enabled:
+            return
+        self._task = asyncio.create_task(self._load_in_background())
+
+    async def refresh(self) -> int:
+        """Pick up lessons and questions changed by other processes"""
+        async with ReadOnlySessionLocal() as session:
+            return await self.catch_up(session, self.index)
+
+    async def _load_in_background(self) -> None:
+        # Retry until loaded (e.g. the database is still starting); search
+        # answers 503 meanwhile. stop() cancels the wait.
+        delay = self.retry_delay
+        while True:
+            try:
+                await self.load()
+                break
+            except Exception as e:
+                logger.error(f"Failed to load search index, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Search index refresh failed: {e}")
+
+    async def stop(self) -> None:
+        """Stop loading and write a snapshot for the next start"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.ready and self.snapshot_path:
+            try:
+                await asyncio.to_thread(self.index.save, self.snapshot_path)
+                logger.info(f"Search index snapshot written to {self.snapshot_path}")
+            except Exception as e:
+                logger.error(f"Failed to write search snapshot: {e}")
+
+
+class SuggestService:
+    """
+    Owns the typeahead index and rebuilds it periodically
+    
+    Suggestions rank on view/completion counts that change constantly, so
+    the whole index is rebuilt on an interval rather than patched.
+    """
+
+    def __init__(self, enabled: bool = True, refresh_interval: float = 300.0):
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.index: Optional[SuggestIndex] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Suggestion]:
+        if self.index is None:
+            return []
+        return self.index.suggest(query, limit=limit, kinds=kinds)
+
+    async def rebuild(self, session) -> SuggestIndex:
+        """Stream published lessons and questions into a new index"""
+        builder = SuggestIndexBuilder()
+        lessons = await session.stream(
+            select(
+                Lesson.title, Lesson.slug, Lesson.topic, Lesson.tags,
+                Lesson.view_count, Lesson.completion_count,
+            )
+            .where(Lesson.status == "published")
+            .execution_options(yield_per=1000)
+        )
+        async for row in lessons:
+            builder.add_lesson(row)
+
+        questions = await session.stream(
+            select(Question.subtopic, Question.tags)
+            .where(Question.status == "published")
+            .execution_options(yield_per=1000)
+        )
+        async for row in questions:
+            builder.add_question(row)
+
+        # Sorting and prefix precomputation is CPU-bound; keep it off the loop
+        return await asyncio.to_thread(builder.build)
+
+    async def refresh(self) -> None:
+        async with ReadOnlySessionLocal() as session:
+            self.index = await self.rebuild(session)
+        logger.info(f"Suggest index rebuilt with {len(self.index)} suggestions")
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Suggest index rebuild failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+search_service = SearchService(
+    snapshot_path=settings.SEARCH_INDEX_SNAPSHOT_PATH or None,
+    enabled=settings.SEARCH_INDEX_ENABLED,
+    refresh_interval=settings.SEARCH_INDEX_REFRESH_SECONDS,
+)
+
+suggest_service = SuggestService(
+    enabled=settings.SEARCH_INDEX_ENABLED,
+    refresh_interval=settings.SUGGEST_INDEX_REFRESH_SECONDS,
+)
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _collect_search_changes(session, flush_context):
+    if not search_service.enabled:
+        return
+    changes = session.info.setdefault(PENDING_CHANGES_KEY, [])
+    try:
+        for obj in session.new:
+            if type(obj) in INDEXED_MODELS:
+                changes.append(content_change(obj))
+        for obj in session.dirty:
+            if type(obj) in INDEXED_MODELS and session.is_modified(obj, include_collections=False):
+                changes.append(content_change(obj))
+        for obj in session.deleted:
+            if type(obj) in INDEXED_MODELS:
+                changes.append(content_change(obj, deleted=True))
+    except Exception as e:
+        # Never fail a write because of the search index
+        logger.error(f"Failed to collect search index changes: {e}")
+
+
+@event.listens_for(TrackedSession, "after_commit")
+def _apply_search_changes(session):
+    changes = session.info.pop(PENDING_CHANGES_KEY, None)
+    if changes:
+        search_service.apply_changes(changes)
+
+
+@event.listens_for(TrackedSession, "after_transaction_end")
+def _discard_search_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING_CHANGES_KEY, None)
@@ -0,0 +1,122 @@
+"""
+Symmetric-delete spelling correction over the search vocabulary
+
+Every vocabulary word is stored under each string obtainable by deleting up
+to ``max_distance`` characters from its first ``prefix_length`` characters.
+A misspelled query word generates its own deletes, and any shared key yields
+a candidate that is then verified with a bounded Damerau-Levenshtein
+distance. Lookups cost a few dozen dict probes instead of a vocabulary scan;
+limiting deletes to a prefix caps memory at a few dozen keys per word.
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+
+def max_edit_distance(word: str) -> int:
+    """Edit budget by word length: none for short words, 2 for long ones"""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return 2
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Damerau-Levenshtein with adjacent
+    transpositions), or max_distance + 1 once it is known to exceed the bound
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[len(b)], max_distance + 1)
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1:]
+            for candidate in frontier
+            for i in range(len(candidate))
+        } - results
+        results |= frontier
+    return results
+
+
+class SymSpell:
+    """Symmetric-delete candidate index for a growing vocabulary"""
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words: Set[str] = set()
+        # A single word is stored bare; lists only where keys collide
+        self.deletes: Dict[str, Union[str, List[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add(self, word: str) -> None:
+        if word in self.words:
+            return
+        self.words.add(word)
+        for key in _deletes(word[:self.prefix_length], self.max_distance):
+            existing = self.deletes.get(key)
+            if existing is None:
+                self.deletes[key] = word
+            elif isinstance(existing, list):
+                existing.append(word)
+            else:
+                self.deletes[key] = [existing, word]
+
+    def add_many(self, words: Iterable[str]) -> None:
+        for word in words:
+            self.add(word)
+
+    def lookup(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """
+        Vocabulary words within max_distance edits of word
+
+        Returns:
+            (word, distance) pairs, closest first
+        """
+        max_distance = min(max_distance, self.max_distance)
+        if word in self.words:
+            return [(word, 0)]
+        if max_distance == 0:
+            return []
+
+        candidates: Set[str] = set()
+        for key in _deletes(word[:self.prefix_length], max_distance):
+            found = self.deletes.get(key)
+            if found is None:
+                continue
+            if isinstance(found, list):
+                candidates.update(found)
+            else:
+                candidates.add(found)
+
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
@@ -0,0 +1,202 @@
+"""
+Vectorized Modified SM-2 scheduling
+
+Card state is held column-wise in NumPy arrays so a batch of reviews (one
+user's session or a nightly pass over millions of cards) is computed with a
+handful of array operations instead of a Python loop over card objects.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SM2Parameters:
+    """Tunable constants of the Modified SM-2 schedule"""
+    pass_grade: int = 3  # grades below this reset the card
+    first_interval: int = 1
+    second_interval: int = 6
+    min_ease: float = 1.3
+    max_ease: float = 5.0
+    max_interval: int = 365
+    lapse_interval: int = 1
+    graduate_after: int = 2  # repetitions before a card leaves learning
+
+
+DEFAULT_PARAMETERS = SM2Parameters()
+
+
+@dataclass
+class CardStates:
+    """Scheduling columns of a batch of SRS cards, one array per column"""
+    interval: np.ndarray  # int32, days
+    ease_factor: np.ndarray  # float64
+    repetitions: np.ndarray  # int32
+    total_reviews: np.ndarray  # int32
+    correct_reviews: np.ndarray  # int32
+    consecutive_correct: np.ndarray  # int32
+    average_response_time: np.ndarray  # int32, milliseconds
+
+    COLUMNS = (
+        "interval", "ease_factor", "repetitions", "total_reviews",
+        "correct_reviews", "consecutive_correct", "average_response_time",
+    )
+
+    def __len__(self) -> int:
+        return len(self.interval)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "CardStates":
+        """Build from rows/objects exposing the SRSCard column attributes"""
+        rows = list(rows)
+        columns = {
+            name: np.fromiter(
+                (getattr(row, name) or 0 for row in rows),
+                dtype=np.float64 if name == "ease_factor" else np.int32,
+                count=len(rows),
+            )
+            for name in cls.COLUMNS
+        }
+        return cls(**columns)
+
+
+@dataclass
+class ReviewResult:
+    """New card states plus derived scheduling columns"""
+    states: CardStates
+    next_review: np.ndarray  # datetime64[D]
+    is_learning: np.ndarray  # bool
+    passed: np.ndarray  # bool, grade at or above pass_grade
+
+    def next_review_dates(self) -> np.ndarray:
+        """Next review dates as ISO strings"""
+        return np.datetime_as_string(self.next_review, unit="D")
+
+
+def schedule(
+    interval: np.ndarray,
+    ease_factor: np.ndarray,
+    repetitions: np.ndarray,
+    quality: np.ndarray,
+    parameters: SM2Parameters = DEFAULT_PARAMETERS
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The SM-2 step itself, on the three columns it depends on
+
+    Returns:
+        (interval, ease_factor, repetitions, passed) after the review
+    """
+    passed = quality >= parameters.pass_grade
+
+    # Ease moves for every review, including lapses
+    miss = 5 - quality
+    ease = ease_factor + (0.1 - miss * (0.08 + miss * 0.02))
+    ease = np.round(np.clip(ease, parameters.min_ease, parameters.max_ease), 2)
+
+    repetitions = np.where(passed, repetitions + 1, 0).astype(np.int32)
+    grown = np.rint(interval * ease)
+    interval = np.where(
+        passed,
+        np.where(
+            repetitions == 1,
+            parameters.first_interval,
+            np.where(repetitions == 2, parameters.second_interval, grown),
+        ),
+        parameters.lapse_interval,
+    )
+    interval = np.clip(interval, 1, parameters.max_interval).astype(np.int32)
+    return interval, ease, repetitions, passed
+
+
+def review(
+    states: CardStates,
+    quality: np.ndarray,
+    today: date,
+    response_time_ms: Optional[np.ndarray] = None,
+    parameters: SM2Parameters = DEFAULT_PARAMETERS
+) -> ReviewResult:
+    """
+    Apply one graded review to every card in the batch
+
+    Args:
+        states: Current card states
+        quality: Grade per card, 0 (blackout) to 5 (perfect)
+        today: Review date
+        response_time_ms: Optional answer time per card, folded into the
+            running average; NaN where no time was recorded keeps that
+            card's average
+        parameters: Schedule constants
+
+    Returns:
+        The new states, next review dates and learning flags
+    """
+    quality = np.asarray(quality, dtype=np.int32)
+    if quality.shape != states.interval.shape:
+        raise ValueError("quality must have one grade per card")
+    if quality.size and (quality.min() < 0 or quality.max() > 5):
+        raise ValueError("quality grades must be between 0 and 5")
+
+    interval, ease, repetitions, passed = schedule(
+        states.interval, states.ease_factor, states.repetitions, quality, parameters
+    )
+
+    total = states.total_reviews + 1
+    average_response_time = states.average_response_time
+    if response_time_ms is not None:
+        response_time_ms = np.asarray(response_time_ms, dtype=np.float64)
+        timed = ~np.isnan(response_time_ms)
+        updated = (
+            states.average_response_time.astype(np.int64) * states.total_reviews
+            + np.where(timed, response_time_ms, 0).astype(np.int64)
+        ) // total
+        average_response_time = np.where(timed, updated, average_response_time).astype(np.int32)
+
+    new_states = replace(
+        states,
+        interval=interval,
+        ease_factor=ease,
+        repetitions=repetitions,
+        total_reviews=total.astype(np.int32),
+        correct_reviews=(states.correct_reviews + passed).astype(np.int32),
+        consecutive_correct=np.where(passed, states.consecutive_correct + 1, 0).astype(np.int32),
+        average_response_time=average_response_time,
+    )
+    return ReviewResult(
+        states=new_states,
+        next_review=np.datetime64(today, "D") + interval.astype("timedelta64[D]"),
+        is_learning=repetitions < parameters.graduate_after,
+        passed=passed,
+    )
+
+
+def reschedule(
+    intervals: np.ndarray,
+    last_reviewed: np.ndarray,
+    today: date,
+    parameters: SM2Parameters = DEFAULT_PARAMETERS
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Recompute due dates from the last review under the current parameters
+
+    Used by the nightly pass: intervals above max_interval are capped, and
+    cards never reviewed (NaT last review) become due today.
+
+    Args:
+        intervals: Current intervals in days
+        last_reviewed: Last review dates (datetime64[D], NaT if never)
+        today: Date of the pass
+
+    Returns:
+        (capped intervals, next review dates)
+    """
+    intervals = np.clip(np.asarray(intervals, dtype=np.int32), 1, parameters.max_interval)
+    last_reviewed = np.asarray(last_reviewed, dtype="datetime64[D]")
+    next_review = np.where(
+        np.isnat(last_reviewed),
+        np.datetime64(today, "D"),
+        last_reviewed + intervals.astype("timedelta64[D]"),
+    )
+    return intervals, next_review
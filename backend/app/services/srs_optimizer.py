@@ -0,0 +1,226 @@
+"""
+Fitting per-user memory parameters from QuestionAttempt history
+
+Each repeated attempt at a question is a recall observation: it was
+answered correctly or not, some time after the previous attempt. Recall is
+modelled as exp(-t / S) with stability S = S0 * G ** k, where k counts the
+correct answers to that question so far. Fitting log S0 and log G per user
+gives both a first interval (the time until recall drops to the target
+retention) and G, the growth factor that SM-2's ease factor stands for.
+
+Users are fitted together: every Newton step evaluates all observations in
+one set of array operations and reduces them per user with bincount. The
+log-loss is convex in (log S0, log G), and a prior centred on the SM-2
+defaults keeps users with little history close to them.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import uuid
+
+import numpy as np
+
+from app.services.srs_engine import DEFAULT_PARAMETERS
+
+# SM-2 defaults: a 1-day first interval at 90% retention, growth 2.5
+TARGET_RETENTION = 0.9
+PRIOR_INITIAL_STABILITY = -DEFAULT_PARAMETERS.first_interval / math.log(TARGET_RETENTION)
+PRIOR_GROWTH = 2.5
+PRIOR_WEIGHT = 5.0  # pseudo-observations at the prior
+
+MIN_REVIEWS = 20  # repeated attempts needed before a user is fitted
+MIN_ELAPSED_DAYS = 1 / 24  # retries within the hour say nothing about memory
+NEWTON_STEPS = 30
+MAX_STEP = 1.0  # per-step change cap on log-parameters
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class ReviewChunk:
+    """Attempts of a run of whole users, as arrays (picklable for workers)"""
+    user_ids: List[str]  # user index -> user id
+    user_index: np.ndarray  # int32 per attempt
+    question_index: np.ndarray  # int32 per attempt, chunk-local
+    timestamps: np.ndarray  # float64 epoch seconds
+    correct: np.ndarray  # bool
+
+    def __len__(self) -> int:
+        return len(self.user_index)
+
+
+@dataclass
+class UserFit:
+    """Fitted parameters of one user"""
+    user_id: str
+    initial_stability: float
+    stability_growth: float
+    ease_factor: float
+    review_count: int
+    log_loss: float
+
+
+@dataclass
+class ReviewChunkBuilder:
+    """
+    Collects attempt rows ordered by (user, question, time) into chunks
+
+    A chunk is closed at the first user boundary after ``chunk_rows`` rows,
+    so a user's history is never split between workers.
+    """
+    chunk_rows: int = 200000
+    _users: Dict[str, int] = field(default_factory=dict)
+    _questions: Dict[uuid.UUID, int] = field(default_factory=dict)
+    _user_index: List[int] = field(default_factory=list)
+    _question_index: List[int] = field(default_factory=list)
+    _timestamps: List[float] = field(default_factory=list)
+    _correct: List[bool] = field(default_factory=list)
+    _last_user: Optional[str] = None
+
+    def add(self, user_id: uuid.UUID, question_id: uuid.UUID, is_correct: bool, created_at: datetime) -> Optional[ReviewChunk]:
+        """Add one attempt; returns the finished chunk when one closes"""
+        user = str(user_id)
+        finished = None
+        if user != self._last_user:
+            if len(self._user_index) >= self.chunk_rows:
+                finished = self.finish()
+            self._last_user = user
+        user_position = self._users.setdefault(user, len(self._users))
+        self._user_index.append(user_position)
+        self._question_index.append(self._questions.setdefault(question_id, len(self._questions)))
+        self._timestamps.append(created_at.timestamp())
+        self._correct.append(is_correct)
+        return finished
+
+    def finish(self) -> Optional[ReviewChunk]:
+        """Close and return the current chunk, if it has any rows"""
+        if not self._user_index:
+            return None
+        chunk = ReviewChunk(
+            user_ids=list(self._users),
+            user_index=np.array(self._user_index, dtype=np.int32),
+            question_index=np.array(self._question_index, dtype=np.int32),
+            timestamps=np.array(self._timestamps, dtype=np.float64),
+            correct=np.array(self._correct, dtype=bool),
+        )
+        self._users, self._questions = {}, {}
+        self._user_index, self._question_index, self._timestamps, self._correct = [], [], [], []
+        return chunk
+
+
+def recall_observations(chunk: ReviewChunk) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn attempts into recall observations
+
+    Returns:
+        (user index, days since the previous attempt at the question,
+        correct answers to it before this attempt, recalled) per observation
+    """
+    order = np.lexsort((chunk.timestamps, chunk.question_index, chunk.user_index))
+    users = chunk.user_index[order]
+    questions = chunk.question_index[order]
+    timestamps = chunk.timestamps[order]
+    correct = chunk.correct[order].astype(np.int64)
+
+    positions = np.arange(len(order))
+    repeat = np.zeros(len(order), dtype=bool)
+    repeat[1:] = (users[1:] == users[:-1]) & (questions[1:] == questions[:-1])
+
+    # Correct answers earlier in the same (user, question) run
+    running = np.cumsum(correct) - correct
+    run_start = np.maximum.accumulate(np.where(repeat, 0, positions))
+    prior_correct = running - running[run_start]
+
+    elapsed = np.zeros(len(order))
+    elapsed[1:] = (timestamps[1:] - timestamps[:-1]) / SECONDS_PER_DAY
+
+    keep = repeat & (elapsed >= MIN_ELAPSED_DAYS)
+    return users[keep], elapsed[keep], prior_correct[keep], correct[keep].astype(bool)
+
+
+def _loss_terms(elapsed: np.ndarray, recalled: np.ndarray, log_stability: np.ndarray):
+    """Per-observation log-loss and its first two derivatives in log S"""
+    ratio = np.clip(elapsed * np.exp(-log_stability), 1e-9, 50.0)  # t / S
+    # p = exp(-ratio); 1 - p computed without cancellation
+    forgot = -np.expm1(-ratio)
+    loss = np.where(recalled, ratio, -np.log(forgot))
+    odds = ratio / np.expm1(ratio)  # ratio * p / (1 - p)
+    gradient = np.where(recalled, -ratio, odds)
+    curvature = np.where(recalled, ratio, odds * (ratio + odds - 1.0))
+    return loss, gradient, curvature
+
+
+def fit_users(
+    users: np.ndarray,
+    elapsed: np.ndarray,
+    prior_correct: np.ndarray,
+    recalled: np.ndarray,
+    user_count: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fit (log S0, log G) for every user with damped Newton steps
+
+    Returns:
+        (log initial stability, log growth, observations, mean log-loss) per user
+    """
+    prior = np.array([math.log(PRIOR_INITIAL_STABILITY), math.log(PRIOR_GROWTH)])
+    theta = np.tile(prior, (user_count, 1))
+    counts = np.bincount(users, minlength=user_count)
+    k = prior_correct.astype(np.float64)
+
+    def per_user(weights):
+        return np.bincount(users, weights=weights, minlength=user_count)
+
+    for _ in range(NEWTON_STEPS):
+        log_stability = theta[users, 0] + theta[users, 1] * k
+        _, gradient, curvature = _loss_terms(elapsed, recalled, log_stability)
+
+        offset = theta - prior
+        g0 = per_user(gradient) + PRIOR_WEIGHT * offset[:, 0]
+        g1 = per_user(gradient * k) + PRIOR_WEIGHT * offset[:, 1]
+        h00 = per_user(curvature) + PRIOR_WEIGHT
+        h01 = per_user(curvature * k)
+        h11 = per_user(curvature * k * k) + PRIOR_WEIGHT
+
+        # Solve the 2x2 system per user
+        determinant = h00 * h11 - h01 * h01
+        step = np.stack([
+            (h11 * g0 - h01 * g1) / determinant,
+            (h00 * g1 - h01 * g0) / determinant,
+        ], axis=1)
+        theta -= np.clip(step, -MAX_STEP, MAX_STEP)
+        if np.abs(step).max(initial=0.0) < 1e-6:
+            break
+
+    loss, _, _ = _loss_terms(elapsed, recalled, theta[users, 0] + theta[users, 1] * k)
+    mean_loss = per_user(loss) / np.maximum(counts, 1)
+    return theta[:, 0], theta[:, 1], counts, mean_loss
+
+
+def fit_chunk(chunk: ReviewChunk) -> List[UserFit]:
+    """
+    Fit every user in a chunk with enough history (process pool entry point)
+
+    Returns:
+        One UserFit per user with at least MIN_REVIEWS observations
+    """
+    users, elapsed, prior_correct, recalled = recall_observations(chunk)
+    log_initial, log_growth, counts, mean_loss = fit_users(
+        users, elapsed, prior_correct, recalled, len(chunk.user_ids)
+    )
+
+    growth = np.exp(log_growth)
+    ease = np.round(np.clip(growth, DEFAULT_PARAMETERS.min_ease, DEFAULT_PARAMETERS.max_ease), 2)
+    return [
+        UserFit(
+            user_id=chunk.user_ids[i],
+            initial_stability=float(np.exp(log_initial[i])),
+            stability_growth=float(growth[i]),
+            ease_factor=float(ease[i]),
+            review_count=int(counts[i]),
+            log_loss=float(mean_loss[i]),
+        )
+        for i in np.flatnonzero(counts >= MIN_REVIEWS).tolist()
+    ]
@@ -0,0 +1,677 @@
+"""
+SRS service: applies graded reviews and nightly rescheduling to SRS cards
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import functools
+import json
+import logging
+import os
+import uuid
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import Date, delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import run_after_commit
+from app.core.database_utils import DatabaseUtils
+from app.models.progress import QuestionAttempt
+from app.models.srs import SRSCard, SRSQueueSize, SRSReviewBatch, SRSUserParameters
+from app.services.achievement_engine import ATTEMPT, AchievementEvent
+from app.services.achievement_service import AchievementService
+from app.services.counter_buffer import counter_buffer
+from app.services.srs_engine import (
+    DEFAULT_PARAMETERS, CardStates, SM2Parameters, reschedule, review
+)
+from app.services.srs_optimizer import ReviewChunk, ReviewChunkBuilder, UserFit, fit_chunk
+from app.services.srs_simulator import Forecast, simulate
+
+logger = logging.getLogger(__name__)
+
+# (card id, quality 0-5, response time in ms or None)
+Review = Tuple[uuid.UUID, int, Optional[int]]
+
+STATE_COLUMNS = [getattr(SRSCard, name) for name in CardStates.COLUMNS]
+
+# Columns stored in idx_srs_cards_review_queue, so queue reads are index-only
+QUEUE_COLUMNS = (
+    SRSCard.id, SRSCard.item_type, SRSCard.item_id, SRSCard.question_id,
+    SRSCard.is_learning, SRSCard.next_review_date,
+)
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _in_review_queue(user_id: uuid.UUID, due_by: date):
+    """Conditions matching the partial predicate of idx_srs_cards_review_queue"""
+    return (
+        SRSCard.user_id == user_id,
+        SRSCard.next_review_date <= due_by,
+        ~SRSCard.is_suspended,
+        ~SRSCard.is_buried,
+    )
+
+
+class SRSService:
+    """Spaced repetition scheduling service"""
+
+    def __init__(self, db: AsyncSession, parameters: SM2Parameters = DEFAULT_PARAMETERS):
+        self.db = db
+        self.parameters = parameters
+
+    async def review_cards(
+        self,
+        user_id: uuid.UUID,
+        reviews: Sequence[Review],
+        today: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Grade a batch of the user's cards and persist the new schedules
+
+        The batch is loaded with one SELECT, scheduled with array operations
+        and written back with one set-based UPDATE; the user's precomputed
+        size of tomorrow's queue is then refreshed.
+
+        Args:
+            user_id: Owner of the cards
+            reviews: (card id, quality, response time ms) per reviewed card
+            today: Review date (defaults to today, UTC)
+
+        Returns:
+            New scheduling state per card, in request order
+
+        Raises:
+            HTTPException: If a card is repeated, missing, suspended or not the user's
+        """
+        if not reviews:
+            return []
+        today = today or _utc_today()
+        card_ids = [card_id for card_id, _, _ in reviews]
+        if len(set(card_ids)) != len(card_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each card can only be reviewed once per batch"
+            )
+
+        # Concurrent reviews of a card grade one after the other; locking in
+        # id order keeps overlapping batches from deadlocking
+        result = await self.db.execute(
+            select(SRSCard.id, SRSCard.question_id, *STATE_COLUMNS)
+            .where(SRSCard.id.in_(card_ids))
+            .where(SRSCard.user_id == user_id)
+            .where(SRSCard.is_suspended == False)  # noqa: E712
+            .order_by(SRSCard.id)
+            .with_for_update()
+        )
+        rows = {row.id: row for row in result.all()}
+        missing = [str(card_id) for card_id in card_ids if card_id not in rows]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"SRS cards not found: {', '.join(missing)}"
+            )
+
+        states = CardStates.from_rows(rows[card_id] for card_id in card_ids)
+        outcome = review(
+            states,
+            np.array([quality for _, quality, _ in reviews], dtype=np.int32),
+            today,
+            response_time_ms=np.array(
+                [np.nan if value is None else value for _, _, value in reviews],
+                dtype=np.float64
+            ),
+            parameters=self.parameters,
+        )
+
+        new_states = outcome.states
+        await DatabaseUtils.bulk_update_columns(
+            self.db,
+            SRSCard,
+            card_ids,
+            {
+                **{name: getattr(new_states, name) for name in CardStates.COLUMNS},
+                "next_review_date": outcome.next_review,
+                "is_learning": outcome.is_learning,
+            },
+            constants={
+                "last_reviewed_date": today,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+        # Reviewed cards move into later queues; keep the dashboard count exact
+        await self.refresh_queue_sizes(today + timedelta(days=1), user_ids=[user_id])
+
+        return [
+            {
+                "card_id": str(card_id),
+                "question_id": rows[card_id].question_id,
+                "passed": bool(outcome.passed[i]),
+                "interval": int(new_states.interval[i]),
+                "ease_factor": float(new_states.ease_factor[i]),
+                "repetitions": int(new_states.repetitions[i]),
+                "next_review_date": outcome.next_review[i].item(),
+                "is_learning": bool(outcome.is_learning[i]),
+            }
+            for i, card_id in enumerate(card_ids)
+        ]
+
+    async def submit_review_batch(
+        self,
+        user_id: uuid.UUID,
+        batch_id: uuid.UUID,
+        reviews: Sequence[Review],
+        today: Optional[date] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Grade a review session idempotently
+
+        The batch id is claimed with INSERT ... ON CONFLICT DO NOTHING. If it
+        was already claimed (a retry), the stored outcome is returned and
+        nothing is graded again; a concurrent retry waits on the first
+        attempt's row lock until that transaction ends. Otherwise the cards
+        are graded as in review_cards, one QuestionAttempt per question card
+        is inserted with context_type 'srs' and context_id = batch id, and
+        the outcome is stored on the batch. The statement count does not
+        depend on the batch size; question counters are bumped through
+        counter_buffer after the transaction commits rather than updated
+        here, and the attempts are fed to the achievement engine.
+
+        Args:
+            user_id: Owner of the cards
+            batch_id: Client-generated id, reused on retries
+            reviews: (card id, quality, response time ms) per reviewed card
+            today: Review date (defaults to today, UTC)
+
+        Returns:
+            (per-card results, whether this was a replay of a stored batch)
+
+        Raises:
+            HTTPException: If the batch id belongs to another user, or as
+                review_cards
+        """
+        claimed = await self.db.execute(
+            pg_insert(SRSReviewBatch)
+            .values(id=batch_id, user_id=user_id, review_count=len(reviews), results=[])
+            .on_conflict_do_nothing(index_elements=[SRSReviewBatch.id])
+            .returning(SRSReviewBatch.id)
+        )
+        self.db.info["has_writes"] = True
+        if claimed.scalar_one_or_none() is None:
+            stored = (await self.db.execute(
+                select(SRSReviewBatch.user_id, SRSReviewBatch.results)
+                .where(SRSReviewBatch.id == batch_id)
+            )).one()
+            if stored.user_id != user_id:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Batch id already used"
+                )
+            return stored.results, True
+
+        today = today or _utc_today()
+        results = await self.review_cards(user_id, reviews, today=today)
+
+        reviewed_at = datetime.now(timezone.utc)
+        attempts = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user_id,
+                "question_id": result["question_id"],
+                "user_answer": {"grade": quality},
+                "is_correct": result["passed"],
+                # time_taken is whole seconds and must be positive
+                "time_taken": max(1, round((response_time or 0) / 1000)),
+                "context_type": "srs",
+                "context_id": batch_id,
+                "points_earned": int(result["passed"]),
+                "max_points": 1,
+                "created_at": reviewed_at,
+                "updated_at": reviewed_at,
+            }
+            for result, (_, quality, response_time) in zip(results, reviews)
+            if result["question_id"] is not None
+        ]
+        if attempts:
+            await self.db.execute(insert(QuestionAttempt), attempts)
+            # Only once committed, so a failed request never bumps the counters
+            for attempt in attempts:
+                run_after_commit(self.db, functools.partial(
+                    counter_buffer.question_attempted,
+                    attempt["question_id"], attempt["is_correct"], attempt["time_taken"],
+                ))
+            await AchievementService(self.db).record(user_id, [
+                AchievementEvent(ATTEMPT, reviewed_at, attempt["is_correct"], attempt["time_taken"])
+                for attempt in attempts
+            ])
+
+        stored_results = [
+            {
+                **result,
+                "question_id": str(result["question_id"]) if result["question_id"] else None,
+                "next_review_date": result["next_review_date"].isoformat(),
+            }
+            for result in results
+        ]
+        await self.db.execute(
+            update(SRSReviewBatch)
+            .where(SRSReviewBatch.id == batch_id)
+            .values(results=stored_results)
+        )
+        return stored_results, False
+
+    async def purge_review_batches(self, older_than_days: int) -> int:
+        """
+        Forget batch ids older than the retry window
+
+        Returns:
+            Number of batches deleted
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+        result = await self.db.execute(
+            delete(SRSReviewBatch).where(SRSReviewBatch.created_at < cutoff)
+        )
+        self.db.info["has_writes"] = True
+        return result.rowcount
+
+    async def reschedule_all(
+        self,
+        today: Optional[date] = None,
+        chunk_size: int = 50000
+    ) -> int:
+        """
+        Nightly pass: recompute every card's due date under the current
+        parameters, unbury buried cards and precompute tomorrow's queue sizes
+
+        Cards are walked in id order, one chunk per SELECT ... FOR UPDATE
+        and one set-based UPDATE per chunk; each chunk is committed.
+
+        Returns:
+            Number of cards rescheduled
+        """
+        today = today or _utc_today()
+        total, last_id = 0, None
+        while True:
+            # Locked like review_cards, so a review committing mid-chunk
+            # waits for (or is seen by) this pass instead of being overwritten
+            query = (
+                select(SRSCard.id, SRSCard.interval, SRSCard.last_reviewed_date)
+                .order_by(SRSCard.id)
+                .limit(chunk_size)
+                .with_for_update()
+            )
+            if last_id is not None:
+                query = query.where(SRSCard.id > last_id)
+            rows = (await self.db.execute(query)).all()
+            if not rows:
+                await self.refresh_queue_sizes(today + timedelta(days=1))
+                await self.db.commit()
+                return total
+
+            ids = [row.id for row in rows]
+            intervals, next_review = reschedule(
+                np.fromiter((row.interval for row in rows), dtype=np.int32, count=len(rows)),
+                np.array([row.last_reviewed_date for row in rows], dtype="datetime64[D]"),
+                today,
+                parameters=self.parameters,
+            )
+            await DatabaseUtils.bulk_update_columns(
+                self.db,
+                SRSCard,
+                ids,
+                {
+                    "interval": intervals,
+                    "next_review_date": next_review,
+                },
+                constants={"is_buried": False},
+                chunk_size=chunk_size,
+            )
+            await self.db.commit()
+
+            total += len(rows)
+            last_id = ids[-1]
+            logger.info(f"Rescheduled {total} SRS cards")
+
+    async def due_queue(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 50,
+        today: Optional[date] = None
+    ) -> Tuple[int, List[Any]]:
+        """
+        The user's next due cards, most overdue first
+
+        Both queries only touch idx_srs_cards_review_queue (user_id,
+        next_review_date, id + included columns), so neither visits the table.
+
+        Args:
+            user_id: Owner of the cards
+            limit: Maximum cards to return
+            today: Queue date (defaults to today, UTC)
+
+        Returns:
+            (number of cards due, first `limit` due card rows)
+        """
+        conditions = _in_review_queue(user_id, today or _utc_today())
+        result = await self.db.execute(
+            select(*QUEUE_COLUMNS)
+            .where(*conditions)
+            .order_by(SRSCard.next_review_date, SRSCard.id)
+            .limit(limit)
+        )
+        cards = result.all()
+        if len(cards) < limit:
+            return len(cards), cards
+
+        due_count = await self.db.scalar(
+            select(func.count()).select_from(SRSCard).where(*conditions)
+        )
+        return due_count, cards
+
+    async def refresh_queue_sizes(
+        self,
+        queue_date: date,
+        user_ids: Optional[Sequence[uuid.UUID]] = None
+    ) -> None:
+        """
+        Precompute how many cards each user will have due on queue_date
+
+        Upserts the sizes with one INSERT ... SELECT ... GROUP BY ... ON
+        CONFLICT, so a review refreshing one user can overlap the nightly
+        refresh of everyone. Rows are written in user order, so overlapping
+        refreshes cannot deadlock. Covered users left without due cards have
+        their row removed.
+
+        Args:
+            queue_date: Day to compute the queue for (usually tomorrow)
+            user_ids: Only refresh these users (default: everyone)
+        """
+        due = (SRSCard.next_review_date <= queue_date) & ~SRSCard.is_suspended
+        counted = (
+            select(
+                func.gen_random_uuid(),
+                SRSCard.user_id,
+                literal(queue_date, Date),
+                func.count(),
+                func.count().filter(SRSCard.is_learning),
+            )
+            .where(due)
+            .group_by(SRSCard.user_id)
+            .order_by(SRSCard.user_id)
+        )
+        emptied = delete(SRSQueueSize).where(
+            SRSQueueSize.queue_date == queue_date,
+            ~select(SRSCard.id).where(SRSCard.user_id == SRSQueueSize.user_id, due).exists(),
+        )
+        if user_ids is not None:
+            counted = counted.where(SRSCard.user_id.in_(user_ids))
+            emptied = emptied.where(SRSQueueSize.user_id.in_(user_ids))
+
+        statement = pg_insert(SRSQueueSize).from_select(
+            ["id", "user_id", "queue_date", "due_count", "learning_count"], counted
+        )
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[SRSQueueSize.user_id, SRSQueueSize.queue_date],
+                set_={
+                    "due_count": statement.excluded.due_count,
+                    "learning_count": statement.excluded.learning_count,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        await self.db.execute(emptied)
+        self.db.info["has_writes"] = True
+
+    async def purge_queue_sizes(self, before: Optional[date] = None) -> int:
+        """
+        Remove precomputed sizes for days before ``before`` (default: today, UTC)
+
+        Returns:
+            Number of rows deleted
+        """
+        result = await self.db.execute(
+            delete(SRSQueueSize).where(SRSQueueSize.queue_date < (before or _utc_today()))
+        )
+        self.db.info["has_writes"] = True
+        return result.rowcount
+
+    async def queue_size(self, user_id: uuid.UUID, queue_date: date) -> Dict[str, Any]:
+        """
+        Size of the user's queue on queue_date, as precomputed nightly
+
+        A missing row means the user had nothing due when the sizes were
+        computed, or that they were not computed for that date; the count is
+        then taken live from the queue index.
+
+        Returns:
+            queue_date, due_count, learning_count and whether it was precomputed
+        """
+        stored = (await self.db.execute(
+            select(SRSQueueSize.due_count, SRSQueueSize.learning_count)
+            .where(SRSQueueSize.user_id == user_id)
+            .where(SRSQueueSize.queue_date == queue_date)
+        )).first()
+        if stored is not None:
+            return {
+                "queue_date": queue_date,
+                "due_count": stored.due_count,
+                "learning_count": stored.learning_count,
+                "precomputed": True,
+            }
+
+        live = (await self.db.execute(
+            select(func.count(), func.count().filter(SRSCard.is_learning))
+            .where(SRSCard.user_id == user_id)
+            .where(SRSCard.next_review_date <= queue_date)
+            .where(~SRSCard.is_suspended)
+        )).one()
+        return {
+            "queue_date": queue_date,
+            "due_count": live[0],
+            "learning_count": live[1],
+            "precomputed": False,
+        }
+
+    async def forecast(
+        self,
+        user_id: uuid.UUID,
+        days: int = 90,
+        runs: int = 10,
+        new_cards_per_day: int = 0,
+        today: Optional[date] = None,
+        seed: Optional[int] = None
+    ) -> Forecast:
+        """
+        Project the user's daily review load under the current scheduler
+
+        The user's active cards are read with one SELECT; the Monte Carlo
+        simulation runs in a worker thread so the event loop stays free.
+
+        Args:
+            user_id: Owner of the cards
+            days: Forecast horizon in days
+            runs: Monte Carlo runs
+            new_cards_per_day: Cards the user is expected to keep adding
+            today: First forecast day (defaults to today, UTC)
+            seed: Random seed, for reproducible forecasts
+
+        Returns:
+            Mean and 10th/90th percentile reviews per day
+        """
+        today = today or _utc_today()
+        result = await self.db.execute(
+            select(SRSCard.next_review_date, *STATE_COLUMNS)
+            .where(SRSCard.user_id == user_id)
+            .where(~SRSCard.is_suspended)
+        )
+        rows = result.all()
+        states = CardStates.from_rows(rows)
+        due_in_days = (
+            np.array([row.next_review_date for row in rows], dtype="datetime64[D]")
+            - np.datetime64(today, "D")
+        ).astype(np.int64)
+
+        return await asyncio.to_thread(
+            simulate,
+            states,
+            due_in_days,
+            days,
+            runs=runs,
+            new_cards_per_day=new_cards_per_day,
+            start=today,
+            parameters=self.parameters,
+            seed=seed,
+        )
+
+
+class SRSOptimizerJob:
+    """
+    Offline job fitting per-user memory parameters (see srs_optimizer)
+
+    QuestionAttempt rows are streamed in (user, question, time) order and cut
+    into chunks of whole users, which a process pool fits in parallel.
+    Results are written back in submission order: each chunk's parameters
+    are upserted into srs_user_parameters, the fitted ease factor is copied
+    to the user's cards that have not been reviewed yet, and the checkpoint
+    file then records the chunk's last user. An interrupted run resumes
+    after that user; a finished run removes the checkpoint.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        checkpoint_path: str,
+        workers: Optional[int] = None,
+        chunk_rows: int = 200000,
+        apply: bool = True
+    ):
+        self.session_factory = session_factory
+        self.checkpoint_path = checkpoint_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.apply = apply
+        self.stats = {"chunks": 0, "reviews": 0, "users_fitted": 0}
+
+    def load_checkpoint(self) -> Optional[uuid.UUID]:
+        """Last user id fully processed by an interrupted run, if any"""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as source:
+            checkpoint = json.load(source)
+        self.stats.update(checkpoint.get("stats", {}))
+        return uuid.UUID(checkpoint["after_user_id"])
+
+    def save_checkpoint(self, after_user_id: str) -> None:
+        # Write then rename, so a crash never leaves a truncated checkpoint
+        temporary = f"{self.checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as target:
+            json.dump({
+                "after_user_id": after_user_id,
+                "stats": self.stats,
+                "saved_at": datetime.now(timezone.utc).isoformat(),
+            }, target)
+        os.replace(temporary, self.checkpoint_path)
+
+    async def store(self, fits: List[UserFit]) -> None:
+        """Upsert a chunk's fitted parameters and apply them to new cards"""
+        if not fits:
+            return
+        fitted_at = datetime.now(timezone.utc)
+        statement = pg_insert(SRSUserParameters)
+        statement = statement.on_conflict_do_update(
+            index_elements=[SRSUserParameters.user_id],
+            set_={
+                **{
+                    name: statement.excluded[name]
+                    for name in (
+                        "initial_stability", "stability_growth", "ease_factor",
+                        "review_count", "log_loss", "fitted_at",
+                    )
+                },
+                "updated_at": func.now(),
+            },
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement, [
+                {"id": uuid.uuid4(), "user_id": uuid.UUID(fit.user_id), "fitted_at": fitted_at,
+                 "initial_stability": fit.initial_stability, "stability_growth": fit.stability_growth,
+                 "ease_factor": fit.ease_factor, "review_count": fit.review_count, "log_loss": fit.log_loss}
+                for fit in fits
+            ])
+            if self.apply:
+                await session.execute(
+                    update(SRSCard)
+                    .where(SRSCard.user_id == SRSUserParameters.user_id)
+                    .where(SRSUserParameters.user_id.in_([uuid.UUID(fit.user_id) for fit in fits]))
+                    .where(SRSCard.total_reviews == 0)
+                    .values(ease_factor=SRSUserParameters.ease_factor)
+                )
+            await session.commit()
+
+    async def run(self, restart: bool = False) -> Dict[str, int]:
+        """
+        Fit every user with attempts after the checkpoint
+
+        Args:
+            restart: Ignore an existing checkpoint and start from the first user
+
+        Returns:
+            Chunk, review and fitted-user counts (including resumed work)
+        """
+        after = None if restart else self.load_checkpoint()
+        if after is not None:
+            logger.info(f"Resuming SRS optimization after user {after}")
+
+        query = (
+            select(
+                QuestionAttempt.user_id, QuestionAttempt.question_id,
+                QuestionAttempt.is_correct, QuestionAttempt.created_at,
+            )
+            .order_by(QuestionAttempt.user_id, QuestionAttempt.question_id, QuestionAttempt.created_at)
+            .execution_options(yield_per=10000)
+        )
+        if after is not None:
+            query = query.where(QuestionAttempt.user_id > after)
+
+        loop = asyncio.get_running_loop()
+        in_flight: Deque[Tuple[ReviewChunk, asyncio.Future]] = deque()
+
+        async def complete_oldest() -> None:
+            chunk, future = in_flight.popleft()
+            fits = await future
+            await self.store(fits)
+            self.stats["chunks"] += 1
+            self.stats["reviews"] += len(chunk)
+            self.stats["users_fitted"] += len(fits)
+            self.save_checkpoint(chunk.user_ids[-1])
+            logger.info(f"SRS optimizer: {self.stats['users_fitted']} users fitted")
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            builder = ReviewChunkBuilder(chunk_rows=self.chunk_rows)
+
+            def submit(chunk: Optional[ReviewChunk]) -> None:
+                if chunk is not None:
+                    in_flight.append((chunk, loop.run_in_executor(pool, fit_chunk, chunk)))
+
+            async with self.session_factory() as reader:
+                rows = await reader.stream(query)
+                async for row in rows:
+                    submit(builder.add(row.user_id, row.question_id, row.is_correct, row.created_at))
+                    # Bound memory: at most two chunks queued per worker
+                    if len(in_flight) > 2 * self.workers:
+                        await complete_oldest()
+            submit(builder.finish())
+            while in_flight:
+                await complete_oldest()
+
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return self.stats
@@ -0,0 +1,172 @@
+"""
+Monte Carlo forecast of daily SRS review load
+
+A user's cards are copied once per simulation run into flat arrays, and
+every simulated day grades all cards due that day with the real scheduler
+step (srs_engine.schedule) in one vectorized call. Due cards are kept in
+per-day buckets rather than found by scanning every card every day, so the
+cost follows the number of simulated reviews, not cards x days.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.services.srs_engine import DEFAULT_PARAMETERS, CardStates, SM2Parameters, schedule
+
+MAX_HORIZON_DAYS = 365
+
+# Beta prior on a card's recall probability, worth ten reviews at 85%
+RECALL_PRIOR_CORRECT = 8.5
+RECALL_PRIOR_INCORRECT = 1.5
+
+# Grade of a successful recall: 3 for the first quarter of outcomes, 4 up
+# to three quarters, 5 above; a failed recall is graded 1
+PASS_GRADE_CUTS = (0.25, 0.75)
+FAIL_GRADE = 1
+
+
+@dataclass
+class Forecast:
+    """Projected reviews per day, summarised across simulation runs"""
+    start: date
+    mean: np.ndarray  # float64, one value per day
+    p10: np.ndarray
+    p90: np.ndarray
+    runs: int
+
+    @property
+    def days(self) -> int:
+        return len(self.mean)
+
+    def dates(self) -> List[date]:
+        return [self.start + timedelta(days=day) for day in range(self.days)]
+
+    def peak(self) -> Tuple[date, float]:
+        """(date, mean reviews) of the busiest day"""
+        day = int(np.argmax(self.mean))
+        return self.start + timedelta(days=day), float(self.mean[day])
+
+
+def recall_probability(total_reviews: np.ndarray, correct_reviews: np.ndarray) -> np.ndarray:
+    """Posterior mean recall rate of each card from its own review history"""
+    return (correct_reviews + RECALL_PRIOR_CORRECT) / (
+        total_reviews + RECALL_PRIOR_CORRECT + RECALL_PRIOR_INCORRECT
+    )
+
+
+class _DayBuckets:
+    """Card indices grouped by the day they are next due"""
+
+    def __init__(self, days: int):
+        self._buckets: List[List[np.ndarray]] = [[] for _ in range(days)]
+
+    def add(self, indices: np.ndarray, due_days: np.ndarray) -> None:
+        days = len(self._buckets)
+        in_horizon = due_days < days
+        indices, due_days = indices[in_horizon], due_days[in_horizon].astype(np.int16)
+        if not len(indices):
+            return
+        # A stable sort of int16 keys is a radix sort: linear in the batch
+        indices = indices[np.argsort(due_days, kind="stable")]
+        counts = np.bincount(due_days, minlength=days)
+        ends = np.cumsum(counts)
+        for day in np.flatnonzero(counts).tolist():
+            self._buckets[day].append(indices[ends[day] - counts[day]:ends[day]])
+
+    def pop(self, day: int) -> np.ndarray:
+        chunks = self._buckets[day]
+        self._buckets[day] = []
+        if not chunks:
+            return np.empty(0, dtype=np.int32)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def simulate(
+    states: CardStates,
+    due_in_days: np.ndarray,
+    days: int,
+    runs: int = 20,
+    new_cards_per_day: int = 0,
+    start: Optional[date] = None,
+    parameters: SM2Parameters = DEFAULT_PARAMETERS,
+    seed: Optional[int] = None
+) -> Forecast:
+    """
+    Project daily review counts for a card population
+
+    Args:
+        states: Current state of the user's active cards
+        due_in_days: Days until each card is due (negative or 0 if due now)
+        days: Forecast horizon, 1 to MAX_HORIZON_DAYS
+        runs: Monte Carlo runs; recall outcomes are drawn independently per run
+        new_cards_per_day: New cards the learner keeps adding, first reviewed
+            the day they are added
+        start: First forecast day (defaults to today)
+        parameters: Scheduler constants to simulate
+        seed: Random seed, for reproducible forecasts
+
+    Returns:
+        Mean and 10th/90th percentile reviews per day
+
+    Raises:
+        ValueError: If days or runs are out of range
+    """
+    if not 1 <= days <= MAX_HORIZON_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_HORIZON_DAYS}")
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+    start = start or date.today()
+    rng = np.random.default_rng(seed)
+
+    # Existing cards followed by the cards added during the horizon
+    added = new_cards_per_day * days
+    cards = len(states) + added
+    interval = np.concatenate([states.interval, np.ones(added)]).astype(np.int32)
+    ease = np.concatenate([states.ease_factor, np.full(added, 2.5)])
+    repetitions = np.concatenate([states.repetitions, np.zeros(added)]).astype(np.int32)
+    recall = recall_probability(
+        np.concatenate([states.total_reviews, np.zeros(added)]),
+        np.concatenate([states.correct_reviews, np.zeros(added)]),
+    )
+    first_due = np.concatenate([
+        np.clip(np.asarray(due_in_days, dtype=np.int64), 0, days),
+        np.repeat(np.arange(days, dtype=np.int64), new_cards_per_day),
+    ])
+
+    # Run r's copy of card c lives at index r * cards + c
+    interval, ease, repetitions = np.tile(interval, runs), np.tile(ease, runs), np.tile(repetitions, runs)
+    recall = np.tile(recall, runs)
+    run_of = np.repeat(np.arange(runs, dtype=np.int16), cards)
+    buckets = _DayBuckets(days)
+    buckets.add(np.arange(runs * cards, dtype=np.int32), np.tile(first_due, runs))
+
+    load = np.zeros((runs, days), dtype=np.int64)
+    for day in range(days):
+        due = buckets.pop(day)
+        if not len(due):
+            continue
+        load[:, day] = np.bincount(run_of[due], minlength=runs)
+
+        # One draw decides recall and, rescaled within the pass region, the grade
+        draw = rng.random(len(due)) / recall[due]
+        quality = np.where(
+            draw < 1.0,
+            3 + (draw >= PASS_GRADE_CUTS[0]) + (draw >= PASS_GRADE_CUTS[1]),
+            FAIL_GRADE,
+        )
+        new_interval, ease[due], repetitions[due], _ = schedule(
+            interval[due], ease[due], repetitions[due], quality, parameters
+        )
+        interval[due] = new_interval
+        buckets.add(due, day + new_interval)
+
+    return Forecast(
+        start=start,
+        mean=load.mean(axis=0),
+        p10=np.percentile(load, 10, axis=0),
+        p90=np.percentile(load, 90, axis=0),
+        runs=runs,
+    )
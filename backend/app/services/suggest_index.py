@@ -0,0 +1,162 @@
+"""
+Prefix (typeahead) suggestion index for lessons, topics and tags
+
+Suggestions are stored as one sorted array of normalised keys, one per word
+start of each phrase, so "perf" finds both "perfect tenses" and
+"present perfect". A prefix is resolved with two binary searches. Prefixes
+that match many keys get their top results precomputed at build time, so
+the worst case for any lookup is a scan of a few hundred keys.
+"""
+
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Lessons rank by engagement: completions count more than views
+COMPLETION_WEIGHT = 3
+
+# Prefixes matching more keys than this get precomputed results
+SCAN_LIMIT = 256
+MAX_PRECOMPUTED_PREFIX = 8
+MAX_SUGGESTIONS = 20
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation to single spaces"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(WORD_PATTERN.findall(text.lower()))
+
+
+@dataclass
+class Suggestion:
+    text: str
+    kind: str  # lesson, topic, subtopic or tag
+    score: float
+    ref: Optional[str] = None  # lesson slug for lesson suggestions
+
+
+class SuggestIndexBuilder:
+    """
+    Aggregates phrases from streamed lesson and question rows
+
+    Topics, subtopics and tags seen on several rows are merged into one
+    suggestion whose score sums those rows' weights.
+    """
+
+    def __init__(self):
+        self._phrases: Dict[Tuple[str, str], Suggestion] = {}
+
+    def add(self, text: Optional[str], kind: str, score: float, ref: Optional[str] = None) -> None:
+        if not text or not normalize(text):
+            return
+        key = (kind, normalize(text) if kind != "lesson" else ref or normalize(text))
+        existing = self._phrases.get(key)
+        if existing is None:
+            self._phrases[key] = Suggestion(text.strip(), kind, float(score), ref)
+        else:
+            existing.score += score
+
+    def add_lesson(self, lesson: Any) -> None:
+        """Add a lesson row (title, slug, topic, tags, view/completion counts)"""
+        popularity = (lesson.view_count or 0) + COMPLETION_WEIGHT * (lesson.completion_count or 0)
+        # +1 so never-viewed content still ranks above nothing
+        self.add(lesson.title, "lesson", popularity + 1, ref=lesson.slug)
+        self.add(lesson.topic, "topic", popularity + 1)
+        for tag in lesson.tags if isinstance(lesson.tags, list) else []:
+            self.add(str(tag), "tag", popularity + 1)
+
+    def add_question(self, question: Any) -> None:
+        """Add a question row (subtopic, tags); each question counts once"""
+        self.add(question.subtopic, "subtopic", 1)
+        for tag in question.tags if isinstance(question.tags, list) else []:
+            self.add(str(tag), "tag", 1)
+
+    def build(self) -> "SuggestIndex":
+        return SuggestIndex(self._phrases.values())
+
+
+class SuggestIndex:
+    """Immutable prefix index; rebuild and swap to update"""
+
+    def __init__(self, suggestions: Iterable[Suggestion]):
+        self.suggestions: List[Suggestion] = sorted(suggestions, key=lambda s: -s.score)
+
+        entries: List[Tuple[str, int]] = []
+        for phrase_id, suggestion in enumerate(self.suggestions):
+            words = normalize(suggestion.text).split(" ")
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), phrase_id))
+        entries.sort()
+
+        self.keys: List[str] = [key for key, _ in entries]
+        # Phrase ids are ranks (sorted by score), so a smaller id is a better match
+        self.phrase_ids = array("I", (phrase_id for _, phrase_id in entries))
+        self.precomputed = self._precompute()
+
+    def __len__(self) -> int:
+        return len(self.suggestions)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + "\uffff")
+
+    def _top_ids(self, start: int, end: int, limit: int, kinds: Optional[set] = None) -> List[int]:
+        ids = sorted(set(self.phrase_ids[start:end]))
+        if kinds is not None:
+            ids = [i for i in ids if self.suggestions[i].kind in kinds]
+        return ids[:limit]
+
+    def _precompute(self) -> Dict[str, Dict[Optional[str], List[int]]]:
+        """Top ids per frequent prefix, overall (None) and per kind"""
+        precomputed: Dict[str, Dict[Optional[str], List[int]]] = {}
+        for length in range(1, MAX_PRECOMPUTED_PREFIX + 1):
+            index = 0
+            while index < len(self.keys):
+                prefix = self.keys[index][:length]
+                if len(prefix) < length:
+                    index += 1
+                    continue
+                end = bisect_left(self.keys, prefix + "\uffff", index)
+                if end - index > SCAN_LIMIT:
+                    tops: Dict[Optional[str], List[int]] = {None: []}
+                    for phrase_id in sorted(set(self.phrase_ids[index:end])):
+                        kind = self.suggestions[phrase_id].kind
+                        for bucket in (tops[None], tops.setdefault(kind, [])):
+                            if len(bucket) < MAX_SUGGESTIONS:
+                                bucket.append(phrase_id)
+                    precomputed[prefix] = tops
+                index = end
+        return precomputed
+
+    def suggest(self, query: str, limit: int = 10, kinds: Optional[Iterable[str]] = None) -> List[Suggestion]:
+        """
+        Suggestions whose text has a word starting with the query, best first
+
+        Args:
+            query: What the user has typed so far
+            limit: Maximum suggestions (at most MAX_SUGGESTIONS)
+            kinds: Restrict to these suggestion kinds
+
+        Returns:
+            Suggestions ordered by score
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        kinds = set(kinds) if kinds else None
+
+        tops = self.precomputed.get(prefix)
+        if tops is not None:
+            if kinds is None:
+                ids = tops[None]
+            else:
+                ids = sorted(i for kind in kinds for i in tops.get(kind, []))
+        else:
+            ids = self._top_ids(*self._range(prefix), limit, kinds)
+        return [self.suggestions[i] for i in ids[:limit]]
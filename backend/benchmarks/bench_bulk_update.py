@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark DatabaseUtils.bulk_update against the old per-row UPDATE loop
+
+Creates a scratch table, fills it with the requested number of rows and times
+updating every row both ways. Uses DATABASE_URL unless --database-url is given.
+
+Usage:
+    python benchmarks/bench_bulk_update.py --sizes 1000 10000 100000
+    python benchmarks/bench_bulk_update.py --skip-loop --sizes 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import Column, Integer, String, Uuid, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.config import settings
+from app.core.database_utils import DatabaseUtils
+
+BenchBase = declarative_base()
+
+
+class BenchRow(BenchBase):
+    __tablename__ = "bench_bulk_update"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    counter = Column(Integer, nullable=False, default=0)
+    label = Column(String(50))
+
+
+async def per_row_update(session: AsyncSession, updates) -> None:
+    """The previous implementation: one UPDATE statement per row"""
+    for update_data in updates:
+        update_data = dict(update_data)
+        instance_id = update_data.pop("id")
+        await session.execute(
+            BenchRow.__table__.update()
+            .where(BenchRow.id == instance_id)
+            .values(**update_data)
+        )
+
+
+async def run(database_url: str, sizes, skip_loop: bool) -> None:
+    engine = create_async_engine(database_url.replace("postgresql://", "postgresql+asyncpg://"))
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        for size in sizes:
+            async with engine.begin() as conn:
+                await conn.run_sync(BenchBase.metadata.drop_all)
+                await conn.run_sync(BenchBase.metadata.create_all)
+                ids = [uuid.uuid4() for _ in range(size)]
+                for start in range(0, size, 10000):
+                    await conn.execute(insert(BenchRow), [
+                        {"id": row_id, "counter": 0, "label": "new"} for row_id in ids[start:start + 10000]
+                    ])
+
+            # Half the rows change two columns, half change one
+            updates = [
+                {"id": row_id, "counter": i, "label": "updated"} if i % 2 else {"id": row_id, "counter": i}
+                for i, row_id in enumerate(ids)
+            ]
+
+            variants = [("bulk_update", DatabaseUtils.bulk_update)]
+            if not skip_loop:
+                variants.append(("per-row loop", lambda session, model, rows: per_row_update(session, rows)))
+
+            for name, update in variants:
+                async with SessionLocal() as session:
+                    start = time.perf_counter()
+                    await update(session, BenchRow, updates)
+                    await session.commit()
+                    elapsed = time.perf_counter() - start
+                print(f"{size:>7} rows  {name:<14} {elapsed:8.2f}s  {size / elapsed:10.0f} rows/s")
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(BenchBase.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=settings.DATABASE_URL)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--skip-loop", action="store_true", help="Only time bulk_update")
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.sizes, args.skip_loop))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent login throughput with inline vs pooled bcrypt
+
+Simulates N concurrent logins against one event loop and reports logins/s
+plus the worst event loop stall seen by a 10ms ticker. The inline variant is
+what AuthService did before hashing moved to the worker pool.
+
+Usage:
+    python benchmarks/bench_password_hashing.py --logins 40 --workers 4
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.security import (
+    PasswordHashPool, get_password_hash, verify_password
+)
+
+PASSWORD = "TestPassword123"
+
+
+async def _ticker(stop: asyncio.Event, lags: list) -> None:
+    """Record how late a 10ms sleep wakes up while logins run"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+
+async def _run(login, logins: int) -> dict:
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    assert all(results)
+
+    return {
+        "elapsed": elapsed,
+        "throughput": logins / elapsed,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+async def main(logins: int, workers: int, executor: str) -> None:
+    hashed = get_password_hash(PASSWORD)
+
+    async def inline_login() -> bool:
+        return verify_password(PASSWORD, hashed)
+
+    pool = PasswordHashPool(executor_type=executor, max_workers=workers, max_pending=logins)
+
+    async def pooled_login() -> bool:
+        return await pool.run(verify_password, PASSWORD, hashed)
+
+    try:
+        for name, login in (("inline", inline_login), (f"pooled ({executor} x{workers})", pooled_login)):
+            stats = await _run(login, logins)
+            print(
+                f"{name:<24} {logins} logins in {stats['elapsed']:.2f}s "
+                f"-> {stats['throughput']:.1f} logins/s, "
+                f"max event loop lag {stats['max_loop_lag_ms']:.0f}ms"
+            )
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.executor))
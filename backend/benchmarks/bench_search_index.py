@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory search index on a synthetic question corpus
+
+Builds an index of N generated questions, then reports build time, query
+latency percentiles with and without facet filters, fuzzy (misspelled)
+query latency and correction accuracy, facet count latency, and snapshot
+save/load times.
+
+Usage:
+    python benchmarks/bench_search_index.py --documents 100000 --queries 2000
+"""
+
+import argparse
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.search_index import InvertedIndex, SearchDocument
+
+LEVELS = ["A1", "A2", "B1", "B2"]
+SKILLS = ["grammar", "vocabulary", "reading", "listening", "writing", "speaking"]
+TYPES = ["mcq", "cloze", "ordering", "error_detection", "short_answer", "matching", "true_false"]
+TOPICS = [
+    "present perfect", "past simple", "articles", "modal verbs", "conditionals",
+    "prepositions", "phrasal verbs", "passive voice", "reported speech", "comparatives",
+]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def synthetic_corpus(count: int, seed: int = 7, vocabulary_size: int = 20000):
+    """Yield question-like documents with a Zipf-ish word distribution"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, vocabulary_size)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary_size)))
+    for i in range(count):
+        topic = rng.choice(TOPICS)
+        stem = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(8, 25)))
+        yield SearchDocument(
+            key=f"question:{i}",
+            fields={"stem": f"{stem} {topic}", "tags": " ".join(rng.sample(vocabulary[:500], 3)), "topic": topic},
+            facets={
+                "kind": "question",
+                "level": rng.choice(LEVELS),
+                "skill": rng.choice(SKILLS),
+                "topic": topic,
+                "type": rng.choice(TYPES),
+                "difficulty": str(rng.randint(1, 5)),
+            },
+            meta={"kind": "question", "id": str(i), "title": stem[:200]},
+        )
+
+
+def misspell(rng: random.Random, word: str) -> str:
+    """Apply one random insert, delete, substitution or transposition"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    i = rng.randrange(len(word) - 1)
+    edit = rng.choice(["insert", "delete", "substitute", "transpose"])
+    if edit == "insert":
+        return word[:i] + rng.choice(letters) + word[i:]
+    if edit == "delete":
+        return word[:i] + word[i + 1:]
+    if edit == "substitute":
+        return word[:i] + rng.choice(letters.replace(word[i], "")) + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_queries(index: InvertedIndex, queries: list, filters) -> list:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, filters=filters, limit=20)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(documents: int, queries: int) -> None:
+    start = time.perf_counter()
+    index = InvertedIndex()
+    index.add_many(synthetic_corpus(documents))
+    print(f"built {len(index)} documents, {len(index.postings)} terms in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(11)
+    vocabulary = make_vocabulary(random.Random(7), 20000)
+    sample = [
+        " ".join(rng.choice(vocabulary[:2000]) for _ in range(rng.randint(1, 3))) + " " + rng.choice(TOPICS)
+        for _ in range(queries)
+    ]
+
+    for name, filters in [
+        ("no filters", None),
+        ("level+skill", {"level": ["A2"], "skill": ["grammar"]}),
+    ]:
+        latencies = time_queries(index, sample, filters)
+        print(
+            f"{name:<12} p50 {statistics.median(latencies):6.2f}ms  "
+            f"p95 {percentile(latencies, 0.95):6.2f}ms  p99 {percentile(latencies, 0.99):6.2f}ms"
+        )
+
+    # Only misspellings that are not themselves vocabulary words exercise correction
+    targets = [word for word in vocabulary[:5000] if len(word) >= 5]
+    typos = []
+    while len(typos) < queries:
+        word = rng.choice(targets)
+        typo = misspell(rng, word)
+        if typo not in index.postings:
+            typos.append((word, typo))
+
+    latencies, corrected = [], 0
+    for word, typo in typos:
+        start = time.perf_counter()
+        results = index.search(typo, limit=20)
+        latencies.append((time.perf_counter() - start) * 1000)
+        corrected += results.corrections.get(typo) == word
+    print(
+        f"{'fuzzy':<12} p50 {statistics.median(latencies):6.2f}ms  "
+        f"p95 {percentile(latencies, 0.95):6.2f}ms  p99 {percentile(latencies, 0.99):6.2f}ms  "
+        f"corrected {corrected / len(typos):.0%}  "
+        f"({len(index.speller.deletes)} delete keys for {len(index.speller)} terms)"
+    )
+
+    for name, filters in [
+        ("facets, none", None),
+        ("facets, 3 set", {"level": ["A2", "B1"], "skill": ["grammar"], "difficulty": ["3"]}),
+    ]:
+        latencies = []
+        for _ in range(200):
+            start = time.perf_counter()
+            index.facet_counts(filters=filters)
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{name:<13} p50 {statistics.median(latencies):6.2f}ms  "
+            f"p99 {percentile(latencies, 0.99):6.2f}ms"
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/search.pkl"
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        InvertedIndex.load(path)
+        loaded = time.perf_counter() - start
+        size_mb = Path(path).stat().st_size / 1e6
+    print(f"snapshot {size_mb:.1f}MB  save {saved:.2f}s  load {loaded:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.documents, args.queries)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized SM-2 engine against a per-card Python loop
+
+Generates random card states and grades in memory and times scheduling the
+whole batch both ways; no database is needed.
+
+Usage:
+    python benchmarks/bench_srs_engine.py --sizes 200 100000 1000000
+    python benchmarks/bench_srs_engine.py --skip-loop --sizes 5000000
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from app.services.srs_engine import DEFAULT_PARAMETERS, CardStates, review
+
+
+def per_card_review(cards, qualities, today, parameters=DEFAULT_PARAMETERS):
+    """One Python object per card, as a naive scheduler would do it"""
+    results = []
+    for card, quality in zip(cards, qualities):
+        interval, ease, repetitions = card["interval"], card["ease_factor"], card["repetitions"]
+        miss = 5 - quality
+        ease = round(min(max(ease + 0.1 - miss * (0.08 + miss * 0.02), parameters.min_ease), parameters.max_ease), 2)
+        if quality < parameters.pass_grade:
+            repetitions, interval = 0, parameters.lapse_interval
+        else:
+            repetitions += 1
+            if repetitions == 1:
+                interval = parameters.first_interval
+            elif repetitions == 2:
+                interval = parameters.second_interval
+            else:
+                interval = round(interval * ease)
+        interval = min(max(interval, 1), parameters.max_interval)
+        results.append({
+            "interval": interval,
+            "ease_factor": ease,
+            "repetitions": repetitions,
+            "next_review_date": (today + timedelta(days=interval)).isoformat(),
+        })
+    return results
+
+
+def random_states(size: int, rng: np.random.Generator) -> CardStates:
+    return CardStates(
+        interval=rng.integers(1, 200, size, dtype=np.int32),
+        ease_factor=np.round(rng.uniform(1.3, 3.5, size), 2),
+        repetitions=rng.integers(0, 10, size, dtype=np.int32),
+        total_reviews=rng.integers(0, 50, size, dtype=np.int32),
+        correct_reviews=rng.integers(0, 50, size, dtype=np.int32),
+        consecutive_correct=rng.integers(0, 10, size, dtype=np.int32),
+        average_response_time=rng.integers(500, 10000, size, dtype=np.int32),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 100000, 1000000])
+    parser.add_argument("--skip-loop", action="store_true", help="Only time the vectorized engine")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    today = date.today()
+    for size in args.sizes:
+        states = random_states(size, rng)
+        qualities = rng.integers(0, 6, size, dtype=np.int32)
+        response_times = rng.integers(500, 10000, size)
+
+        started = time.perf_counter()
+        result = review(states, qualities, today, response_time_ms=response_times)
+        result.next_review_dates()
+        vectorized = time.perf_counter() - started
+        line = f"{size:>9} cards  vectorized {vectorized * 1000:9.1f} ms"
+
+        if not args.skip_loop:
+            cards = [
+                {"interval": int(i), "ease_factor": float(e), "repetitions": int(r)}
+                for i, e, r in zip(states.interval, states.ease_factor, states.repetitions)
+            ]
+            grades = qualities.tolist()
+            started = time.perf_counter()
+            per_card_review(cards, grades, today)
+            loop = time.perf_counter() - started
+            line += f"  per-card {loop * 1000:9.1f} ms  speedup {loop / vectorized:6.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
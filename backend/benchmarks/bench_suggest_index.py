@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark typeahead suggestion latency on a synthetic catalogue
+
+Builds a suggest index from generated lessons and questions, then replays
+per-keystroke lookups (every prefix of sampled phrases) and reports build
+time and latency percentiles. The target is p99 under 2ms.
+
+Usage:
+    python benchmarks/bench_suggest_index.py --lessons 20000 --questions 100000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the app directory to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.suggest_index import SuggestIndexBuilder
+
+P99_TARGET_MS = 2.0
+
+
+def make_words(rng: random.Random, count: int) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(count)]
+
+
+def build(lessons: int, questions: int, seed: int = 3):
+    rng = random.Random(seed)
+    words = make_words(rng, 5000)
+    topics = [" ".join(rng.sample(words, 2)) for _ in range(300)]
+    tags = rng.sample(words, 2000)
+    subtopics = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(3000)]
+
+    builder = SuggestIndexBuilder()
+    phrases = []
+    for i in range(lessons):
+        title = " ".join(rng.sample(words, rng.randint(2, 6)))
+        phrases.append(title)
+        builder.add_lesson(SimpleNamespace(
+            title=title, slug=f"lesson-{i}", topic=rng.choice(topics),
+            tags=rng.sample(tags, 3), view_count=int(rng.paretovariate(1.2) * 10),
+            completion_count=int(rng.paretovariate(1.5) * 3),
+        ))
+    for _ in range(questions):
+        builder.add_question(SimpleNamespace(subtopic=rng.choice(subtopics), tags=rng.sample(tags, 2)))
+
+    start = time.perf_counter()
+    index = builder.build()
+    return index, phrases + topics + subtopics, time.perf_counter() - start
+
+
+def main(lessons: int, questions: int, samples: int) -> None:
+    index, phrases, build_seconds = build(lessons, questions)
+    print(
+        f"built {len(index)} suggestions, {len(index.keys)} keys, "
+        f"{len(index.precomputed)} precomputed prefixes in {build_seconds:.2f}s"
+    )
+
+    rng = random.Random(5)
+    lookups = []
+    for phrase in rng.sample(phrases, samples):
+        # Users type from the start of any word in the phrase
+        word_start = rng.choice([0] + [i + 1 for i, char in enumerate(phrase) if char == " "])
+        typed = phrase[word_start:]
+        lookups.extend(typed[:length] for length in range(1, min(len(typed), 12) + 1))
+
+    for name, kinds in [("all kinds", None), ("lessons only", ["lesson"])]:
+        latencies = []
+        for prefix in lookups:
+            start = time.perf_counter()
+            index.suggest(prefix, limit=10, kinds=kinds)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(
+            f"{name:<13} {len(latencies)} lookups  p50 {statistics.median(latencies):.3f}ms  "
+            f"p99 {p99:.3f}ms  max {latencies[-1]:.3f}ms  "
+            f"{'OK' if p99 < P99_TARGET_MS else 'OVER TARGET'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lessons", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.lessons, args.questions, args.samples)
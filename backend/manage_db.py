@@ -72,6 +72,313 @@ def check():
         sys.exit(1)
 
 
+@cli.command("backfill-search")
+@click.option("--table", type=click.Choice(["lessons", "questions"]), multiple=True,
+              help="Table to backfill (default: all)")
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--all-rows", is_flag=True, help="Recompute every row, not only missing vectors")
+def backfill_search(table, batch_size, all_rows):
+    """Populate search_vector columns and install the update triggers"""
+    from app.core.database import AsyncSessionLocal
+    from app.core.search_vectors import SEARCH_VECTOR_FIELDS, backfill_search_vectors, install_search_triggers
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            await install_search_triggers(session)
+            for name in table or SEARCH_VECTOR_FIELDS:
+                count = await backfill_search_vectors(
+                    session, name, batch_size=batch_size, only_missing=not all_rows
+                )
+                click.echo(f"  {name}: {count} rows updated")
+
+    click.echo("Backfilling search vectors...")
+    try:
+        asyncio.run(run())
+        click.echo("✅ Search vectors backfilled")
+    except Exception as e:
+        click.echo(f"❌ Backfill failed: {e}")
+        sys.exit(1)
+
+
+@cli.command("import-jsonl")
+@click.argument("model_name")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--on-conflict", type=click.Choice(["nothing", "update"]), default=None,
+              help="Load through a staging table and skip or update existing rows")
+def import_jsonl(model_name, path, on_conflict):
+    """Bulk load a JSON-lines file into MODEL_NAME's table with COPY"""
+    import json
+    from app import models
+    from app.core.database import AsyncSessionLocal
+    from app.core.database_utils import DatabaseUtils
+
+    model = getattr(models, model_name, None)
+    if model is None or not hasattr(model, "__table__"):
+        click.echo(f"❌ Unknown model: {model_name}")
+        sys.exit(1)
+
+    def read_rows():
+        with open(path, encoding="utf-8") as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            count = await DatabaseUtils.bulk_copy(session, model, read_rows(), on_conflict=on_conflict)
+            await session.commit()
+            return count
+
+    click.echo(f"Importing {path} into {model.__tablename__}...")
+    try:
+        count = asyncio.run(run())
+        click.echo(f"✅ Imported {count} rows")
+    except Exception as e:
+        click.echo(f"❌ Import failed: {e}")
+        sys.exit(1)
+
+
+@cli.command("srs-reschedule")
+@click.option("--chunk-size", default=50000, show_default=True)
+def srs_reschedule(chunk_size):
+    """Recompute SRS due dates, unbury cards and purge old review batch ids and queue sizes"""
+    from app.core.database import AsyncSessionLocal
+    from app.services.srs_service import SRSService
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            service = SRSService(session)
+            count = await service.reschedule_all(chunk_size=chunk_size)
+            purged = await service.purge_review_batches(settings.SRS_REVIEW_BATCH_RETENTION_DAYS)
+            stale = await service.purge_queue_sizes()
+            await session.commit()
+            return count, purged, stale
+
+    click.echo("Rescheduling SRS cards...")
+    try:
+        count, purged, stale = asyncio.run(run())
+        click.echo(
+            f"✅ Rescheduled {count} cards, forgot {purged} old review batches"
+            f" and {stale} past queue sizes"
+        )
+    except Exception as e:
+        click.echo(f"❌ Reschedule failed: {e}")
+        sys.exit(1)
+
+
+@cli.command("srs-forecast")
+@click.argument("user")
+@click.option("--days", default=90, show_default=True, type=click.IntRange(1, 365))
+@click.option("--runs", default=10, show_default=True, type=click.IntRange(1, 200))
+@click.option("--new-per-day", default=0, show_default=True, help="New cards added per day")
+@click.option("--seed", type=int, default=None, help="Random seed for a reproducible forecast")
+def srs_forecast(user, days, runs, new_per_day, seed):
+    """Project USER's (email or id) daily SRS review load, by week"""
+    import uuid
+    from sqlalchemy import select
+    from app.core.database import ReadOnlySessionLocal
+    from app.models.user import User
+    from app.services.srs_service import SRSService
+
+    async def run():
+        async with ReadOnlySessionLocal() as session:
+            try:
+                condition = User.id == uuid.UUID(user)
+            except ValueError:
+                condition = User.email == user
+            user_id = await session.scalar(select(User.id).where(condition))
+            if user_id is None:
+                return None
+            return await SRSService(session).forecast(
+                user_id, days=days, runs=runs, new_cards_per_day=new_per_day, seed=seed
+            )
+
+    try:
+        forecast = asyncio.run(run())
+    except Exception as e:
+        click.echo(f"❌ Forecast failed: {e}")
+        sys.exit(1)
+    if forecast is None:
+        click.echo(f"❌ Unknown user: {user}")
+        sys.exit(1)
+
+    click.echo(f"Reviews per day over {forecast.days} days ({forecast.runs} runs):")
+    for start in range(0, forecast.days, 7):
+        week = slice(start, start + 7)
+        click.echo(
+            f"  {forecast.dates()[start]}  {forecast.mean[week].mean():8.1f}"
+            f"  (p10 {forecast.p10[week].mean():.0f}, p90 {forecast.p90[week].mean():.0f})"
+        )
+    peak_date, peak_reviews = forecast.peak()
+    click.echo(f"Peak: {peak_reviews:.0f} reviews on {peak_date}")
+
+
+@cli.command("srs-optimize")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--chunk-rows", default=200000, show_default=True, help="Attempts per worker task")
+@click.option("--checkpoint", default=".srs_optimizer_checkpoint.json", show_default=True,
+              type=click.Path(dir_okay=False), help="Progress file used to resume an interrupted run")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and start from the first user")
+@click.option("--no-apply", is_flag=True, help="Store fitted parameters without updating new cards")
+def srs_optimize(workers, chunk_rows, checkpoint, restart, no_apply):
+    """Fit per-user SRS memory parameters from question attempt history"""
+    from app.core.database import AsyncSessionLocal
+    from app.services.srs_service import SRSOptimizerJob
+
+    job = SRSOptimizerJob(
+        AsyncSessionLocal,
+        checkpoint_path=checkpoint,
+        workers=workers,
+        chunk_rows=chunk_rows,
+        apply=not no_apply,
+    )
+    click.echo("Fitting SRS parameters...")
+    try:
+        stats = asyncio.run(job.run(restart=restart))
+        click.echo(
+            f"✅ Fitted {stats['users_fitted']} users from {stats['reviews']} attempts"
+            f" in {stats['chunks']} chunks"
+        )
+    except Exception as e:
+        click.echo(f"❌ Optimization failed: {e} (rerun to resume from {checkpoint})")
+        sys.exit(1)
+
+
+@cli.command("achievements-rebuild")
+@click.option("--user", "user_id", default=None, help="Only rebuild this user (default: every user with history)")
+def achievements_rebuild(user_id):
+    """Recompute achievement rule state from attempt and lesson history"""
+    import uuid
+    from sqlalchemy import select, union
+    from app.core.database import AsyncSessionLocal
+    from app.models.progress import LessonProgress, QuestionAttempt
+    from app.services.achievement_service import AchievementService
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            if user_id:
+                user_ids = [uuid.UUID(user_id)]
+            else:
+                user_ids = (await session.execute(union(
+                    select(QuestionAttempt.user_id),
+                    select(LessonProgress.user_id).where(LessonProgress.is_completed.is_(True)),
+                ))).scalars().all()
+            service = AchievementService(session)
+            events = 0
+            # One transaction per user keeps locks short
+            for current in user_ids:
+                events += await service.rebuild(current)
+                await session.commit()
+            return len(user_ids), events
+
+    click.echo("Rebuilding achievements...")
+    try:
+        users, events = asyncio.run(run())
+        click.echo(f"✅ Replayed {events} events for {users} users")
+    except Exception as e:
+        click.echo(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+
+
+@cli.command("stats-check")
+@click.option("--repair", is_flag=True, help="Overwrite drifted rows with totals recomputed from source")
+@click.option("--user", "user_id", default=None, help="Only check this user")
+@click.option("--batch-size", default=1000, show_default=True)
+def stats_check(repair, user_id, batch_size):
+    """Verify the user_stats rollup against lessons, attempts and SRS cards"""
+    import uuid
+    from app.core.database import AsyncSessionLocal
+    from app.core.user_stats import check_user_stats
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            return await check_user_stats(
+                session,
+                repair=repair,
+                batch_size=batch_size,
+                user_ids=[uuid.UUID(user_id)] if user_id else None,
+            )
+
+    click.echo("Checking user statistics...")
+    try:
+        result = asyncio.run(run())
+    except Exception as e:
+        click.echo(f"❌ Check failed: {e}")
+        sys.exit(1)
+    if not result["drifted"]:
+        click.echo(f"✅ {result['checked']} users consistent")
+    elif repair:
+        click.echo(f"✅ Repaired {result['drifted']} of {result['checked']} users")
+    else:
+        click.echo(f"❌ {result['drifted']} of {result['checked']} users drifted, e.g. {', '.join(result['sample'][:5])}")
+        click.echo("   Rerun with --repair to rebuild them from source")
+        sys.exit(1)
+
+
+@cli.command("attempts-partition")
+@click.option("--batch-size", default=10000, show_default=True, help="Rows copied per transaction")
+@click.option("--checkpoint", default=".attempts_partition_checkpoint.json", show_default=True,
+              type=click.Path(dir_okay=False), help="Progress file used to resume an interrupted run")
+@click.option("--restart", is_flag=True, help="Ignore the checkpoint and copy from the first row")
+def attempts_partition(batch_size, checkpoint, restart):
+    """Convert question_attempts to monthly partitions without blocking writes"""
+    from app.core.database import AsyncSessionLocal
+    from app.core.partitions import LEGACY, PartitionMigration
+
+    job = PartitionMigration(
+        AsyncSessionLocal,
+        checkpoint_path=checkpoint,
+        batch_size=batch_size,
+        months_ahead=settings.QUESTION_ATTEMPT_PARTITIONS_AHEAD,
+    )
+    click.echo("Partitioning question attempts...")
+    try:
+        stats = asyncio.run(job.run(restart=restart))
+    except Exception as e:
+        click.echo(f"❌ Partitioning failed: {e} (rerun to resume from {checkpoint})")
+        sys.exit(1)
+    if stats["already_partitioned"]:
+        click.echo("✅ question_attempts is already partitioned")
+    else:
+        click.echo(f"✅ Copied {stats['rows']} attempts in {stats['batches']} batches")
+        click.echo(f"   The old table is kept as {LEGACY}; drop it once the new one is verified")
+
+
+@cli.command("attempts-maintain")
+@click.option("--months-ahead", type=int, default=None,
+              help="Future months to create (default: QUESTION_ATTEMPT_PARTITIONS_AHEAD)")
+@click.option("--retention-months", type=int, default=None,
+              help="Months kept before detaching (default: QUESTION_ATTEMPT_RETENTION_MONTHS, 0 keeps all)")
+@click.option("--drop", is_flag=True, help="Drop expired partitions instead of archiving them")
+def attempts_maintain(months_ahead, retention_months, drop):
+    """Create upcoming question_attempts partitions and detach expired ones (run daily)"""
+    from app.core.database import AsyncSessionLocal
+    from app.core.partitions import apply_retention, ensure_partitions
+
+    async def run():
+        async with AsyncSessionLocal() as session:
+            created = await ensure_partitions(
+                session,
+                settings.QUESTION_ATTEMPT_PARTITIONS_AHEAD if months_ahead is None else months_ahead,
+            )
+            detached = await apply_retention(
+                session,
+                settings.QUESTION_ATTEMPT_RETENTION_MONTHS if retention_months is None else retention_months,
+                archive_schema=None if drop else settings.QUESTION_ATTEMPT_ARCHIVE_SCHEMA or None,
+            )
+            return created, detached
+
+    click.echo("Maintaining question attempt partitions...")
+    try:
+        created, detached = asyncio.run(run())
+        click.echo(f"✅ Created {len(created)} partitions, detached {len(detached)}")
+        for name in detached:
+            click.echo(f"  {name}")
+    except Exception as e:
+        click.echo(f"❌ Maintenance failed: {e}")
+        sys.exit(1)
+
+
 @cli.command()
 def info():
     """Show database configuration information"""
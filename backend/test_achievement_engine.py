@@ -0,0 +1,136 @@
+"""
+Tests for incremental achievement evaluation
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services.achievement_engine import (
+    ACHIEVEMENTS, ATTEMPT, LESSON_COMPLETED, AchievementEvent, apply_events, progress
+)
+
+START = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def attempts(outcomes, start=START, time_taken=8):
+    return [
+        AchievementEvent(ATTEMPT, start + timedelta(minutes=i), is_correct=correct, time_taken=time_taken)
+        for i, correct in enumerate(outcomes)
+    ]
+
+
+def test_incremental_matches_full_replay():
+    """Test folding events in batches gives the same state as one pass"""
+    events = attempts([True] * 12 + [False] + [True] * 30 + [False, False] + [True] * 5)
+    events += [AchievementEvent(LESSON_COMPLETED, START + timedelta(days=1))]
+
+    state = {}
+    for i in range(0, len(events), 7):
+        state = apply_events(state, events[i:i + 7])
+    assert state == apply_events({}, events)
+
+    values = progress(state)
+    assert values["first_answers"] == 10  # capped at target
+    assert values["answers_500"] == 50
+    assert values["streak_25"] == 25
+    assert state["correct_streak"] == {"current": 5, "value": 30}
+    assert values["first_lesson"] == 1
+    print("✓ Incremental replay test passed")
+
+
+def test_window_and_speed_rules():
+    """Test the sliding accuracy window and the timed predicate"""
+    state = apply_events({}, attempts([True, False] * 10))
+    assert progress(state)["accuracy_18_of_20"] == 10
+
+    # Ones that age out of the window stop counting
+    state = apply_events(state, attempts([True] * 17, start=START + timedelta(hours=1)))
+    assert state["recent_accuracy"]["size"] == 20
+    assert progress(state)["accuracy_18_of_20"] == 18
+
+    state = apply_events(state, attempts([True] * 3, time_taken=3) + attempts([False], time_taken=1))
+    assert state["fast_correct_answers"]["value"] == 3
+    print("✓ Window and speed rule test passed")
+
+
+def test_study_day_streak():
+    """Test consecutive study days, repeats within a day and gaps"""
+    days = [0, 0, 1, 2, 4, 5, 6, 7, 8, 9, 10]
+    events = [AchievementEvent(ATTEMPT, START + timedelta(days=day, hours=1)) for day in days]
+    state = apply_events({}, events)
+    assert state["study_days"]["current"] == 7
+    assert progress(state)["study_week"] == 7
+    assert progress(state)["study_month"] == 7
+
+    # Late-arriving events for days already counted change nothing
+    assert apply_events(state, events[:3])["study_days"] == state["study_days"]
+    print("✓ Study day streak test passed")
+
+
+def test_rules_are_consistent():
+    """Test every rule has a unique key and a valid type, category and difficulty"""
+    keys = [rule.key for rule in ACHIEVEMENTS]
+    assert len(keys) == len(set(keys))
+    for rule in ACHIEVEMENTS:
+        assert rule.achievement_type in ("streak", "completion", "accuracy", "speed", "milestone", "special")
+        assert rule.category in ("learning", "social", "progress", "mastery", "engagement")
+        assert rule.difficulty in ("bronze", "silver", "gold", "platinum")
+        assert rule.target > 0
+    print("✓ Rule consistency test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_achievement_service_with_postgres():
+    """Test evaluation across calls earns each badge exactly once"""
+    from app.models.progress import UserAchievement, UserAchievementState
+    from app.models.user import User
+    from app.services.achievement_service import AchievementService
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, UserAchievement, UserAchievementState):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            user = User(email=f"badges-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Badge Test")
+            session.add(user)
+            await session.commit()
+
+        async with SessionLocal() as session:
+            service = AchievementService(session)
+            earned = await service.record(user.id, attempts([True] * 6))
+            assert earned == []
+            earned = await service.record(user.id, attempts([True] * 6, start=START + timedelta(hours=1)))
+            assert {rule.key for rule in earned} == {"first_answers", "streak_10"}
+            assert await service.record(user.id, attempts([True], start=START + timedelta(hours=2))) == []
+            await session.commit()
+
+            rows = dict((await session.execute(
+                select(UserAchievement.achievement_key, UserAchievement.current_progress)
+                .where(UserAchievement.user_id == user.id)
+            )).all())
+            assert rows["first_answers"] == 10 and rows["streak_25"] == 13
+            state = (await session.execute(
+                select(UserAchievementState).where(UserAchievementState.user_id == user.id)
+            )).scalar_one()
+            assert state.event_count == 13
+
+            await session.execute(delete(UserAchievement).where(UserAchievement.user_id == user.id))
+            await session.execute(delete(UserAchievementState).where(UserAchievementState.user_id == user.id))
+            await session.execute(delete(User).where(User.id == user.id))
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres achievement service test passed")
@@ -3,11 +3,16 @@ Simple authentication system test
 """
 
 import asyncio
+import threading
+from datetime import timedelta
 import pytest
+from fastapi import HTTPException
 from app.core.security import (
     get_password_hash, verify_password, 
     create_access_token, verify_token,
-    generate_verification_token
+    generate_verification_token,
+    get_password_hash_async, verify_password_async, PasswordHashPool,
+    create_refresh_token, token_cache
 )
 
 
@@ -27,6 +32,42 @@ def test_password_hashing():
     print("✓ Password hashing test passed")
 
 
+def test_async_password_hashing():
+    """Test password hashing through the worker pool"""
+    async def run():
+        hashed = await get_password_hash_async("TestPassword123")
+        assert await verify_password_async("TestPassword123", hashed) is True
+        assert await verify_password_async("WrongPassword", hashed) is False
+    
+    asyncio.run(run())
+    print("✓ Async password hashing test passed")
+
+
+def test_password_pool_backpressure():
+    """Test that a saturated hashing pool rejects work with 503"""
+    release = threading.Event()
+    pool = PasswordHashPool(executor_type="thread", max_workers=1, max_pending=1)
+    
+    async def run():
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0)
+        assert pool.pending == 1
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(verify_password, "x", "y")
+        assert exc_info.value.status_code == 503
+        
+        release.set()
+        assert await blocked is True
+        assert pool.pending == 0
+    
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
+    print("✓ Password pool backpressure test passed")
+
+
 def test_token_generation():
     """Test JWT token generation and verification"""
     user_data = {
@@ -46,6 +87,40 @@ def test_token_generation():
     print("✓ Token generation test passed")
 
 
+def test_token_verification_cache():
+    """Test that repeated verification of a token is served from the cache"""
+    token_cache.clear()
+    access_token = create_access_token({"sub": "cached-user", "scopes": ["user"]})
+    
+    first = verify_token(access_token, "access")
+    first["sub"] = "tampered"
+    first["scopes"].append("admin")
+    second = verify_token(access_token, "access")
+    
+    assert second["sub"] == "cached-user"
+    assert second["scopes"] == ["user"]
+    assert token_cache.stats()["hits"] == 1
+    assert token_cache.stats()["misses"] == 1
+    
+    # Token type is still enforced on cache hits
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token(access_token, "refresh")
+    assert exc_info.value.status_code == 401
+    print("✓ Token verification cache test passed")
+
+
+def test_expired_token_rejected():
+    """Test that expired tokens are rejected and never cached"""
+    token_cache.clear()
+    expired = create_refresh_token({"sub": "expired-user"}, timedelta(seconds=-5))
+    
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token(expired, "refresh")
+    assert exc_info.value.detail == "Token has expired"
+    assert len(token_cache) == 0
+    print("✓ Expired token test passed")
+
+
 def test_verification_token():
     """Test verification token generation"""
     token1 = generate_verification_token()
@@ -66,6 +141,10 @@ def test_verification_token():
 
 if __name__ == "__main__":
     test_password_hashing()
+    test_async_password_hashing()
+    test_password_pool_backpressure()
     test_token_generation()
+    test_token_verification_cache()
+    test_expired_token_rejected()
     test_verification_token()
     print("\n🎉 All authentication security tests passed!")
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Tests for DatabaseUtils bulk write helpers
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Uuid, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+from app.core.database_utils import DatabaseUtils
+
+TestBase = declarative_base()
+
+
+class Item(TestBase):
+    __tablename__ = "bulk_items"
+
+    id = Column(Integer, primary_key=True)
+    counter = Column(Integer, nullable=False, default=0)
+    label = Column(String(20))
+
+
+class CopyItem(TestBase):
+    __tablename__ = "bulk_copy_items"
+
+    id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    name = Column(String(20), nullable=False, unique=True)
+    tags = Column(JSON, default=list)
+    created_at = Column(DateTime)
+
+
+def create_test_sessionmaker():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def test_bulk_update_groups_and_chunks():
+    """Test set-based bulk updates with mixed column sets"""
+    engine, SessionLocal = create_test_sessionmaker()
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(TestBase.metadata.create_all)
+            await conn.execute(insert(Item), [
+                {"id": i, "counter": 0, "label": "new"} for i in range(1, 11)
+            ])
+
+        updates = [
+            {"id": i, "counter": i * 10} if i % 2 else {"id": i, "counter": i * 10, "label": "even"}
+            for i in range(1, 11)
+        ]
+        original = [dict(update) for update in updates]
+
+        async with SessionLocal() as session:
+            await DatabaseUtils.bulk_update(session, Item, updates, chunk_size=3)
+            await session.commit()
+
+            rows = (await session.execute(select(Item).order_by(Item.id))).scalars().all()
+            assert [row.counter for row in rows] == [i * 10 for i in range(1, 11)]
+            assert [row.label for row in rows] == ["new" if i % 2 else "even" for i in range(1, 11)]
+
+        # Caller's dicts are left untouched
+        assert updates == original
+
+        with pytest.raises(ValueError):
+            async with SessionLocal() as session:
+                await DatabaseUtils.bulk_update(session, Item, [{"counter": 1}])
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Bulk update test passed")
+
+
+def test_bulk_copy_rejects_bad_input_without_a_connection():
+    """Test bulk_copy argument handling that never reaches COPY"""
+    engine, SessionLocal = create_test_sessionmaker()
+
+    async def run():
+        async with SessionLocal() as session:
+            assert await DatabaseUtils.bulk_copy(session, CopyItem, []) == 0
+            assert session.in_transaction() is False
+
+            with pytest.raises(ValueError):
+                await DatabaseUtils.bulk_copy(session, CopyItem, [{"name": "a"}], on_conflict="replace")
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Bulk copy argument test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_bulk_copy_with_postgres():
+    """Test COPY loads and ON CONFLICT upserts against Postgres"""
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def rows(count):
+        for i in range(count):
+            yield {"name": f"item-{i}", "created_at": "2025-01-01T00:00:00"}
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(CopyItem.__table__.drop, checkfirst=True)
+            await conn.run_sync(CopyItem.__table__.create)
+
+        try:
+            async with SessionLocal() as session:
+                assert await DatabaseUtils.bulk_copy(session, CopyItem, rows(500)) == 500
+                await session.commit()
+
+            async with SessionLocal() as session:
+                upserts = [{"name": "item-0", "tags": ["a"]}, {"name": "item-new", "tags": ["b"]}]
+                copied = await DatabaseUtils.bulk_copy(
+                    session, CopyItem, upserts, on_conflict="update",
+                    conflict_columns=("name",), update_columns=("tags",)
+                )
+                await session.commit()
+                assert copied == 2
+
+                items = {item.name: item for item in (await session.execute(select(CopyItem))).scalars()}
+                assert len(items) == 501
+                assert items["item-0"].tags == ["a"]
+                assert items["item-1"].tags == []
+        finally:
+            async with engine.begin() as conn:
+                await conn.run_sync(CopyItem.__table__.drop, checkfirst=True)
+            await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres bulk copy test passed")
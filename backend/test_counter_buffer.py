@@ -0,0 +1,131 @@
+"""
+Tests for buffered content counters
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services.counter_buffer import CounterBuffer
+
+
+class FakeSession:
+    """Records per-table updates instead of executing them"""
+
+    def __init__(self, writes, fail):
+        self.writes = writes
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def execute(self, statement, parameters):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        table = str(statement).split()[1]
+        self.writes[table] = parameters
+
+    async def commit(self):
+        pass
+
+
+def test_increments_are_summed_per_row():
+    """Test concurrent increments land in one delta per row"""
+    writes, state = {}, {"fail": False}
+    buffer = CounterBuffer(session_factory=lambda: FakeSession(writes, state["fail"]), shards=4)
+    lesson_id, question_id, set_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    def learner():
+        for _ in range(250):
+            buffer.lesson_viewed(lesson_id)
+            buffer.question_attempted(question_id, is_correct=True, time_taken=4)
+    threads = [threading.Thread(target=learner) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    buffer.lesson_completed(lesson_id)
+    buffer.question_attempted(question_id, is_correct=False, time_taken=24)
+    buffer.question_set_used(set_id)
+
+    assert buffer.pending("lessons", lesson_id) == {"views": 1000, "completions": 1}
+    assert buffer.pending("questions", question_id) == {"attempts": 1001, "correct": 1000, "total_time": 4024}
+
+    assert asyncio.run(buffer.flush()) == 3
+    assert writes["lessons"] == {"ids": [lesson_id], "views": [1000], "completions": [1]}
+    assert writes["question_sets"] == {"ids": [set_id], "uses": [1]}
+    assert writes["questions"]["total_time"] == [4024]
+    assert len(buffer) == 0 and buffer.stats()["flushes"] == 1
+    print("✓ Counter increment test passed")
+
+
+def test_failed_flush_requeues_increments():
+    """Test increments survive a failed flush and add to newer ones"""
+    writes, state = {}, {"fail": True}
+    buffer = CounterBuffer(session_factory=lambda: FakeSession(writes, state["fail"]))
+    lesson_id = uuid.uuid4()
+
+    buffer.lesson_viewed(lesson_id)
+    assert asyncio.run(buffer.flush()) == 0
+    buffer.lesson_viewed(lesson_id)
+    assert buffer.pending("lessons", lesson_id) == {"views": 2, "completions": 0}
+    assert buffer.stats()["failures"] == 1
+
+    state["fail"] = False
+    asyncio.run(buffer.stop())
+    assert writes["lessons"]["views"] == [2]
+    assert buffer.stats()["pending"] == 0
+    print("✓ Counter requeue test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_counter_updates_with_postgres():
+    """Test flushes from separate shards add up and merge the average time"""
+    from app.models.content import Question
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Question.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            question = Question(
+                type="mcq", stem="Choose the correct form", level="A1", skill="grammar", topic="verbs",
+                options=[{"id": "a", "text": "is"}, {"id": "b", "text": "are"}], answer_key={"id": "a"},
+                attempt_count=2, correct_count=1, average_time=10,
+            )
+            session.add(question)
+            await session.commit()
+
+        # Two worker processes, each with its own buffer
+        first, second = CounterBuffer(session_factory=SessionLocal), CounterBuffer(session_factory=SessionLocal)
+        for seconds in (20, 30):
+            first.question_attempted(question.id, is_correct=True, time_taken=seconds)
+        second.question_attempted(question.id, is_correct=False, time_taken=40)
+        await second.flush()
+        await first.flush()
+
+        async with SessionLocal() as session:
+            stored = (await session.execute(select(Question).where(Question.id == question.id))).scalar_one()
+            assert stored.attempt_count == 5
+            assert stored.correct_count == 3
+            # (2 * 10 + 20 + 30 + 40) / 5
+            assert stored.average_time == 22
+            await session.delete(stored)
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres counter update test passed")
@@ -0,0 +1,96 @@
+"""
+Tests for write tracking on request database sessions
+"""
+
+import asyncio
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import TrackedSession, run_after_commit, session_has_writes
+
+metadata = MetaData()
+notes = Table(
+    "notes",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("body", String(50)),
+)
+
+
+def test_session_write_tracking():
+    """Test that only sessions which wrote something need a commit"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    SessionLocal = async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        sync_session_class=TrackedSession,
+        expire_on_commit=False,
+    )
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with SessionLocal() as session:
+            # A fresh session has nothing to commit and holds no connection
+            assert session_has_writes(session) is False
+            assert session.in_transaction() is False
+
+            await session.execute(select(notes))
+            assert session_has_writes(session) is False
+
+            await session.execute(insert(notes).values(body="hello"))
+            assert session_has_writes(session) is True
+
+            await session.commit()
+            assert session_has_writes(session) is False
+
+            await session.execute(text("DELETE FROM notes"))
+            assert session_has_writes(session) is True
+            await session.rollback()
+            assert session_has_writes(session) is False
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Session write tracking test passed")
+
+
+def test_after_commit_callbacks():
+    """Test callbacks run once on commit and are dropped on rollback"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    calls = []
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        async with SessionLocal() as session:
+            await session.execute(insert(notes).values(body="kept"))
+            run_after_commit(session, lambda: calls.append("kept"))
+            assert calls == []
+            await session.commit()
+            assert calls == ["kept"]
+
+            await session.execute(insert(notes).values(body="lost"))
+            run_after_commit(session, lambda: calls.append("lost"))
+            await session.rollback()
+            await session.execute(insert(notes).values(body="later"))
+            await session.commit()
+            assert calls == ["kept"]
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ After-commit callback test passed")
@@ -0,0 +1,85 @@
+"""
+Tests for cursor-based (keyset) pagination in DatabaseUtils
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+from app.core.database_utils import DatabaseUtils, decode_cursor, encode_cursor
+
+TestBase = declarative_base()
+
+
+class Entry(TestBase):
+    __tablename__ = "entries"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(10), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to typed values"""
+    created = datetime(2025, 1, 2, 3, 4, 5)
+    cursor = encode_cursor(created, 42)
+
+    assert decode_cursor(cursor, Entry.created_at, Entry.id) == (created, 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", Entry.created_at, Entry.id)
+    print("✓ Cursor round trip test passed")
+
+
+def test_keyset_pages_cover_all_rows():
+    """Test that following cursors returns every row once, in order"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    base_time = datetime(2025, 1, 1)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(TestBase.metadata.create_all)
+            # Pairs of rows share a timestamp so the id tie-breaker matters
+            await conn.execute(insert(Entry), [
+                {"id": i, "kind": "even" if i % 2 == 0 else "odd",
+                 "created_at": base_time + timedelta(minutes=i // 2)}
+                for i in range(1, 26)
+            ])
+
+        async with SessionLocal() as session:
+            query = select(Entry).where(Entry.kind == "odd")
+            seen, cursor, pages = [], None, 0
+            while True:
+                page = await DatabaseUtils.get_keyset_paginated(
+                    session, query, Entry, cursor=cursor, per_page=5, total="cached"
+                )
+                seen.extend(entry.id for entry in page["items"])
+                assert page["pagination"]["total"] == 13
+                pages += 1
+                cursor = page["pagination"]["next_cursor"]
+                if not page["pagination"]["has_next"]:
+                    assert cursor is None
+                    break
+
+            assert pages == 3
+            assert seen == sorted(range(1, 26, 2), reverse=True)
+
+            ascending = await DatabaseUtils.get_keyset_paginated(
+                session, select(Entry), Entry, descending=False, per_page=3
+            )
+            assert [entry.id for entry in ascending["items"]] == [1, 2, 3]
+            assert ascending["pagination"]["total"] is None
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Keyset pagination test passed")
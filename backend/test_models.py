@@ -234,7 +234,7 @@ async def test_srs_models(user, questions):
                 interval=1,
                 ease_factor=2.5,
                 repetitions=0,
-                next_review_date=(datetime.utcnow() + timedelta(days=1)).isoformat(),
+                next_review_date=(datetime.utcnow() + timedelta(days=1)).date(),
                 total_reviews=0,
                 correct_reviews=0,
                 consecutive_correct=0,
@@ -0,0 +1,204 @@
+"""
+Tests for the monthly question_attempts partitions
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.partitions import (
+    LEGACY, PARENT, STAGING, add_months, partition_ddl, partition_month, partition_months,
+    split_default_ddl, staging_ddl, swap_ddl
+)
+from app.models.progress import QuestionAttempt
+
+
+def test_month_ranges():
+    """Test month arithmetic, UTC bounds and partition names"""
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+
+    # Months follow UTC: this is already January in UTC+7
+    first = datetime(2025, 12, 31, 18, 30, tzinfo=timezone.utc)
+    months = partition_months(first, months_ahead=2, today=date(2026, 2, 14))
+    assert months == [date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1), date(2026, 4, 1)]
+    assert partition_months(None, months_ahead=0, today=date(2026, 2, 14)) == [date(2026, 2, 1)]
+
+    ddl = partition_ddl(date(2025, 12, 1))
+    assert "question_attempts_2025_12 PARTITION OF question_attempts" in ddl
+    assert "FROM ('2025-12-01 00:00:00+00') TO ('2026-01-01 00:00:00+00')" in ddl
+    assert partition_month("question_attempts_2025_12") == date(2025, 12, 1)
+    assert partition_month("question_attempts_default") is None
+    print("✓ Month range test passed")
+
+
+def test_model_is_partitioned():
+    """Test the key includes the partition column and time scans get a BRIN index"""
+    table = QuestionAttempt.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "RANGE (created_at)"
+    assert [column.name for column in table.primary_key.columns] == ["id", "created_at"]
+    indexes = {index.name: index for index in table.indexes}
+    assert indexes["idx_question_attempts_created_brin"].dialect_options["postgresql"]["using"] == "brin"
+    assert "idx_question_attempts_user" not in indexes
+    assert not table.c.id.index
+    print("✓ Partitioned model test passed")
+
+
+def test_staging_and_swap_ddl():
+    """Test the staging table mirrors the model and the swap renames everything back"""
+    statements = staging_ddl([date(2025, 1, 1), date(2025, 2, 1)])
+    joined = "\n".join(statements)
+    assert "PARTITION BY RANGE (created_at)" in statements[0]
+    assert "PRIMARY KEY (id, created_at)" in joined
+    assert joined.count("ON DELETE CASCADE") == 2
+    assert f"question_attempts_2025_02 PARTITION OF {STAGING}" in joined
+    assert f"question_attempts_default PARTITION OF {STAGING} DEFAULT" in joined
+    assert f"idx_question_attempts_created_brin_new ON {STAGING} USING brin (created_at)" in joined
+
+    swap = swap_ddl(["question_attempts_pkey", "idx_question_attempts_user"])
+    order = [statement.strip().split("\n")[0] for statement in swap]
+    assert order.index(f"ALTER TABLE {PARENT} RENAME TO {LEGACY}") < order.index(
+        f"ALTER TABLE {STAGING} RENAME TO {PARENT}"
+    )
+    assert "ALTER INDEX idx_question_attempts_user RENAME TO idx_question_attempts_user_legacy" in order
+    assert f"ALTER INDEX {STAGING}_pkey RENAME TO {PARENT}_pkey" in order
+    renames = "\n".join(order)
+    assert all(f"{index.name}_new RENAME TO {index.name}" in renames for index in QuestionAttempt.__table__.indexes)
+    # The user_stats triggers end up on the new table
+    assert any("AFTER INSERT ON question_attempts" in statement for statement in swap)
+
+    split = split_default_ddl(date(2025, 3, 1))
+    assert split[0].endswith("DETACH PARTITION question_attempts_default")
+    assert split[-1].endswith("ATTACH PARTITION question_attempts_default DEFAULT")
+    print("✓ Staging and swap DDL test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_partition_maintenance_with_postgres():
+    """Test months are split out of the default partition and expired ones leave user_stats"""
+    from app.core.partitions import apply_retention, ensure_partitions, is_partitioned
+    from app.core.user_stats import install_user_stats_triggers
+    from app.models.content import Question
+    from app.models.progress import UserStats
+    from app.models.user import User
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    month = date(2001, 1, 1)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, Question, QuestionAttempt, UserStats):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            if not await is_partitioned(session):
+                pytest.skip("question_attempts exists unpartitioned in this database")
+            await install_user_stats_triggers(session)
+            user = User(email=f"partitions-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Partitions")
+            question = Question(
+                type="mcq", stem="Choose the correct form", level="A1", skill="grammar", topic="verbs",
+                options=[{"id": "a", "text": "is"}], answer_key={"id": "a"},
+            )
+            session.add_all([user, question])
+            await session.flush()
+            # No partition covers 2001 yet, so these land in the default partition
+            session.add_all([
+                QuestionAttempt(user_id=user.id, question_id=question.id, user_answer={}, is_correct=True,
+                                time_taken=10, points_earned=1, max_points=1,
+                                created_at=datetime(2001, 1, day, tzinfo=timezone.utc))
+                for day in (3, 20)
+            ])
+            await session.commit()
+
+            created = await ensure_partitions(session, months_ahead=0, today=month)
+            assert "question_attempts_2001_01" in created
+            count = (await session.execute(text("SELECT count(*) FROM question_attempts_2001_01"))).scalar()
+            assert count == 2
+            stats = (await session.execute(select(UserStats).where(UserStats.user_id == user.id))).scalar_one()
+            assert stats.attempts == 2
+
+            detached = await apply_retention(session, keep_months=2, today=add_months(month, 3))
+            assert detached == ["question_attempts_2001_01"]
+            await session.refresh(stats)
+            assert stats.attempts == 0 and stats.attempt_time_sum == 0
+            assert not (await session.execute(text("SELECT to_regclass('question_attempts_2001_01')"))).scalar()
+
+            await session.execute(delete(User).where(User.id == user.id))
+            await session.execute(delete(Question).where(Question.id == question.id))
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres partition maintenance test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_bulk_copy_upsert_into_partitions_with_postgres():
+    """Test COPY upserts into question_attempts conflict on its (id, created_at) key"""
+    from app.core.database_utils import DatabaseUtils
+    from app.core.partitions import is_partitioned
+    from app.models.content import Question
+    from app.models.progress import UserStats
+    from app.models.user import User
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, Question, QuestionAttempt, UserStats):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            if not await is_partitioned(session):
+                pytest.skip("question_attempts exists unpartitioned in this database")
+            user = User(email=f"copy-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Copy")
+            question = Question(
+                type="mcq", stem="Choose the correct form", level="A1", skill="grammar", topic="verbs",
+                options=[{"id": "a", "text": "is"}], answer_key={"id": "a"},
+            )
+            session.add_all([user, question])
+            await session.commit()
+
+            attempt_ids = [str(uuid.uuid4()) for _ in range(3)]
+
+            def rows(is_correct):
+                # As read by `manage_db.py import-jsonl`
+                return [
+                    {"id": attempt_id, "user_id": str(user.id), "question_id": str(question.id),
+                     "user_answer": {"id": "a"}, "is_correct": is_correct, "time_taken": 10,
+                     "points_earned": int(is_correct), "max_points": 1,
+                     "created_at": f"2002-0{month}-15T08:00:00+00:00"}
+                    for month, attempt_id in enumerate(attempt_ids, start=1)
+                ]
+
+            copied = await DatabaseUtils.bulk_copy(session, QuestionAttempt, rows(False), on_conflict="nothing")
+            assert copied == 3
+            await session.commit()
+            copied = await DatabaseUtils.bulk_copy(session, QuestionAttempt, rows(True), on_conflict="update")
+            assert copied == 3
+            await session.commit()
+
+            attempts = (await session.execute(
+                select(QuestionAttempt).where(QuestionAttempt.user_id == user.id)
+            )).scalars().all()
+            assert sorted(str(attempt.id) for attempt in attempts) == sorted(attempt_ids)
+            assert all(attempt.is_correct and attempt.points_earned == 1 for attempt in attempts)
+
+            await session.execute(delete(User).where(User.id == user.id))
+            await session.execute(delete(Question).where(Question.id == question.id))
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres partitioned bulk copy test passed")
@@ -0,0 +1,97 @@
+"""
+Tests for the token-bucket rate limiting middleware
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import (
+    InMemoryTokenBucketBackend, RateLimitMiddleware, RateLimitRule
+)
+from app.core.security import create_access_token
+
+
+def create_test_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=InMemoryTokenBucketBackend(),
+        default_rule=RateLimitRule(per_minute=60, burst=3),
+        route_rules={"/auth/login": RateLimitRule(per_minute=5, burst=1)},
+        exempt_paths=["/health"],
+    )
+
+    @app.get("/items")
+    async def items():
+        return {"ok": True}
+
+    @app.post("/auth/login")
+    async def login():
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+
+def test_default_bucket_limits_requests():
+    """Test that requests beyond the burst are rejected with 429"""
+    client = TestClient(create_test_app())
+
+    statuses = [client.get("/items").status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+
+    response = client.get("/items")
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    print("✓ Default bucket test passed")
+
+
+def test_route_override_and_exempt_paths():
+    """Test stricter per-route limits and exempt paths"""
+    client = TestClient(create_test_app())
+
+    assert client.post("/auth/login").status_code == 200
+    assert client.post("/auth/login").status_code == 429
+
+    # Route buckets are separate from the default bucket
+    assert client.get("/items").status_code == 200
+    assert all(client.get("/health").status_code == 200 for _ in range(10))
+    print("✓ Route override test passed")
+
+
+def test_authenticated_users_get_own_bucket():
+    """Test that valid bearer tokens are limited per user, not per IP"""
+    client = TestClient(create_test_app())
+    alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'sub': 'bob'})}"}
+
+    assert [client.get("/items", headers=alice).status_code for _ in range(4)][-1] == 429
+    assert client.get("/items", headers=bob).status_code == 200
+    assert client.get("/items").status_code == 200
+    print("✓ Per-user bucket test passed")
+
+
+def test_in_memory_bucket_refills(monkeypatch):
+    """Test that tokens refill at the configured rate"""
+    now = [100.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+    backend = InMemoryTokenBucketBackend()
+    rule = RateLimitRule(per_minute=60, burst=1)
+
+    async def run():
+        assert (await backend.consume("k", rule))[0] is True
+        allowed, retry_after = await backend.consume("k", rule)
+        assert allowed is False
+        assert retry_after == 1.0
+
+        now[0] += 1.0
+        assert (await backend.consume("k", rule))[0] is True
+
+    asyncio.run(run())
+    print("✓ Bucket refill test passed")
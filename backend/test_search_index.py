@@ -0,0 +1,260 @@
+"""
+Tests for the in-memory search index and search service
+"""
+
+import asyncio
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import search as search_api
+from app.models.content import Question
+from app.services.search_index import InvertedIndex, SearchDocument, tokenize
+from app.services.search_service import SearchService, content_change, search_service
+from app.services.spelling import SymSpell, edit_distance
+
+
+def make_document(key, stem, level="A1", skill="grammar", type="mcq", tags=""):
+    return SearchDocument(
+        key=f"question:{key}",
+        fields={"stem": stem, "tags": tags},
+        facets={"kind": "question", "level": level, "skill": skill, "type": type},
+        meta={"kind": "question", "id": key, "title": stem},
+    )
+
+
+def build_index():
+    index = InvertedIndex()
+    index.add_many([
+        make_document("1", "Present perfect with since and for", level="A2"),
+        make_document("2", "Past simple of irregular verbs", tags="present perfect"),
+        make_document("3", "Perfect pronunciation drills", skill="speaking", type="short_answer"),
+        make_document("4", "Articles before countable nouns"),
+    ])
+    return index
+
+
+def test_tokenize():
+    """Test term extraction"""
+    assert tokenize("The Present-Perfect isn't HARD!") == ["present", "perfect", "isn't", "hard"]
+    print("✓ Tokenizer test passed")
+
+
+def test_bm25_ranking_and_filters():
+    """Test ranking, field weighting and bitset filters"""
+    index = build_index()
+
+    results = index.search("present perfect")
+    assert results.total == 3
+    # Both terms in the stem beat both terms in tags, which beat one term in the stem
+    assert [hit.key for hit in results.hits] == ["question:1", "question:2", "question:3"]
+
+    assert [hit.key for hit in index.search("perfect", filters={"level": ["A2"]}).hits] == ["question:1"]
+    assert index.search("perfect", filters={"skill": "speaking", "type": ["mcq"]}).total == 0
+    assert index.search("perfect", filters={"level": ["B2"]}).total == 0
+    assert index.search("present perfect", limit=1, offset=1).hits[0].key == "question:2"
+    assert index.search("the").total == 0
+    print("✓ BM25 ranking test passed")
+
+
+def test_incremental_updates_and_compaction():
+    """Test replacing and removing documents, then compacting"""
+    index = build_index()
+
+    index.add(make_document("4", "Present continuous for plans"))
+    assert len(index) == 4
+    assert index.search("articles").total == 0
+    assert index.search("continuous").hits[0].key == "question:4"
+
+    assert index.remove("question:1") is True
+    assert index.remove("question:1") is False
+    assert "question:1" not in [hit.key for hit in index.search("perfect").hits]
+    assert index.search("perfect", filters={"level": ["A2"]}).total == 0
+
+    index.compact()
+    assert len(index.doc_keys) == 3
+    assert {hit.key for hit in index.search("perfect").hits} == {"question:2", "question:3"}
+    assert index.search("continuous", filters={"level": "A1"}).hits[0].key == "question:4"
+    print("✓ Incremental update test passed")
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test saving and restoring an index snapshot"""
+    index = build_index()
+    index.remove("question:4")
+    path = str(tmp_path / "search.pkl")
+    index.save(path)
+
+    restored = InvertedIndex.load(path)
+    assert len(restored) == 3
+    for query, filters in [("present perfect", None), ("perfect", {"skill": ["speaking"]})]:
+        expected = [(hit.key, round(hit.score, 6)) for hit in index.search(query, filters).hits]
+        actual = [(hit.key, round(hit.score, 6)) for hit in restored.search(query, filters).hits]
+        assert actual == expected
+
+    restored.add(make_document("5", "More perfect practice"))
+    assert restored.search("practice").total == 1
+    print("✓ Snapshot round trip test passed")
+
+
+def test_service_applies_committed_changes():
+    """Test that content changes reach the index, queued until it is ready"""
+    service = SearchService()
+    question = Question(
+        id=uuid.uuid4(), stem="Choose the modal verb", type="mcq", level="B1",
+        skill="grammar", topic="modals", tags=["can"], status="published",
+    )
+
+    service.apply_changes([content_change(question)])
+    assert len(service.index) == 0  # queued while loading
+
+    service.ready = True
+    service.apply_changes(service._pending)
+    assert service.search("modal").hits[0].meta["id"] == str(question.id)
+
+    question.status = "archived"
+    service.apply_changes([content_change(question)])
+    assert service.search("modal").total == 0
+    print("✓ Search service change test passed")
+
+
+def test_service_retries_failed_load(monkeypatch):
+    """Test that a failed initial load is retried with backoff until it succeeds"""
+    service = SearchService(refresh_interval=60, retry_delay=0.01, max_retry_delay=0.02)
+    attempts = []
+
+    async def load():
+        attempts.append(len(attempts))
+        if len(attempts) < 3:
+            raise ConnectionError("database unavailable")
+        service.ready = True
+
+    monkeypatch.setattr(service, "load", load)
+
+    async def run():
+        await service.start()
+        for _ in range(100):
+            if service.ready:
+                break
+            await asyncio.sleep(0.01)
+        await service.stop()
+
+    asyncio.run(run())
+    assert service.ready and len(attempts) == 3
+    print("✓ Search load retry test passed")
+
+
+def test_search_endpoint(monkeypatch):
+    """Test the search API, including the warming-up response"""
+    app = FastAPI()
+    app.include_router(search_api.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(search_service, "ready", False)
+    response = client.get("/search", params={"q": "perfect"})
+    assert response.status_code == 503
+
+    monkeypatch.setattr(search_service, "index", build_index())
+    monkeypatch.setattr(search_service, "ready", True)
+    response = client.get("/search", params=[("q", "perfect"), ("level", "A1"), ("level", "A2")])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["results"][0]["id"] == "1"
+    print("✓ Search endpoint test passed")
+
+
+def test_facet_counts():
+    """Test disjunctive facet counts, with and without a query"""
+    index = build_index()
+
+    counts = index.facet_counts()
+    assert counts.total == 4
+    assert counts.facets["level"] == {"A1": 3, "A2": 1}
+    assert counts.facets["type"] == {"mcq": 3, "short_answer": 1}
+
+    counts = index.facet_counts(filters={"level": ["A1"], "skill": ["grammar"]})
+    assert counts.total == 2
+    # The level facet ignores the level filter but applies the skill filter
+    assert counts.facets["level"] == {"A1": 2, "A2": 1}
+    assert counts.facets["skill"] == {"grammar": 2, "speaking": 1}
+
+    counts = index.facet_counts(query="perfect")
+    assert counts.total == 3
+    assert counts.facets["skill"] == {"grammar": 2, "speaking": 1}
+
+    # Content leaving or entering the published set updates counts immediately
+    index.remove("question:3")
+    index.add(make_document("6", "Relative clauses", level="B1"))
+    counts = index.facet_counts()
+    assert counts.facets["level"] == {"A1": 2, "A2": 1, "B1": 1}
+    assert "speaking" not in counts.facets["skill"]
+    print("✓ Facet count test passed")
+
+
+def test_facets_endpoint(monkeypatch):
+    """Test the facet counts API"""
+    app = FastAPI()
+    app.include_router(search_api.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(search_service, "index", build_index())
+    monkeypatch.setattr(search_service, "ready", True)
+    response = client.get("/search/facets", params=[("skill", "grammar"), ("type", "mcq")])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 3
+    assert body["facets"]["level"] == {"A1": 2, "A2": 1}
+    assert body["facets"]["skill"] == {"grammar": 3}
+    print("✓ Facets endpoint test passed")
+
+
+def test_symmetric_delete_lookup():
+    """Test bounded edit distance and candidate lookup"""
+    assert edit_distance("grammer", "grammar", 2) == 1
+    assert edit_distance("recieve", "receive", 2) == 1  # transposition
+    assert edit_distance("vocabullary", "vocabulary", 2) == 1
+    assert edit_distance("cat", "elephant", 2) == 3
+
+    speller = SymSpell()
+    speller.add_many(["grammar", "grammars", "glamour", "vocabulary", "vocal", "perfect"])
+    assert speller.lookup("grammer", 1) == [("grammar", 1)]
+    assert speller.lookup("vocabullary", 2) == [("vocabulary", 1)]
+    assert speller.lookup("gramar", 2)[:2] == [("grammar", 1), ("grammars", 2)]
+    assert speller.lookup("perfect", 2) == [("perfect", 0)]
+    assert speller.lookup("xyz", 2) == []
+    print("✓ Symmetric delete lookup test passed")
+
+
+def test_fuzzy_search_merges_with_exact_matches():
+    """Test that misspelled queries find content, ranked below exact matches"""
+    index = InvertedIndex()
+    index.add_many([
+        make_document("1", "Grammar drills for conditionals"),
+        make_document("2", "Vocabulary for travel"),
+        make_document("3", "Grammer mistakes learners make"),  # misspelling in content
+    ])
+
+    results = index.search("vocabullary")
+    assert [hit.key for hit in results.hits] == ["question:2"]
+    assert results.corrections == {"vocabullary": "vocabulary"}
+
+    # "grammer" exists in the vocabulary, so it matches exactly and no
+    # correction is applied
+    results = index.search("grammer")
+    assert [hit.key for hit in results.hits] == ["question:3"]
+    assert results.corrections == {}
+
+    # An exact term outranks a corrected one
+    results = index.search("gramar travel")
+    assert results.hits[0].key == "question:2"
+    assert [hit.key for hit in results.hits] == ["question:2", "question:1"]
+
+    assert index.search("vocabullary", fuzzy=False).total == 0
+    assert index.facet_counts(query="vocabullary").total == 1
+
+    # Terms added incrementally are correctable straight away
+    index.add(make_document("4", "Pronunciation practice"))
+    assert index.search("pronounciation").hits[0].key == "question:4"
+    print("✓ Fuzzy search test passed")
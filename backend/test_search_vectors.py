@@ -0,0 +1,91 @@
+"""
+Tests for stored, trigger-maintained full-text search vectors
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database_utils import DatabaseUtils
+from app.core.search_vectors import backfill_search_vectors, install_search_triggers, search_vector_sql
+from app.models.content import Question
+from app.models.progress import QuestionAttempt
+
+
+def compile_sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_search_query_uses_stored_vector():
+    """Test that searches on lessons/questions match the indexed column"""
+    sql = compile_sql(DatabaseUtils.build_full_text_query(Question, "present perfect", ["stem"]))
+
+    assert "questions.search_vector @@ plainto_tsquery" in sql
+    assert "to_tsvector" not in sql
+
+    # Models without a stored vector still compute one from the given fields
+    sql = compile_sql(DatabaseUtils.build_full_text_query(QuestionAttempt, "lesson", ["context_type"]))
+    assert "to_tsvector" in sql
+    print("✓ Search query test passed")
+
+
+def test_search_vector_weights():
+    """Test the weighted vector expression ordering"""
+    sql = search_vector_sql("questions", "NEW.")
+
+    assert sql.index("NEW.stem") < sql.index("NEW.tags") < sql.index("NEW.explanation")
+    assert "'A')" in sql and "'B')" in sql and "'C')" in sql
+    with pytest.raises(KeyError):
+        search_vector_sql("users")
+    print("✓ Search vector weight test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_search_triggers_with_postgres():
+    """Test trigger maintenance, backfill and ranking against Postgres"""
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def question(stem, tags, explanation):
+        return Question(
+            stem=stem, type="mcq", answer_key={"answer": "a"}, explanation=explanation,
+            level="A2", skill="grammar", topic="tenses", tags=tags,
+        )
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Question.__table__.create, checkfirst=True)
+
+        try:
+            async with SessionLocal() as session:
+                await install_search_triggers(session)
+                session.add_all([
+                    question("Choose the present perfect form", [], "Use have + past participle"),
+                    question("Pick the right article", ["perfect"], "Articles before nouns"),
+                    question("Fill the gap", [], "Like the present perfect"),
+                ])
+                await session.commit()
+
+                results = await DatabaseUtils.search_full_text(session, Question, "perfect", ["stem"])
+                # Stem matches outrank tag matches, which outrank explanation matches
+                assert [q.stem for q in results] == [
+                    "Choose the present perfect form", "Pick the right article", "Fill the gap"
+                ]
+
+                await session.execute(text("UPDATE questions SET search_vector = NULL"))
+                await session.commit()
+                assert await backfill_search_vectors(session, "questions", batch_size=2) == 3
+                assert await backfill_search_vectors(session, "questions") == 0
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(text("DELETE FROM questions WHERE topic = 'tenses'"))
+            await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres search trigger test passed")
@@ -0,0 +1,233 @@
+"""
+Tests for the vectorized SM-2 engine and set-based SRS persistence
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import Column, Integer, Numeric, String, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import StaticPool
+
+from app.core.database_utils import DatabaseUtils
+from app.services.srs_engine import CardStates, SM2Parameters, reschedule, review
+
+TestBase = declarative_base()
+
+
+class Card(TestBase):
+    __tablename__ = "srs_test_cards"
+
+    id = Column(Integer, primary_key=True)
+    interval = Column(Integer, nullable=False)
+    ease_factor = Column(Numeric(4, 2), nullable=False)
+    next_review_date = Column(String, nullable=False)
+
+
+def new_states(count, **overrides):
+    columns = {name: np.zeros(count, dtype=np.int32) for name in CardStates.COLUMNS}
+    columns["interval"] = np.ones(count, dtype=np.int32)
+    columns["ease_factor"] = np.full(count, 2.5)
+    columns.update(overrides)
+    return CardStates(**columns)
+
+
+def reference_review(card, quality, parameters=SM2Parameters()):
+    """Straightforward per-card SM-2, used to check the vectorized version"""
+    interval, ease, repetitions = card
+    miss = 5 - quality
+    ease = round(min(max(ease + 0.1 - miss * (0.08 + miss * 0.02), parameters.min_ease), parameters.max_ease), 2)
+    if quality < parameters.pass_grade:
+        return parameters.lapse_interval, ease, 0
+    repetitions += 1
+    if repetitions == 1:
+        interval = parameters.first_interval
+    elif repetitions == 2:
+        interval = parameters.second_interval
+    else:
+        interval = int(np.rint(interval * ease))
+    return min(max(interval, 1), parameters.max_interval), ease, repetitions
+
+
+def test_sm2_sequence():
+    """Test the classic SM-2 progression, lapses and ease bounds"""
+    today = date(2025, 3, 1)
+    states = new_states(1)
+
+    intervals = []
+    for quality in (4, 4, 4, 5, 1):
+        result = review(states, np.array([quality]), today)
+        states = result.states
+        intervals.append(int(states.interval[0]))
+
+    assert intervals == [1, 6, 15, 39, 1]
+    assert states.repetitions[0] == 0
+    assert states.ease_factor[0] == pytest.approx(2.6 - 0.54)
+    assert states.total_reviews[0] == 5
+    assert states.correct_reviews[0] == 4
+    assert states.consecutive_correct[0] == 0
+    assert result.next_review[0] == np.datetime64("2025-03-02")
+    assert result.next_review_dates().tolist() == ["2025-03-02"]
+    assert bool(result.is_learning[0]) is True
+
+    low = review(new_states(1, ease_factor=np.array([1.35])), np.array([0]), today)
+    assert low.states.ease_factor[0] == 1.3
+
+    with pytest.raises(ValueError):
+        review(new_states(2), np.array([3]), today)
+    with pytest.raises(ValueError):
+        review(new_states(1), np.array([6]), today)
+    print("✓ SM-2 sequence test passed")
+
+
+def test_vectorized_matches_reference():
+    """Test a large random batch against the per-card reference"""
+    rng = random.Random(1)
+    count = 5000
+    cards = [(rng.randint(1, 200), round(rng.uniform(1.3, 3.5), 2), rng.randint(0, 8)) for _ in range(count)]
+    qualities = [rng.randint(0, 5) for _ in range(count)]
+    states = new_states(
+        count,
+        interval=np.array([c[0] for c in cards], dtype=np.int32),
+        ease_factor=np.array([c[1] for c in cards]),
+        repetitions=np.array([c[2] for c in cards], dtype=np.int32),
+        total_reviews=np.full(count, 10, dtype=np.int32),
+        average_response_time=np.full(count, 1000, dtype=np.int32),
+    )
+
+    result = review(states, np.array(qualities), date(2025, 1, 1), response_time_ms=np.full(count, 2100))
+    for i in range(0, count, 97):
+        expected = reference_review(cards[i], qualities[i])
+        assert (int(result.states.interval[i]), float(result.states.ease_factor[i]), int(result.states.repetitions[i])) == \
+            pytest.approx(expected)
+    assert set(result.states.average_response_time.tolist()) == {1100}
+    print("✓ Vectorized SM-2 test passed")
+
+
+def test_missing_response_time_keeps_average():
+    """Test a card reviewed without a time keeps its average while the others update"""
+    states = new_states(
+        3,
+        total_reviews=np.full(3, 3, dtype=np.int32),
+        average_response_time=np.full(3, 1000, dtype=np.int32),
+    )
+    result = review(
+        states, np.array([4, 4, 4]), date(2025, 1, 1), response_time_ms=np.array([2000, np.nan, 0])
+    )
+    assert result.states.average_response_time.tolist() == [1250, 1000, 750]
+    assert result.states.total_reviews.tolist() == [4, 4, 4]
+    print("✓ Missing response time test passed")
+
+
+def test_reschedule_caps_intervals():
+    """Test the nightly recomputation of due dates"""
+    intervals, next_review = reschedule(
+        np.array([3, 900]),
+        np.array(["2025-01-01", None], dtype="datetime64[D]"),
+        date(2025, 2, 1),
+        SM2Parameters(max_interval=365),
+    )
+    assert intervals.tolist() == [3, 365]
+    assert next_review.tolist() == [date(2025, 1, 4), date(2025, 2, 1)]
+    print("✓ Reschedule test passed")
+
+
+def test_bulk_update_columns():
+    """Test updating rows from column arrays"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(TestBase.metadata.create_all)
+            await conn.execute(insert(Card), [
+                {"id": i, "interval": 1, "ease_factor": 2.5, "next_review_date": "2025-01-01"} for i in range(1, 6)
+            ])
+
+        async with SessionLocal() as session:
+            await DatabaseUtils.bulk_update_columns(
+                session, Card, np.array([2, 4]),
+                {"interval": np.array([10, 20], dtype=np.int32), "ease_factor": np.array([2.6, 1.3])},
+                constants={"next_review_date": "2025-02-01"},
+            )
+            await session.commit()
+            rows = (await session.execute(select(Card).order_by(Card.id))).scalars().all()
+            assert [row.interval for row in rows] == [1, 10, 1, 20, 1]
+            assert [float(row.ease_factor) for row in rows] == [2.5, 2.6, 2.5, 1.3, 2.5]
+            assert [row.next_review_date for row in rows].count("2025-02-01") == 2
+
+            with pytest.raises(ValueError):
+                await DatabaseUtils.bulk_update_columns(session, Card, [1, 2], {"interval": [1]})
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Bulk column update test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_review_cards_with_postgres():
+    """Test SRSService.review_cards end to end against Postgres"""
+    from app.models.srs import SRSCard, SRSQueueSize
+    from app.models.user import User
+    from app.services.srs_service import SRSService
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    today = date(2025, 3, 1)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(User.__table__.create, checkfirst=True)
+            await conn.run_sync(SRSCard.__table__.create, checkfirst=True)
+            await conn.run_sync(SRSQueueSize.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            user = User(email=f"srs-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="SRS Test")
+            session.add(user)
+            await session.flush()
+            cards = [
+                SRSCard(user_id=user.id, item_type="concept", item_id=uuid.uuid4(),
+                        next_review_date=today, repetitions=2, interval=6)
+                for _ in range(3)
+            ]
+            session.add_all(cards)
+            await session.commit()
+
+            try:
+                results = await SRSService(session).review_cards(
+                    user.id, [(cards[0].id, 5, 1200), (cards[1].id, 3, 800), (cards[2].id, 1, 3000)], today=today
+                )
+                await session.commit()
+                assert [r["interval"] for r in results] == [16, 14, 1]
+                assert results[0]["next_review_date"] == today + timedelta(days=16)
+
+                stored = {
+                    card.id: card for card in (await session.execute(
+                        select(SRSCard).where(SRSCard.user_id == user.id).execution_options(populate_existing=True)
+                    )).scalars()
+                }
+                assert stored[cards[0].id].next_review_date == today + timedelta(days=16)
+                assert float(stored[cards[1].id].ease_factor) == 2.36
+                assert stored[cards[2].id].repetitions == 0
+                assert stored[cards[2].id].last_reviewed_date == today
+            finally:
+                await session.delete(user)
+                await session.commit()
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres SRS review test passed")
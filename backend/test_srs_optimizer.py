@@ -0,0 +1,184 @@
+"""
+Tests for the offline SRS parameter optimizer
+"""
+
+import asyncio
+import math
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.services.srs_optimizer import (
+    MIN_REVIEWS, PRIOR_GROWTH, ReviewChunkBuilder, fit_chunk, fit_users, recall_observations
+)
+from app.services.srs_service import SRSOptimizerJob
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def simulated_history(rng, initial_stability, growth, questions=40, repeats=6):
+    """(question, time, correct) attempts of a learner with known parameters"""
+    attempts = []
+    for question in range(questions):
+        at, successes = START + timedelta(days=question / 10), 0
+        attempts.append((question, at, True))
+        for _ in range(repeats):
+            stability = initial_stability * growth ** successes
+            wait = stability * rng.uniform(0.1, 0.6)
+            at += timedelta(days=wait)
+            recalled = bool(rng.random() < math.exp(-wait / stability))
+            attempts.append((question, at, recalled))
+            successes += recalled
+    return attempts
+
+
+def test_recall_observations():
+    """Test elapsed days, prior successes and dropped attempts"""
+    builder = ReviewChunkBuilder()
+    user, question, other = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    for question_id, days, correct in [
+        (question, 0, True), (question, 2, True), (question, 5, False), (question, 9, True),
+        (question, 9.01, True),  # retried within the hour: dropped
+        (other, 1, False),  # first attempt only: dropped
+    ]:
+        builder.add(user, question_id, correct, START + timedelta(days=days))
+    users, elapsed, prior_correct, recalled = recall_observations(builder.finish())
+
+    assert users.tolist() == [0, 0, 0]
+    assert elapsed.round(6).tolist() == [2, 3, 4]
+    assert prior_correct.tolist() == [1, 2, 2]
+    assert recalled.tolist() == [True, False, True]
+    print("✓ Recall observations test passed")
+
+
+def test_chunk_builder_keeps_users_whole():
+    """Test that chunks close only at user boundaries"""
+    builder = ReviewChunkBuilder(chunk_rows=3)
+    users = sorted(uuid.uuid4() for _ in range(3))
+    chunks = []
+    for user, count in zip(users, (2, 4, 1)):
+        for i in range(count):
+            chunk = builder.add(user, uuid.uuid4(), True, START + timedelta(days=i))
+            if chunk is not None:
+                chunks.append(chunk)
+    chunks.append(builder.finish())
+
+    assert [len(chunk) for chunk in chunks] == [6, 1]
+    assert chunks[0].user_ids == [str(users[0]), str(users[1])]
+    assert builder.finish() is None
+    print("✓ Chunk builder test passed")
+
+
+def test_fit_recovers_parameters():
+    """Test that fitted growth separates learners and sparse users stay at the prior"""
+    rng = np.random.default_rng(3)
+    builder = ReviewChunkBuilder()
+    learners = sorted(uuid.uuid4() for _ in range(3))
+    histories = {
+        learners[0]: simulated_history(rng, 4.0, 1.6),
+        learners[1]: simulated_history(rng, 4.0, 3.5),
+        learners[2]: simulated_history(rng, 4.0, 2.5, questions=2, repeats=3),
+    }
+    for user in learners:
+        for question, at, correct in histories[user]:
+            builder.add(user, uuid.UUID(int=question), correct, at)
+    chunk = builder.finish()
+
+    fits = {fit.user_id: fit for fit in fit_chunk(chunk)}
+    slow, fast = fits[str(learners[0])], fits[str(learners[1])]
+    assert str(learners[2]) not in fits  # fewer than MIN_REVIEWS observations
+    assert slow.review_count >= MIN_REVIEWS
+    assert slow.stability_growth < 2.2 < fast.stability_growth
+    assert 1.3 <= slow.ease_factor < fast.ease_factor <= 5.0
+    assert 0 < slow.log_loss < 1
+
+    # Without observations the prior is returned unchanged
+    log_initial, log_growth, counts, _ = fit_users(
+        np.empty(0, dtype=np.int32), np.empty(0), np.empty(0), np.empty(0, dtype=bool), 1
+    )
+    assert counts.tolist() == [0]
+    assert math.exp(log_growth[0]) == pytest.approx(PRIOR_GROWTH)
+    print("✓ Parameter recovery test passed")
+
+
+def test_checkpoint_round_trip(tmp_path):
+    """Test that a checkpoint restores the resume position and counters"""
+    path = str(tmp_path / "checkpoint.json")
+    job = SRSOptimizerJob(None, checkpoint_path=path, workers=1)
+    assert job.load_checkpoint() is None
+
+    user_id = uuid.uuid4()
+    job.stats.update(chunks=2, reviews=500, users_fitted=7)
+    job.save_checkpoint(str(user_id))
+
+    resumed = SRSOptimizerJob(None, checkpoint_path=path, workers=1)
+    assert resumed.load_checkpoint() == user_id
+    assert resumed.stats == {"chunks": 2, "reviews": 500, "users_fitted": 7}
+    assert not os.path.exists(path + ".tmp")
+    print("✓ Checkpoint test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_optimizer_job_with_postgres(tmp_path):
+    """Test a full run writing parameters and updating unreviewed cards"""
+    from app.models.content import Question
+    from app.models.progress import QuestionAttempt
+    from app.models.srs import SRSCard, SRSUserParameters
+    from app.models.user import User
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, Question, QuestionAttempt, SRSCard, SRSUserParameters):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            user = User(email=f"fit-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Fit Test")
+            questions = [
+                Question(type="mcq", stem=f"Question {i}", level="A1", skill="grammar", topic="verbs",
+                         answer_key={"id": "a"}, status="published")
+                for i in range(40)
+            ]
+            session.add(user)
+            session.add_all(questions)
+            await session.flush()
+            for question, at, correct in simulated_history(np.random.default_rng(5), 4.0, 3.5):
+                session.add(QuestionAttempt(
+                    user_id=user.id, question_id=questions[question].id, user_answer={}, is_correct=correct,
+                    time_taken=5, context_type="practice", points_earned=int(correct), created_at=at,
+                ))
+            new_card = SRSCard(user_id=user.id, item_type="concept", item_id=uuid.uuid4(), next_review_date=START.date())
+            session.add(new_card)
+            await session.commit()
+
+            try:
+                job = SRSOptimizerJob(SessionLocal, checkpoint_path=str(tmp_path / "checkpoint.json"), workers=2)
+                stats = await job.run(restart=True)
+                assert stats["users_fitted"] >= 1
+                assert not os.path.exists(tmp_path / "checkpoint.json")
+
+                fitted = await session.scalar(select(SRSUserParameters).where(SRSUserParameters.user_id == user.id))
+                assert float(fitted.ease_factor) > 2.5
+                card_ease = await session.scalar(
+                    select(SRSCard.ease_factor).where(SRSCard.id == new_card.id).execution_options(populate_existing=True)
+                )
+                assert card_ease == fitted.ease_factor
+            finally:
+                await session.delete(user)
+                for question in questions:
+                    await session.delete(question)
+                await session.commit()
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres optimizer job test passed")
@@ -0,0 +1,111 @@
+"""
+Tests for the SRS due queue and precomputed queue sizes
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.srs import SRSCard, SRSQueueSize
+from app.services.srs_service import QUEUE_COLUMNS, SRSService, _in_review_queue
+
+
+def test_queue_query_is_covered_by_index():
+    """Test that the due-queue query only needs idx_srs_cards_review_queue"""
+    index = next(i for i in SRSCard.__table__.indexes if i.name == "idx_srs_cards_review_queue")
+    covered = {column.name for column in index.columns} | set(index.dialect_options["postgresql"]["include"])
+    assert {column.key for column in QUEUE_COLUMNS} <= covered
+
+    # The query repeats the partial index predicate, so the planner can use it
+    query = select(*QUEUE_COLUMNS).where(*_in_review_queue(uuid.uuid4(), date(2025, 3, 1)))
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    predicate = str(index.dialect_options["postgresql"]["where"])
+    for condition in predicate.split(" AND "):
+        assert f"{condition.replace('NOT ', 'NOT srs_cards.')}" in sql
+    assert "next_review_date <=" in sql
+    print("✓ Queue index coverage test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_due_queue_with_postgres():
+    """Test due-queue ordering, filtering and tomorrow's queue sizes"""
+    from app.models.user import User
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    today = date(2025, 3, 1)
+    tomorrow = today + timedelta(days=1)
+
+    async def run():
+        async with engine.begin() as conn:
+            for table in (User.__table__, SRSCard.__table__, SRSQueueSize.__table__):
+                await conn.run_sync(table.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            user = User(email=f"queue-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Queue Test")
+            session.add(user)
+            await session.flush()
+
+            def card(days, **state):
+                return SRSCard(user_id=user.id, item_type="concept", item_id=uuid.uuid4(),
+                               next_review_date=today + timedelta(days=days), **state)
+
+            overdue, due, due_tomorrow, later = card(-3), card(0, is_learning=False), card(1), card(5)
+            suspended, buried = card(-1, is_suspended=True), card(-1, is_buried=True)
+            session.add_all([overdue, due, due_tomorrow, later, suspended, buried])
+            await session.commit()
+
+            try:
+                service = SRSService(session)
+                due_count, cards = await service.due_queue(user.id, limit=10, today=today)
+                assert due_count == 2
+                assert [row.id for row in cards] == [overdue.id, due.id]
+
+                due_count, cards = await service.due_queue(user.id, limit=1, today=today)
+                assert due_count == 2 and len(cards) == 1
+
+                # Not computed yet: counted live, buried cards included
+                size = await service.queue_size(user.id, tomorrow)
+                assert size["precomputed"] is False
+                assert (size["due_count"], size["learning_count"]) == (4, 3)
+
+                await service.refresh_queue_sizes(tomorrow)
+                await session.commit()
+                size = await service.queue_size(user.id, tomorrow)
+                assert size["precomputed"] is True and size["due_count"] == 4
+
+                # Reviewing refreshes the user's precomputed size
+                await service.review_cards(user.id, [(overdue.id, 5, None)], today=today)
+                await session.commit()
+                size = await service.queue_size(user.id, tomorrow)
+                assert size["precomputed"] is True
+                assert size["due_count"] == 4  # overdue card is now due tomorrow
+
+                # Past days are purged by the nightly job
+                await service.refresh_queue_sizes(today, user_ids=[user.id])
+                assert await service.purge_queue_sizes(before=tomorrow) >= 1
+                assert (await service.queue_size(user.id, today))["precomputed"] is False
+                await session.commit()
+
+                # Refreshing again updates in place; users left with nothing due lose their row
+                await service.refresh_queue_sizes(tomorrow)
+                await session.execute(update(SRSCard).where(SRSCard.user_id == user.id).values(is_suspended=True))
+                await service.refresh_queue_sizes(tomorrow, user_ids=[user.id])
+                await session.commit()
+                assert (await service.queue_size(user.id, tomorrow))["precomputed"] is False
+            finally:
+                await session.delete(user)
+                await session.commit()
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres due queue test passed")
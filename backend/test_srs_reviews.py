@@ -0,0 +1,131 @@
+"""
+Tests for idempotent SRS review batch submission
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.schemas.srs import ReviewBatchRequest, ReviewBatchResponse
+
+
+def test_review_batch_validation():
+    """Test grade, response time and batch size limits"""
+    card_id = uuid.uuid4()
+    batch = ReviewBatchRequest(
+        batch_id=uuid.uuid4(),
+        reviews=[{"card_id": card_id, "grade": 4, "response_time_ms": 2300}]
+    )
+    assert batch.reviews[0].card_id == card_id
+
+    for review in (
+        {"card_id": card_id, "grade": 6, "response_time_ms": 100},
+        {"card_id": card_id, "grade": 3, "response_time_ms": -1},
+    ):
+        with pytest.raises(ValidationError):
+            ReviewBatchRequest(batch_id=uuid.uuid4(), reviews=[review])
+
+    with pytest.raises(ValidationError):
+        ReviewBatchRequest(batch_id=uuid.uuid4(), reviews=[])
+
+    too_many = [{"card_id": uuid.uuid4(), "grade": 3, "response_time_ms": 100}] * (settings.SRS_MAX_BATCH_SIZE + 1)
+    with pytest.raises(ValidationError):
+        ReviewBatchRequest(batch_id=uuid.uuid4(), reviews=too_many)
+
+    # Stored results (ISO dates, string ids) parse back into the response
+    response = ReviewBatchResponse(batch_id=uuid.uuid4(), replayed=True, results=[{
+        "card_id": str(card_id), "question_id": None, "passed": True, "interval": 6,
+        "ease_factor": 2.5, "repetitions": 2, "next_review_date": "2025-03-07", "is_learning": False,
+    }])
+    assert response.results[0].next_review_date == date(2025, 3, 7)
+    print("✓ Review batch validation test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_submit_review_batch_with_postgres():
+    """Test attempts, replays of a retried batch and batch id ownership"""
+    from app.models.content import Question
+    from app.models.progress import QuestionAttempt, UserAchievement, UserAchievementState
+    from app.models.srs import SRSCard, SRSQueueSize, SRSReviewBatch
+    from app.models.user import User
+    from app.services.srs_service import SRSService
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    today = date(2025, 3, 1)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, Question, QuestionAttempt, SRSCard, SRSQueueSize, SRSReviewBatch,
+                          UserAchievement, UserAchievementState):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            user = User(email=f"batch-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Batch Test")
+            other = User(email=f"batch-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Other")
+            question = Question(
+                type="mcq", stem="Choose the correct form", level="A1", skill="grammar", topic="verbs",
+                options=[{"id": "a", "text": "is"}, {"id": "b", "text": "are"}], answer_key={"id": "a"},
+            )
+            session.add_all([user, other, question])
+            await session.flush()
+            question_card = SRSCard(user_id=user.id, item_type="question", item_id=question.id,
+                                    question_id=question.id, next_review_date=today)
+            concept_card = SRSCard(user_id=user.id, item_type="concept", item_id=uuid.uuid4(),
+                                   next_review_date=today)
+            session.add_all([question_card, concept_card])
+            await session.commit()
+
+            try:
+                service = SRSService(session)
+                batch_id = uuid.uuid4()
+                reviews = [(question_card.id, 2, 4200), (concept_card.id, 5, 900)]
+
+                results, replayed = await service.submit_review_batch(user.id, batch_id, reviews, today=today)
+                await session.commit()
+                assert replayed is False
+                assert [r["passed"] for r in results] == [False, True]
+
+                attempts = (await session.execute(
+                    select(QuestionAttempt).where(QuestionAttempt.context_id == batch_id)
+                )).scalars().all()
+                assert len(attempts) == 1
+                assert attempts[0].context_type == "srs"
+                assert attempts[0].is_correct is False and attempts[0].time_taken == 4
+
+                # A retry returns the stored outcome and grades nothing again
+                replay, replayed = await service.submit_review_batch(user.id, batch_id, reviews, today=today)
+                await session.commit()
+                assert replayed is True and replay == results
+                total_reviews = await session.scalar(
+                    select(SRSCard.total_reviews).where(SRSCard.id == concept_card.id)
+                )
+                assert total_reviews == 1
+                assert await session.scalar(
+                    select(func.count()).select_from(QuestionAttempt).where(QuestionAttempt.context_id == batch_id)
+                ) == 1
+
+                with pytest.raises(HTTPException) as error:
+                    await service.submit_review_batch(other.id, batch_id, reviews, today=today)
+                assert error.value.status_code == 409
+                await session.rollback()
+            finally:
+                await session.delete(user)
+                await session.delete(other)
+                await session.delete(question)
+                await session.commit()
+
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres review batch test passed")
@@ -0,0 +1,65 @@
+"""
+Tests for the Monte Carlo SRS workload forecaster
+"""
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.srs_engine import CardStates
+from app.services.srs_simulator import recall_probability, simulate
+
+
+def cards(count, total_reviews=0, correct_reviews=0, **overrides):
+    columns = {name: np.zeros(count, dtype=np.int32) for name in CardStates.COLUMNS}
+    columns["interval"] = np.ones(count, dtype=np.int32)
+    columns["ease_factor"] = np.full(count, 2.5)
+    columns["total_reviews"] = np.full(count, total_reviews, dtype=np.int32)
+    columns["correct_reviews"] = np.full(count, correct_reviews, dtype=np.int32)
+    columns.update(overrides)
+    return CardStates(**columns)
+
+
+def test_forecast_follows_schedule():
+    """Test that a reliably recalled new card is reviewed at 0, 1, 7 and ~22 days"""
+    start = date(2025, 3, 1)
+    forecast = simulate(cards(1, 10 ** 6, 10 ** 6), np.array([0]), 30, runs=3, start=start, seed=7)
+
+    due_days = np.flatnonzero(forecast.mean).tolist()
+    assert due_days[:3] == [0, 1, 7]
+    assert 20 <= due_days[3] <= 25
+    assert forecast.mean[0] == forecast.p10[0] == forecast.p90[0] == 1
+    assert forecast.dates()[0] == start and len(forecast.dates()) == 30
+    print("✓ Forecast schedule test passed")
+
+
+def test_forecast_backlog_and_new_cards():
+    """Test overdue backlog, cards beyond the horizon and new-card pace"""
+    states = cards(4, 20, 18)
+    forecast = simulate(states, np.array([-10, -2, 0, 400]), 60, runs=5, new_cards_per_day=3, seed=1)
+
+    # Overdue cards, today's card and today's new cards all land on day 0
+    assert forecast.mean[0] == 3 + 3
+    assert forecast.peak()[1] >= 6
+    # Every day has at least the newly added cards
+    assert (forecast.p10 >= 3).all()
+    assert (forecast.p10 <= forecast.mean).all() and (forecast.mean <= forecast.p90).all()
+
+    again = simulate(states, np.array([-10, -2, 0, 400]), 60, runs=5, new_cards_per_day=3, seed=1)
+    assert np.array_equal(forecast.mean, again.mean)
+
+    with pytest.raises(ValueError):
+        simulate(states, np.zeros(4), 366)
+    with pytest.raises(ValueError):
+        simulate(states, np.zeros(4), 30, runs=0)
+    print("✓ Forecast backlog test passed")
+
+
+def test_recall_probability():
+    """Test the per-card recall estimate"""
+    estimates = recall_probability(np.array([0, 100, 100]), np.array([0, 100, 50]))
+    assert estimates[0] == pytest.approx(0.85)
+    assert estimates[1] > 0.98
+    assert estimates[2] == pytest.approx(58.5 / 110)
+    print("✓ Recall probability test passed")
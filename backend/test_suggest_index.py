@@ -0,0 +1,92 @@
+"""
+Tests for the typeahead suggestion index
+"""
+
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import search as search_api
+from app.services.search_service import suggest_service
+from app.services.suggest_index import SuggestIndexBuilder, normalize
+
+
+def lesson(title, slug, topic, tags, views=0, completions=0):
+    return SimpleNamespace(
+        title=title, slug=slug, topic=topic, tags=tags,
+        view_count=views, completion_count=completions,
+    )
+
+
+def build_index():
+    builder = SuggestIndexBuilder()
+    builder.add_lesson(lesson("Present Perfect basics", "pp-basics", "present perfect", ["tenses"], views=100, completions=10))
+    builder.add_lesson(lesson("Past perfect stories", "past-perfect", "past perfect", ["tenses"], views=5))
+    builder.add_lesson(lesson("Prepositions of place", "prepositions", "prepositions", ["place"], views=50, completions=50))
+    builder.add_question(SimpleNamespace(subtopic="Perfect continuous", tags=["tenses", "Perfect"]))
+    return builder.build()
+
+
+def test_normalize():
+    """Test accent and punctuation folding"""
+    assert normalize("  Café-Culture: Présent!! ") == "cafe culture present"
+    print("✓ Normalize test passed")
+
+
+def test_prefix_matches_any_word_ranked_by_engagement():
+    """Test word-start prefix matching, ranking and kind filters"""
+    index = build_index()
+
+    results = index.suggest("perf")
+    texts = [(s.text, s.kind) for s in results]
+    # Lesson/topic popularity: views + 3 * completions + 1
+    assert texts[:2] == [("Present Perfect basics", "lesson"), ("present perfect", "topic")]
+    assert ("Perfect continuous", "subtopic") in texts
+    assert ("Perfect", "tag") in texts
+
+    # Tags shared by lessons and questions are merged and their scores summed
+    tenses = [s for s in index.suggest("tens") if s.kind == "tag"][0]
+    assert tenses.score == 131 + 6 + 1
+
+    assert [s.ref for s in index.suggest("PRE", kinds=["lesson"])] == ["prepositions", "pp-basics"]
+    assert index.suggest("present perfect b")[0].ref == "pp-basics"
+    assert index.suggest("zzz") == []
+    assert index.suggest("  ") == []
+    print("✓ Prefix suggestion test passed")
+
+
+def test_precomputed_prefixes_match_scans(monkeypatch):
+    """Test that precomputed results equal a plain range scan"""
+    builder = SuggestIndexBuilder()
+    for i in range(300):
+        builder.add_lesson(lesson(f"Travel phrases {i}", f"travel-{i}", f"topic {i % 7}", [], views=i))
+    index = builder.build()
+    assert "t" in index.precomputed and "tr" in index.precomputed
+
+    for prefix, kinds in [("t", None), ("tr", ["lesson"]), ("to", ["topic"]), ("t", ["topic", "lesson"])]:
+        expected = [index.suggestions[i] for i in index._top_ids(*index._range(prefix), 10, set(kinds) if kinds else None)]
+        assert index.suggest(prefix, limit=10, kinds=kinds) == expected
+    assert index.suggest("tr")[0].text == "Travel phrases 299"
+    # Topics aggregate the popularity of every lesson under them
+    assert index.suggest("t")[0].kind == "topic"
+    print("✓ Precomputed prefix test passed")
+
+
+def test_suggest_endpoint(monkeypatch):
+    """Test the suggest API"""
+    app = FastAPI()
+    app.include_router(search_api.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(suggest_service, "index", None)
+    assert client.get("/search/suggest", params={"q": "pre"}).status_code == 503
+
+    monkeypatch.setattr(suggest_service, "index", build_index())
+    response = client.get("/search/suggest", params={"q": "pre", "limit": 2})
+    assert response.status_code == 200
+    assert response.json()["suggestions"] == [
+        {"text": "Prepositions of place", "kind": "lesson", "ref": "prepositions"},
+        {"text": "prepositions", "kind": "topic", "ref": None},
+    ]
+    print("✓ Suggest endpoint test passed")
@@ -0,0 +1,103 @@
+"""
+Tests for JWT revocation (logout and refresh rotation)
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.core.revocation import (
+    BloomFilter, InMemoryRevocationBackend, TokenRevocationList, revocation_list
+)
+from app.core.config import settings
+from app.core.security import create_access_token, verify_token
+from app.services.auth_service import AuthService
+
+
+def test_bloom_filter_membership():
+    """Test that added keys are always found and most others are not"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"jti-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+    print("✓ Bloom filter membership test passed")
+
+
+def test_revoked_token_rejected():
+    """Test that a revoked token fails verification even when cached"""
+    token = create_access_token({"sub": "revoked-user", "scopes": ["user"]})
+    payload = verify_token(token, "access")
+
+    asyncio.run(revocation_list.revoke(payload["jti"], payload["exp"]))
+
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token(token, "access")
+    assert exc_info.value.detail == "Token has been revoked"
+    print("✓ Revoked token test passed")
+
+
+def test_revocation_shared_between_workers():
+    """Test that revocations propagate through the shared backend on sync"""
+    backend = InMemoryRevocationBackend()
+    worker_a = TokenRevocationList(backend=backend, capacity=100)
+    worker_b = TokenRevocationList(backend=backend, capacity=100)
+
+    async def run():
+        await worker_a.revoke("shared-jti", time.time() + 60)
+        await worker_a.revoke("expired-jti", time.time() - 1)
+        assert worker_a.is_revoked("shared-jti")
+        assert not worker_b.is_revoked("shared-jti")
+
+        await worker_b.sync()
+        assert worker_b.is_revoked("shared-jti")
+        assert not worker_b.is_revoked("expired-jti")
+        assert not worker_b.is_revoked(None)
+
+    asyncio.run(run())
+    print("✓ Shared revocation test passed")
+
+
+def test_revoke_claims_once():
+    """Test that concurrent revocations of one token ID succeed exactly once"""
+    backend = InMemoryRevocationBackend()
+    worker_a = TokenRevocationList(backend=backend, capacity=100)
+    worker_b = TokenRevocationList(backend=backend, capacity=100)
+    expires_at = time.time() + 60
+
+    async def run():
+        claims = await asyncio.gather(
+            worker_a.revoke("refresh-jti", expires_at),
+            worker_a.revoke("refresh-jti", expires_at),
+            worker_b.revoke("refresh-jti", expires_at),
+        )
+        assert sorted(claims) == [False, False, True]
+        # Both workers now reject it without waiting for a sync
+        assert worker_a.is_revoked("refresh-jti") and worker_b.is_revoked("refresh-jti")
+        assert await worker_b.revoke(None, expires_at) is False
+
+    asyncio.run(run())
+    print("✓ Single claim test passed")
+
+
+def test_refresh_token_without_id_asks_for_login():
+    """Test that a refresh token issued before rotation is not treated as a replay"""
+    legacy = jwt.encode(
+        {"sub": "legacy-user", "email": "legacy@example.com", "type": "refresh",
+         "exp": datetime.utcnow() + timedelta(minutes=5)},
+        settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+
+    # Rejected before the user lookup, so no database is needed
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(AuthService(db=None).refresh_token(legacy))
+    assert error.value.status_code == 401
+    assert error.value.detail == "Refresh token format is no longer supported, please log in again"
+    print("✓ Legacy refresh token test passed")
@@ -0,0 +1,107 @@
+"""
+Tests for the in-process TTL cache and the cached user lookup
+"""
+
+import asyncio
+import uuid
+
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+from app.models.user import User
+from app.services.auth_service import AuthService, user_cache
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry(monkeypatch):
+    """Test that entries expire after their TTL"""
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    clock.now += 31
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    print("✓ TTL cache expiry test passed")
+
+
+def test_ttl_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    print("✓ TTL cache LRU eviction test passed")
+
+
+def test_ttl_cache_disabled():
+    """Test that a zero TTL disables caching"""
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    print("✓ Disabled TTL cache test passed")
+
+
+def test_cached_user_lookup(monkeypatch):
+    """Test that get_cached_user only queries on a miss and honours invalidation"""
+    user_id = uuid.uuid4()
+    queries = []
+
+    async def fake_get_user_by_id(self, requested_id):
+        queries.append(requested_id)
+        return User(
+            id=user_id,
+            email="cached@example.com",
+            password_hash="secret-hash",
+            full_name="Cached User",
+            current_level="A2",
+            learning_goals=["grammar"],
+            is_active=True,
+            is_verified=True,
+            is_premium=False,
+            is_staff=False,
+            is_admin=False,
+        )
+
+    monkeypatch.setattr(AuthService, "get_user_by_id", fake_get_user_by_id)
+    user_cache.clear()
+    service = AuthService(db=None)
+
+    async def run():
+        first = await service.get_cached_user(str(user_id))
+        second = await service.get_cached_user(str(user_id))
+
+        assert len(queries) == 1
+        assert first is not second
+        assert second.id == user_id
+        assert second.email == "cached@example.com"
+        assert second.learning_goals == ["grammar"]
+        assert "password_hash" not in second.__dict__
+
+        AuthService.invalidate_cached_user(user_id)
+        await service.get_cached_user(str(user_id))
+        assert len(queries) == 2
+
+    try:
+        asyncio.run(run())
+    finally:
+        user_cache.clear()
+    print("✓ Cached user lookup test passed")
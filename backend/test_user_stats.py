@@ -0,0 +1,129 @@
+"""
+Tests for the trigger-maintained user_stats rollup
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.user_stats import ROLLUP_COLUMNS, ROLLUP_FIELDS, format_user_statistics, trigger_ddl
+
+
+def test_format_matches_statistics_shape():
+    """Test averages are derived from the stored sums and empty users get defaults"""
+    stats = SimpleNamespace(
+        lessons_started=4, lessons_completed=1, completion_percentage_sum=Decimal("250.00"), time_spent=900,
+        attempts=8, correct_attempts=6, attempt_time_sum=100,
+        srs_cards=2, srs_mature_cards=1, ease_factor_sum=Decimal("5.20"),
+    )
+    result = format_user_statistics(stats)
+    assert result["lessons"] == {"total": 4, "completed": 1, "avg_completion": 62.5, "total_time_spent": 900}
+    assert result["questions"]["accuracy_rate"] == 75.0
+    assert result["questions"]["avg_time_per_question"] == 12.5
+    assert result["srs"] == {"total_cards": 2, "mature_cards": 1, "avg_ease_factor": 2.6}
+
+    empty = format_user_statistics(None)
+    assert empty["questions"] == {
+        "total_attempts": 0, "correct_attempts": 0, "accuracy_rate": 0, "avg_time_per_question": 0.0
+    }
+    assert empty["srs"]["avg_ease_factor"] == 2.5
+    print("✓ User statistics format test passed")
+
+
+def test_trigger_ddl():
+    """Test one statement-level trigger per event, each skipping no-op changes"""
+    assert len(ROLLUP_COLUMNS) == len(set(ROLLUP_COLUMNS))
+    for table in ROLLUP_FIELDS:
+        statements = trigger_ddl(table)
+        function = statements[0]
+        assert function.count("HAVING") == 3
+        assert "ON CONFLICT (user_id)" in function
+        creates = [statement for statement in statements if "CREATE TRIGGER" in statement]
+        assert len(creates) == 3
+        assert all("FOR EACH STATEMENT" in statement for statement in creates)
+    print("✓ User statistics trigger DDL test passed")
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_DATABASE_URL"), reason="TEST_POSTGRES_DATABASE_URL not set")
+def test_user_stats_triggers_with_postgres():
+    """Test the rollup follows inserts, updates and deletes, and the checker repairs drift"""
+    from app.core.database_utils import DatabaseUtils
+    from app.core.user_stats import check_user_stats, install_user_stats_triggers
+    from app.models.content import Question
+    from app.models.progress import LessonProgress, QuestionAttempt, UserStats
+    from app.models.srs import SRSCard
+    from app.models.user import User
+
+    engine = create_async_engine(
+        os.environ["TEST_POSTGRES_DATABASE_URL"].replace("postgresql://", "postgresql+asyncpg://")
+    )
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            for model in (User, Question, QuestionAttempt, LessonProgress, SRSCard, UserStats):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
+        async with SessionLocal() as session:
+            await install_user_stats_triggers(session)
+            user = User(email=f"stats-{uuid.uuid4().hex}@example.com", password_hash="x", full_name="Stats Test")
+            question = Question(
+                type="mcq", stem="Choose the correct form", level="A1", skill="grammar", topic="verbs",
+                options=[{"id": "a", "text": "is"}], answer_key={"id": "a"},
+            )
+            session.add_all([user, question])
+            await session.flush()
+            session.add_all([
+                QuestionAttempt(user_id=user.id, question_id=question.id, user_answer={}, is_correct=correct,
+                                time_taken=seconds, points_earned=int(correct), max_points=1)
+                for correct, seconds in ((True, 10), (False, 20), (True, 30))
+            ] + [
+                SRSCard(user_id=user.id, item_type="question", item_id=question.id, question_id=question.id,
+                        next_review_date=date(2025, 3, 1), ease_factor=2.5)
+                for _ in range(2)
+            ])
+            await session.commit()
+
+            # A card graduates, a no-op update, one attempt removed
+            card_id = (await session.execute(
+                select(SRSCard.id).where(SRSCard.user_id == user.id).limit(1)
+            )).scalar_one()
+            await session.execute(
+                update(SRSCard).where(SRSCard.id == card_id).values(is_learning=False, ease_factor=2.7)
+            )
+            await session.execute(update(SRSCard).where(SRSCard.user_id == user.id).values(interval=3))
+            await session.execute(delete(QuestionAttempt).where(
+                QuestionAttempt.user_id == user.id, QuestionAttempt.time_taken == 30
+            ))
+            await session.commit()
+
+            stats = await DatabaseUtils.get_user_statistics(session, user.id)
+            assert stats["questions"]["total_attempts"] == 2
+            assert stats["questions"]["accuracy_rate"] == 50.0
+            assert stats["questions"]["avg_time_per_question"] == 15.0
+            assert stats["srs"] == {"total_cards": 2, "mature_cards": 1, "avg_ease_factor": 2.6}
+
+            assert (await check_user_stats(session, user_ids=[user.id]))["drifted"] == 0
+            await session.execute(update(UserStats).where(UserStats.user_id == user.id).values(attempts=99))
+            await session.commit()
+            assert (await check_user_stats(session, user_ids=[user.id]))["drifted"] == 1
+            assert (await check_user_stats(session, repair=True, user_ids=[user.id]))["drifted"] == 1
+            assert (await check_user_stats(session, user_ids=[user.id]))["drifted"] == 0
+
+            # The delete triggers must tolerate the cascade removing the rollup row
+            await session.execute(delete(QuestionAttempt).where(QuestionAttempt.user_id == user.id))
+            await session.execute(delete(SRSCard).where(SRSCard.user_id == user.id))
+            await session.execute(delete(User).where(User.id == user.id))
+            await session.execute(delete(Question).where(Question.id == question.id))
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(run())
+    print("✓ Postgres user statistics trigger test passed")